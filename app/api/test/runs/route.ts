@@ -0,0 +1,61 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { UnauthorizedError, verifyUserAuth } from '@/src/actions/auth';
+import { baseErrorHandler } from '@/src/actions/error-handlers';
+import {
+  areTestRoutesEnabled,
+  deleteTestRuns,
+  isValidRunId,
+} from '@/src/actions/run';
+import DBConnection from '@/src/db/DBConnection';
+import { RunFilter } from '@/src/db/repository';
+import { ErrorResponse } from '@/src/types/api';
+import { DELETE_TEST_RUNS } from '@/src/types/endpoints';
+import { parseOptionalDate } from '@/src/utils/date';
+import { InvalidDateError } from '@/src/utils/errors';
+
+// Deletes everything created by the e2e test run `runId`, or by any test run
+// before the `before` date, e.g. runs that crashed before their cleanup
+export const DELETE = async (
+  req: NextRequest,
+): Promise<NextResponse<DELETE_TEST_RUNS | ErrorResponse>> => {
+  try {
+    if (!areTestRoutesEnabled()) {
+      return NextResponse.json({ message: 'Not found' }, { status: 404 });
+    }
+    await DBConnection.connect();
+    const { role } = await verifyUserAuth(req);
+
+    if (role !== 'admin') {
+      throw new UnauthorizedError();
+    }
+
+    const runId = req.nextUrl.searchParams.get('runId');
+    const before = parseOptionalDate(req.nextUrl.searchParams.get('before'));
+    let filter: RunFilter;
+    if (runId && isValidRunId(runId)) {
+      filter = { runId };
+    } else if (!runId && before) {
+      filter = { before };
+    } else {
+      return NextResponse.json(
+        { message: 'Expected a valid runId or a before date' },
+        { status: 400 },
+      );
+    }
+
+    const deleted = await deleteTestRuns(filter);
+    console.log('Deleted test runs', filter, deleted);
+
+    return NextResponse.json({ deleted });
+  } catch (error) {
+    console.error('Failed to delete test runs', error);
+    if (error instanceof InvalidDateError) {
+      return NextResponse.json(
+        { message: 'Invalid before date' },
+        { status: 400 },
+      );
+    }
+    return baseErrorHandler(error, req);
+  }
+};
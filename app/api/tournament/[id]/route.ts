@@ -22,6 +22,9 @@ export const GET = async (
     const analyticsService = new AnalyticsService();
     const { id } = await ctx.params;
     const tournament = await tournamentRepo.getById(id);
+    if (req.nextUrl.searchParams.get('analysis') === 'false') {
+      return NextResponse.json({ tournament });
+    }
     let analysis;
     try {
       analysis = await analyticsService.getAnalytics(tournament.teams);
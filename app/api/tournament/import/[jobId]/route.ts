@@ -0,0 +1,45 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { UnauthorizedError, verifyUserAuth } from '@/src/actions/auth';
+import { baseErrorHandler } from '@/src/actions/error-handlers';
+import DBConnection from '@/src/db/DBConnection';
+import {
+  TournamentImportJobNotFoundError,
+  TournamentImportJobRepository,
+} from '@/src/db/models/tournament';
+import { ErrorResponse } from '@/src/types/api';
+import { GET_TOURNAMENT_IMPORT } from '@/src/types/endpoints';
+
+export const GET = async (
+  req: NextRequest,
+  ctx: RouteContext<'/api/tournament/import/[jobId]'>,
+): Promise<NextResponse<GET_TOURNAMENT_IMPORT | ErrorResponse>> => {
+  try {
+    await DBConnection.connect();
+    const { role } = await verifyUserAuth(req);
+
+    if (role !== 'admin') {
+      throw new UnauthorizedError();
+    }
+
+    const jobRepo = new TournamentImportJobRepository();
+    const { jobId } = await ctx.params;
+    const job = await jobRepo.getById(jobId);
+
+    return NextResponse.json(
+      { job },
+      { headers: { 'Cache-Control': 'no-store' } },
+    );
+  } catch (error) {
+    console.error('Failed to get tournament import', error);
+    if (error instanceof TournamentImportJobNotFoundError) {
+      return NextResponse.json<ErrorResponse>(
+        { message: 'Tournament import not found' },
+        {
+          status: 404,
+        },
+      );
+    }
+    return baseErrorHandler(error, req);
+  }
+};
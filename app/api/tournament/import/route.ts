@@ -0,0 +1,60 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { UnauthorizedError, verifyUserAuth } from '@/src/actions/auth';
+import { baseErrorHandler } from '@/src/actions/error-handlers';
+import { getRunId } from '@/src/actions/run';
+import {
+  submitTournamentImport,
+  validateCreateTournamentData,
+} from '@/src/actions/tournament';
+import { ErrorResponse } from '@/src/types/api';
+import { POST_TOURNAMENT_IMPORT } from '@/src/types/endpoints';
+
+export const POST = async (
+  req: NextRequest,
+): Promise<NextResponse<POST_TOURNAMENT_IMPORT | ErrorResponse>> => {
+  try {
+    const { role: userRole } = await verifyUserAuth(req);
+    const body: unknown = await req.json();
+    const validatedFields = validateCreateTournamentData(body);
+
+    if (
+      !validatedFields.success ||
+      validatedFields.data.source !== 'pokedata_url'
+    ) {
+      return NextResponse.json(
+        { message: 'Invalid input data' },
+        { status: 400 },
+      );
+    }
+
+    if (userRole !== 'admin') {
+      throw new UnauthorizedError();
+    }
+
+    const job = await submitTournamentImport(
+      validatedFields.data,
+      getRunId(req),
+    );
+
+    return NextResponse.json(
+      { job },
+      {
+        status: 202,
+        headers: { Location: `/api/tournament/import/${job.id}` },
+      },
+    );
+  } catch (error) {
+    console.error('Failed to submit tournament import', error);
+    if (error instanceof UnauthorizedError) {
+      return NextResponse.json({ message: 'Unauthorized' }, { status: 403 });
+    }
+    if (error instanceof SyntaxError) {
+      return NextResponse.json(
+        { message: 'Invalid JSON data' },
+        { status: 400 },
+      );
+    }
+    return baseErrorHandler(error, req);
+  }
+};
@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server';
 
 import { UnauthorizedError, verifyUserAuth } from '@/src/actions/auth';
 import { baseErrorHandler } from '@/src/actions/error-handlers';
+import { getRunId } from '@/src/actions/run';
 import {
   createTournamentWithAuth,
   validateCreateTournamentData,
@@ -19,6 +20,10 @@ export const GET = async (
     await verifyUserAuth(req);
 
     const tournamentRepo = new TournamentRepository();
+    if (req.nextUrl.searchParams.get('idsOnly') === 'true') {
+      const tournamentIds = await tournamentRepo.getIds();
+      return NextResponse.json({ tournaments: [], tournamentIds });
+    }
     const tournaments = await tournamentRepo.getAll();
 
     return NextResponse.json({ tournaments });
@@ -47,7 +52,10 @@ export const POST = async (
       throw new UnauthorizedError();
     }
 
-    const tournament = await createTournamentWithAuth(validatedFields.data);
+    const tournament = await createTournamentWithAuth(
+      validatedFields.data,
+      getRunId(req),
+    );
     console.log('Tournament created successfully', tournament);
 
     return NextResponse.json({ tournament }, { status: 201 });
@@ -2,9 +2,49 @@ import { NextRequest, NextResponse } from 'next/server';
 
 import { verifyUserAuth } from '@/src/actions/auth';
 import { baseErrorHandler } from '@/src/actions/error-handlers';
+import { getRunId } from '@/src/actions/run';
 import { createTeamForUser, validateCreateTeamData } from '@/src/actions/team';
+import DBConnection from '@/src/db/DBConnection';
+import UserRepository from '@/src/db/models/user';
 import { ErrorResponse } from '@/src/types/api';
-import { POST_TEAM } from '@/src/types/endpoints';
+import { GET_TEAMS, POST_TEAM } from '@/src/types/endpoints';
+import { parseOptionalDate } from '@/src/utils/date';
+import { InvalidDateError } from '@/src/utils/errors';
+
+export const GET = async (
+  req: NextRequest,
+): Promise<NextResponse<GET_TEAMS | ErrorResponse>> => {
+  try {
+    const syncedAt = new Date().toISOString();
+    const updatedSince = parseOptionalDate(
+      req.nextUrl.searchParams.get('updatedSince'),
+    );
+    await DBConnection.connect();
+    const { id } = await verifyUserAuth(req);
+
+    const userRepo = new UserRepository();
+    if (req.nextUrl.searchParams.get('idsOnly') === 'true') {
+      const teamIds = await userRepo.getTeamIds(id);
+      return NextResponse.json({ teams: [], teamIds, syncedAt });
+    }
+    const teams = await userRepo.getTeams(id, updatedSince);
+
+    if (!updatedSince) {
+      return NextResponse.json({ teams, syncedAt });
+    }
+    const teamIds = await userRepo.getTeamIds(id);
+    return NextResponse.json({ teams, teamIds, syncedAt });
+  } catch (error) {
+    console.error('Failed to get teams', error);
+    if (error instanceof InvalidDateError) {
+      return NextResponse.json(
+        { message: 'Invalid updatedSince date' },
+        { status: 400 },
+      );
+    }
+    return baseErrorHandler(error, req);
+  }
+};
 
 export const POST = async (
   req: NextRequest,
@@ -21,7 +61,10 @@ export const POST = async (
       );
     }
 
-    const team = await createTeamForUser(userId, validatedFields.data);
+    const team = await createTeamForUser(userId, {
+      ...validatedFields.data,
+      runId: getRunId(req),
+    });
     console.log('Team created successfully', team);
 
     return NextResponse.json({ team }, { status: 201 });
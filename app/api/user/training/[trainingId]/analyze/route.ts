@@ -5,10 +5,21 @@ import { baseErrorHandler } from '@/src/actions/error-handlers';
 import DBConnection from '@/src/db/DBConnection';
 import { TrainingNotFoundError } from '@/src/db/models/training';
 import UserRepository from '@/src/db/models/user';
+import TrainingAnalysisCache, {
+  trainingAnalysisCache,
+} from '@/src/services/pokemon/analysis-cache';
 import { TrainingAnalyticsService } from '@/src/services/pokemon/analytics';
 import { ErrorResponse } from '@/src/types/api';
 import { GET_TRAINING_ANALYSIS } from '@/src/types/endpoints';
 
+const getCacheHeaders = (etag: string, version: number) => ({
+  ETag: etag,
+  'Cache-Control': 'private, no-cache',
+  'X-Training-Version': String(version),
+  // Lets clients caching analyses drop those of previous versions
+  'X-Analytics-Version': String(TrainingAnalyticsService.VERSION),
+});
+
 export const GET = async (
   req: NextRequest,
   ctx: RouteContext<'/api/user/training/[trainingId]/analyze'>,
@@ -16,13 +27,40 @@ export const GET = async (
   try {
     await DBConnection.connect();
     const userRepo = new UserRepository();
-    const analyticsService = new TrainingAnalyticsService();
 
     const { id: userId } = await verifyUserAuth(req);
     const { trainingId } = await ctx.params;
-    const training = await userRepo.getTrainingById(userId, trainingId);
-    const analysis = analyticsService.getAnalytics(training);
-    return NextResponse.json({ analysis });
+    // Rebuilds the analytics from every battle instead of the stored aggregate
+    const full = req.nextUrl.searchParams.get('full') === 'true';
+    let version = await userRepo.getTrainingVersion(userId, trainingId);
+    let etag = TrainingAnalysisCache.getETag(trainingId, version);
+
+    if (
+      !full &&
+      TrainingAnalysisCache.matchesETag(req.headers.get('if-none-match'), etag)
+    ) {
+      return new NextResponse(null, {
+        status: 304,
+        headers: getCacheHeaders(etag, version),
+      }) as NextResponse<GET_TRAINING_ANALYSIS>;
+    }
+
+    let analysis = full ? undefined : trainingAnalysisCache.get(etag);
+    if (!analysis) {
+      const result = await userRepo.getTrainingAnalytics(
+        userId,
+        trainingId,
+        full,
+      );
+      analysis = result.analysis;
+      version = result.version;
+      etag = TrainingAnalysisCache.getETag(trainingId, version);
+      trainingAnalysisCache.set(etag, analysis);
+    }
+    return NextResponse.json(
+      { analysis },
+      { headers: getCacheHeaders(etag, version) },
+    );
   } catch (error) {
     console.error('Failed to get training', error);
     if (error instanceof TrainingNotFoundError) {
@@ -10,6 +10,7 @@ import {
 import UserRepository from '@/src/db/models/user';
 import { ErrorResponse } from '@/src/types/api';
 import { DELETE_BATTLE, GET_BATTLE } from '@/src/types/endpoints';
+import { negotiatedResponse } from '@/src/utils/compact';
 
 export const GET = async (
   req: NextRequest,
@@ -22,7 +23,7 @@ export const GET = async (
     const { id: userId } = await verifyUserAuth(req);
     const { trainingId, battleId } = await ctx.params;
     const battle = await userRepo.getBattleById(userId, trainingId, battleId);
-    return NextResponse.json({ battle });
+    return negotiatedResponse(req, { battle });
   } catch (error) {
     console.error('Failed to get training', error);
     if (error instanceof BattleNotFoundError) {
@@ -6,6 +6,7 @@ import {
   validateCreateBattleData,
 } from '@/src/actions/battle';
 import { baseErrorHandler } from '@/src/actions/error-handlers';
+import { getRunId } from '@/src/actions/run';
 import { TrainingNotFoundError } from '@/src/db/models/training';
 import { ErrorResponse } from '@/src/types/api';
 import { POST_BATTLE } from '@/src/types/endpoints';
@@ -27,11 +28,10 @@ export const POST = async (
       );
     }
 
-    const battle = await createBattleForTraining(
-      userId,
-      trainingId,
-      validatedFields.data,
-    );
+    const battle = await createBattleForTraining(userId, trainingId, {
+      ...validatedFields.data,
+      runId: getRunId(req),
+    });
     console.log('Battle created successfully', battle);
 
     return NextResponse.json({ battle }, { status: 201 });
@@ -7,6 +7,7 @@ import { TrainingNotFoundError } from '@/src/db/models/training';
 import UserRepository from '@/src/db/models/user';
 import { ErrorResponse } from '@/src/types/api';
 import { DELETE_TRAINING, GET_TRAINING } from '@/src/types/endpoints';
+import { negotiatedResponse } from '@/src/utils/compact';
 
 export const GET = async (
   req: NextRequest,
@@ -19,7 +20,7 @@ export const GET = async (
     const { id: userId } = await verifyUserAuth(req);
     const { trainingId } = await ctx.params;
     const training = await userRepo.getTrainingById(userId, trainingId);
-    return NextResponse.json({ training });
+    return negotiatedResponse(req, { training });
   } catch (error) {
     console.error('Failed to get training', error);
     if (error instanceof TrainingNotFoundError) {
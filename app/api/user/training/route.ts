@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server';
 
 import { verifyUserAuth } from '@/src/actions/auth';
 import { baseErrorHandler } from '@/src/actions/error-handlers';
+import { getRunId } from '@/src/actions/run';
 import {
   createTrainingForUser,
   validateCreateTrainingData,
@@ -11,21 +12,48 @@ import { TeamNotFoundError } from '@/src/db/models/team';
 import UserRepository from '@/src/db/models/user';
 import { ErrorResponse } from '@/src/types/api';
 import { GET_TRAININGS, POST_TRAINING } from '@/src/types/endpoints';
+import { negotiatedResponse } from '@/src/utils/compact';
+import { parseOptionalDate } from '@/src/utils/date';
+import { InvalidDateError } from '@/src/utils/errors';
 
 export const GET = async (
   req: NextRequest,
 ): Promise<NextResponse<GET_TRAININGS | ErrorResponse>> => {
   try {
+    const syncedAt = new Date().toISOString();
+    const updatedSince = parseOptionalDate(
+      req.nextUrl.searchParams.get('updatedSince'),
+    );
     await DBConnection.connect();
     const { id } = await verifyUserAuth(req);
 
     const userRepo = new UserRepository();
-    const trainings = await userRepo.getTrainings(id);
+    if (req.nextUrl.searchParams.get('idsOnly') === 'true') {
+      const trainingIds = await userRepo.getTrainingIds(id);
+      const defaultTrainingId = await userRepo.getDefaultTrainingId(id);
+      return negotiatedResponse(req, {
+        trainings: [],
+        trainingIds,
+        defaultTrainingId,
+        syncedAt,
+      });
+    }
+    const trainings = await userRepo.getTrainings(id, updatedSince);
     trainings.reverse();
 
-    return NextResponse.json({ trainings });
+    if (!updatedSince) {
+      return negotiatedResponse(req, { trainings, syncedAt });
+    }
+    const trainingIds = await userRepo.getTrainingIds(id);
+    return negotiatedResponse(req, { trainings, trainingIds, syncedAt });
   } catch (error) {
     console.error('Failed to get trainings', error);
+    if (error instanceof InvalidDateError) {
+      return NextResponse.json(
+        { message: 'Invalid updatedSince date' },
+        { status: 400 },
+      );
+    }
     return baseErrorHandler(error, req);
   }
 };
@@ -45,7 +73,11 @@ export const POST = async (
       );
     }
 
-    const training = await createTrainingForUser(userId, validatedFields.data);
+    const training = await createTrainingForUser(
+      userId,
+      validatedFields.data,
+      getRunId(req),
+    );
     console.log('Training created successfully', training);
 
     return NextResponse.json({ training }, { status: 201 });
@@ -0,0 +1,165 @@
+"""
+Scaling benchmark of the training analyze endpoint.
+
+Grows a training with synthetic battles up to each size, measures the latency
+percentiles and the response size of GET /api/user/training/{id}/analyze,
+both rebuilt from every battle (`?full=true`) and as served to clients (from
+the stored aggregate, then the server's analysis cache), then fits
+`latency ~ battles ** exponent` on the rebuilt analyses. Exits with status 1
+when the growth is super-linear (exponent above --max-exponent) or when a
+size is slower than the baseline by more than --tolerance.
+
+The app must run locally, against a local Mongo, and be started with
+BATTLES_PER_TRAINING_LIMIT of at least the largest size (see README).
+
+Usage (from the e2e directory):
+    uv run python -m benchmarks.analyze_scaling --sizes 10 100 1000 10000 \\
+        --baseline benchmarks/analyze_scaling.json
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.models.training import Training
+from src.util.api import IncineroarAPI, create_authenticated_api
+from src.util.constants import LOCAL_HOSTS, NEXT_PUBLIC_APP_URL
+from src.util.data import load_users
+from src.util.datagen import DataGenerator
+
+
+def percentile(samples: List[float], p: int) -> float:
+    """p-th percentile of the samples, interpolated."""
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1]
+
+
+def fit_exponent(points: List[Tuple[int, float]]) -> float:
+    """Least squares slope of log(value) against log(size)."""
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(max(value, 1e-9)) for _, value in points]
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return 0.0
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return covariance / variance
+
+
+def measure(
+    api: IncineroarAPI, training_id: str, full: bool, samples: int
+) -> Dict[str, float]:
+    """Latency percentiles (ms) and response size of the analyze endpoint."""
+    latencies = []
+    size = 0
+    for _ in range(samples):
+        timed = api.time_training_analysis(training_id, full)
+        latencies.append(timed.seconds * 1000)
+        size = timed.bytes
+    return {
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "bytes": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--username", default="mewtwo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=8, help="seeding requests")
+    parser.add_argument("--max-exponent", type=float, default=1.2)
+    parser.add_argument("--baseline", help="JSON file of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline requires --baseline")
+
+    host = urlsplit(NEXT_PUBLIC_APP_URL).hostname
+    if host not in LOCAL_HOSTS:
+        sys.exit(f"Refusing to seed {NEXT_PUBLIC_APP_URL}, run against a local app")
+
+    password = load_users()[args.username]["password"]
+    api = create_authenticated_api(args.username, password)
+    generator = DataGenerator(args.seed)
+    training = api.create_training_from_model(
+        Training(name="Analyze scaling benchmark", season=2025, format="reg h")
+    )
+    assert training.id is not None
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    try:
+        seeded = 0
+        with ThreadPoolExecutor(args.workers) as executor:
+            for size in sorted(args.sizes):
+                list(
+                    executor.map(
+                        lambda index: api.create_training_battle_from_model(
+                            training.id, generator.battle(0, index)
+                        ),
+                        range(seeded, size),
+                    )
+                )
+                seeded = size
+                results[str(size)] = {
+                    "full": measure(api, training.id, True, args.samples),
+                    "aggregate": measure(api, training.id, False, args.samples),
+                }
+    finally:
+        api.delete_training(training.id)
+
+    print(
+        f"{'battles':>8}{'mode':>11}{'p50 ms':>10}{'p90 ms':>10}"
+        f"{'p99 ms':>10}{'bytes':>11}"
+    )
+    for size, modes in results.items():
+        for mode, stats in modes.items():
+            print(
+                f"{size:>8}{mode:>11}{stats['p50']:>10.1f}{stats['p90']:>10.1f}"
+                f"{stats['p99']:>10.1f}{stats['bytes']:>11}"
+            )
+
+    failures = []
+    points = [(int(size), modes["full"]["p50"]) for size, modes in results.items()]
+    exponent = fit_exponent(points)
+    size_exponent = fit_exponent(
+        [(int(size), modes["full"]["bytes"]) for size, modes in results.items()]
+    )
+    print(f"latency ~ battles^{exponent:.2f}, size ~ battles^{size_exponent:.2f}")
+    if len(points) > 1 and exponent > args.max_exponent:
+        failures.append(
+            f"latency grows as battles^{exponent:.2f} > ^{args.max_exponent}"
+        )
+
+    baseline_path: Optional[Path] = Path(args.baseline) if args.baseline else None
+    if baseline_path is not None and baseline_path.is_file():
+        baseline = json.loads(baseline_path.read_text())
+        for size, modes in results.items():
+            for mode, stats in modes.items():
+                previous = baseline.get(size, {}).get(mode)
+                if previous and stats["p50"] > previous["p50"] * (1 + args.tolerance):
+                    failures.append(
+                        f"{size} battles {mode}: p50 {stats['p50']:.1f} ms, "
+                        f"baseline {previous['p50']:.1f} ms"
+                    )
+    if args.save_baseline and baseline_path is not None:
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Size and decode-time benchmark of the compact encoding against JSON.
+
+Builds synthetic GET /api/user/training/{id} payloads and compares the raw and
+gzip compressed sizes and the decode time of both wire formats.
+
+Usage (from the e2e directory):
+    uv run python -m benchmarks.compact_encoding --battles 200 --turns 15
+"""
+
+import argparse
+import gzip
+import json
+import random
+import timeit
+
+from src.util.compact import decode, encode
+
+POKEMON = [
+    "Incineroar",
+    "Rillaboom",
+    "Amoonguss",
+    "Flutter Mane",
+    "Urshifu-Rapid-Strike",
+    "Tornadus",
+    "Chien-Pao",
+    "Landorus",
+    "Ogerpon-Hearthflame",
+    "Farigiraf",
+    "Calyrex-Shadow",
+    "Miraidon",
+]
+MOVES = [
+    "Fake Out",
+    "Parting Shot",
+    "Knock Off",
+    "Spore",
+    "Rage Powder",
+    "Protect",
+    "Moonblast",
+    "Surging Strikes",
+    "Tailwind",
+    "Icicle Crash",
+    "Astral Barrage",
+    "Electro Drift",
+]
+
+
+def build_training(battles: int, turns: int, seed: int = 1) -> dict:
+    """Build a training payload shaped like the API response."""
+    rng = random.Random(seed)
+
+    def actor(player: str) -> str:
+        return f"{player}:{rng.choice(POKEMON)}"
+
+    def action(index: int) -> dict:
+        player = rng.choice(["p1", "p2"])
+        opponent = "p2" if player == "p1" else "p1"
+        kind = rng.choices(["move", "switch", "ability", "effect"], [8, 2, 1, 1])[0]
+        return {
+            "index": index,
+            "player": player,
+            "type": kind,
+            "name": rng.choice(MOVES) if kind == "move" else rng.choice(POKEMON),
+            "user": actor(player),
+            "targets": [actor(opponent) for _ in range(rng.randint(0, 2))],
+        }
+
+    return {
+        "training": {
+            "id": "6650f0c2a1b2c3d4e5f60718",
+            "name": "Benchmark training",
+            "description": "Synthetic training",
+            "isDefault": False,
+            "season": 2025,
+            "format": "VGC 2025 Reg G",
+            "createdAt": "2025-01-01T00:00:00.000Z",
+            "updatedAt": "2025-01-01T00:00:00.000Z",
+            "battles": [
+                {
+                    "id": f"{battle:024x}",
+                    "name": f"Battle {battle}",
+                    "result": rng.choice(["win", "loose", "tie"]),
+                    "notes": "",
+                    "createdAt": "2025-01-01T00:00:00.000Z",
+                    "updatedAt": "2025-01-01T00:00:00.000Z",
+                    "turns": [
+                        {
+                            "index": turn,
+                            "actions": [action(i) for i in range(rng.randint(2, 6))],
+                        }
+                        for turn in range(1, turns + 1)
+                    ],
+                }
+                for battle in range(battles)
+            ],
+        }
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--battles", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_training(args.battles, args.turns)
+    json_bytes = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    compact_bytes = encode(payload)
+    assert decode(compact_bytes) == json.loads(json_bytes)
+
+    def best(fn) -> float:
+        return min(timeit.repeat(fn, number=1, repeat=args.repeat))
+
+    json_time = best(lambda: json.loads(json_bytes))
+    compact_time = best(lambda: decode(compact_bytes))
+    rows = [
+        ("json", len(json_bytes), len(gzip.compress(json_bytes)), json_time),
+        (
+            "compact",
+            len(compact_bytes),
+            len(gzip.compress(compact_bytes)),
+            compact_time,
+        ),
+    ]
+
+    print(f"{args.battles} battles x {args.turns} turns")
+    print(f"{'format':<10}{'bytes':>12}{'gzip bytes':>14}{'decode ms':>12}")
+    for name, size, gzip_size, seconds in rows:
+        print(f"{name:<10}{size:>12}{gzip_size:>14}{seconds * 1000:>12.2f}")
+    print(f"compact/json size: {len(compact_bytes) / len(json_bytes):.2f}")
+
+
+if __name__ == "__main__":
+    main()
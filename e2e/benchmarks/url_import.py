@@ -0,0 +1,68 @@
+"""
+Throughput benchmark of tournament URL imports against the local pokedata server.
+
+Starts the pokedata stand-in server, submits URL imports of synthetic events of
+each size to the running app, waits for the import jobs and reports the players
+imported per second. The app must be started with POKEAPI_URL pointing to the
+stand-in server (see README) so that no request leaves the machine.
+
+Usage (from the e2e directory):
+    uv run python -m benchmarks.url_import --players 100 1000 10000 --imports 4
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.util.api import create_authenticated_api
+from src.util.data import load_users
+from src.util.pokedata_server import PokedataServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--imports", type=int, default=1, help="imports per size")
+    parser.add_argument("--username", default="mew", help="admin user")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    password = load_users()[args.username]["password"]
+    api = create_authenticated_api(args.username, password)
+
+    with PokedataServer(latency=args.latency, bandwidth=args.bandwidth) as server:
+        print(f"{'players':>8}{'imports':>9}{'seconds':>10}{'players/s':>12}")
+        for players in args.players:
+            start = time.perf_counter()
+            jobs = [
+                api.submit_tournament_import(
+                    f"benchmark {players} #{i}",
+                    2025,
+                    "reg h",
+                    server.standings_url(players, seed=i),
+                )
+                for i in range(args.imports)
+            ]
+            with ThreadPoolExecutor(max_workers=args.imports) as executor:
+                tournaments = list(
+                    executor.map(
+                        lambda job: api.wait_for_tournament(job.id, args.timeout),
+                        jobs,
+                    )
+                )
+            seconds = time.perf_counter() - start
+
+            imported = sum(len(tournament.teams) for tournament in tournaments)
+            print(
+                f"{players:>8}{args.imports:>9}{seconds:>10.2f}"
+                f"{imported / seconds:>12.1f}"
+            )
+            for tournament in tournaments:
+                if tournament.id is not None:
+                    api.delete_tournament(tournament.id)
+
+
+if __name__ == "__main__":
+    main()
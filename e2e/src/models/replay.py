@@ -0,0 +1,14 @@
+from dataclasses import dataclass, field
+from typing import Union
+
+
+@dataclass
+class ReplayIndexEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    log_start: int
+    log_end: int
+    sha256: str
+    format: Union[str, None] = None
+    players: list[str] = field(default_factory=list)
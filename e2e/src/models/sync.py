@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Union
+
+from src.models.team import Team
+from src.models.training import Training
+
+
+@dataclass
+class TeamChanges:
+    teams: list[Team]
+    synced_at: str
+    team_ids: Union[list[str], None] = None
+
+
+@dataclass
+class TrainingChanges:
+    trainings: list[Training]
+    synced_at: str
+    training_ids: Union[list[str], None] = None
@@ -2,6 +2,15 @@ from dataclasses import dataclass, field
 from typing import List, Union
 
 
+@dataclass
+class PokemonSet:
+    species: str
+    item: Union[str, None] = None
+    ability: Union[str, None] = None
+    tera_type: Union[str, None] = None
+    moves: list[str] = field(default_factory=list)
+
+
 @dataclass
 class Team:
     name: str
@@ -11,3 +20,4 @@ class Team:
     id: Union[str, None] = None
     description: str = ""
     tags: list[str] = field(default_factory=list)
+    parsed_team: Union[list[PokemonSet], None] = None
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+@dataclass
+class TimedResponse:
+    data: Dict[str, Any]
+    # Seconds from sending the request to the decoded content
+    seconds: float
+    # Size of the response body, as sent
+    bytes: int
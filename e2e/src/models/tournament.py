@@ -17,3 +17,17 @@ class Tournament:
     id: Union[str, None] = None
     teams: list[TournamentTeam] = field(default_factory=list)
     source: Optional[str] = None
+
+
+@dataclass
+class TournamentImportJob:
+    id: str
+    status: str
+    name: str
+    season: int
+    format: str
+    url: str
+    tournament_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
@@ -30,6 +30,7 @@ class Battle:
     team_id: Union[str, None] = None
     id: Union[str, None] = None
     turns: list[Turn] = field(default_factory=list)
+    result: Union[str, None] = None
 
 
 @dataclass
@@ -43,3 +44,4 @@ class Training:
     is_default: bool = False
     id: Union[str, None] = None
     battles: list[Battle] = field(default_factory=list)
+    version: Union[int, None] = None
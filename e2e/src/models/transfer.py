@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class AccountTransferStats:
+    teams: int = 0
+    trainings: int = 0
+    battles: int = 0
+    tournaments: int = 0
+    skipped: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    records_per_second: float = 0.0
+    bytes_per_second: float = 0.0
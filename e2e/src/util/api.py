@@ -6,19 +6,45 @@ available in the application, including authentication, user management, teams,
 trainings, and tournaments.
 """
 
+import gzip
 import json
-from typing import Any, Dict, List, Optional, Union
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from urllib.parse import urljoin
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from src.models.sync import TeamChanges, TrainingChanges
 from src.models.team import Team
-from src.models.tournament import Tournament, TournamentTeam
+from src.models.timing import TimedResponse
+from src.models.tournament import Tournament, TournamentImportJob, TournamentTeam
 from src.models.training import Action, Battle, Training, Turn
+from src.models.transfer import AccountTransferStats
 from src.models.user import User
+from src.util.compact import COMPACT_CONTENT_TYPE, CompactDecodeError, decode
 from src.util.constants import NEXT_PUBLIC_APP_URL
+from src.util.metagame import MetagameTrends
+from src.util.result_cache import ResultCache
+from src.util.team_parser import TeamParseCache, parse_team
+
+ACCOUNT_EXPORT_VERSION = 1
 
 
 class APIError(Exception):
@@ -35,6 +61,14 @@ class APIError(Exception):
         self.response = response
 
 
+class TournamentImportError(APIError):
+    """Raised when a tournament import job failed on the server."""
+
+    def __init__(self, job: TournamentImportJob):
+        super().__init__(f"Tournament import {job.id} failed: {job.error}")
+        self.job = job
+
+
 class IncineroarAPI:
     """
     API wrapper for the Incineroar NextJS application.
@@ -43,16 +77,48 @@ class IncineroarAPI:
     including authentication, user management, teams, trainings, and tournaments.
     """
 
-    def __init__(self, base_url: str = NEXT_PUBLIC_APP_URL, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str = NEXT_PUBLIC_APP_URL,
+        timeout: int = 30,
+        parse_teams: bool = False,
+        team_parse_cache: Optional[TeamParseCache] = None,
+        metagame_trends: Optional[MetagameTrends] = None,
+        compact: bool = True,
+        result_cache: Optional[ResultCache] = None,
+        run_id: Optional[str] = None,
+    ):
         """
         Initialize the API client.
 
         Args:
             base_url: The base URL of the API (defaults to NEXT_PUBLIC_APP_URL from constants)
             timeout: Request timeout in seconds
+            parse_teams: Attach the parsed form of the team data to every returned
+                Team (including Battle.team and Training.team) as `parsed_team`
+            team_parse_cache: Cache used when parsing teams (defaults to the
+                shared module-level cache)
+            metagame_trends: Aggregator kept up to date with the tournaments
+                created and deleted through this client
+            compact: Ask for the compact binary encoding, which the training
+                and battle routes use instead of JSON when supported; every
+                response is decoded by its Content-Type. Turn off to debug
+                readable traffic in proxies and logs
+            result_cache: On-disk cache used by `analyze_training`
+            run_id: Test run id sent with every request, the entities created
+                through this client are tagged with it (on servers started
+                with ENABLE_TEST_ROUTES=true)
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.parse_teams = parse_teams
+        self.team_parse_cache = team_parse_cache
+        self.metagame_trends = metagame_trends
+        self.result_cache = result_cache
+        # training_id -> (ETag, training version, analysis)
+        self._analysis_memo: Dict[str, Tuple[str, Optional[int], Dict[str, Any]]] = {}
+        # Version of the server analytics, from the last analysis response
+        self.analytics_version: Optional[str] = None
         self.session = requests.Session()
         self._jwt_token: Optional[str] = None
 
@@ -70,9 +136,15 @@ class IncineroarAPI:
         self.session.headers.update(
             {
                 "Content-Type": "application/json",
-                "Accept": "application/json",
+                "Accept": (
+                    f"{COMPACT_CONTENT_TYPE}, application/json;q=0.9"
+                    if compact
+                    else "application/json"
+                ),
             }
         )
+        if run_id is not None:
+            self.session.headers["X-Run-Id"] = run_id
 
     def _get_url(self, endpoint: str) -> str:
         """Construct the full URL for an endpoint."""
@@ -102,7 +174,36 @@ class IncineroarAPI:
             auth_required: Whether authentication is required for this endpoint
 
         Returns:
-            JSON response as a dictionary
+            Decoded response (JSON or compact) as a dictionary
+
+        Raises:
+            APIError: If the request fails
+        """
+        _, response_data = self._send(method, endpoint, data, params, auth_required)
+        return response_data
+
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        auth_required: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[requests.Response, Dict[str, Any]]:
+        """
+        Make an HTTP request to the API, keeping access to the response.
+
+        Args:
+            method: HTTP method (GET, POST, DELETE, etc.)
+            endpoint: API endpoint
+            data: Request payload for POST/PUT requests
+            params: Query parameters
+            auth_required: Whether authentication is required for this endpoint
+            headers: Extra headers for this request
+
+        Returns:
+            Tuple with the response and its decoded content
 
         Raises:
             APIError: If the request fails
@@ -118,13 +219,26 @@ class IncineroarAPI:
                 url=url,
                 json=data if data is not None else None,
                 params=params,
+                headers=headers,
                 timeout=self.timeout,
             )
 
-            # Try to parse JSON response
+            # Try to parse compact or JSON response
             try:
-                response_data = response.json()
-            except json.JSONDecodeError:
+                content_type = response.headers.get("Content-Type", "")
+                if content_type.startswith(COMPACT_CONTENT_TYPE):
+                    response_data = decode(response.content)
+                else:
+                    response_data = response.json()
+            except CompactDecodeError as e:
+                # Not the raw bytes, unreadable in an error message
+                response_data = {
+                    "message": (
+                        f"Invalid compact response of {len(response.content)} "
+                        f"bytes: {e}"
+                    )
+                }
+            except ValueError:
                 response_data = {"message": response.text or "No response content"}
 
             if not response.ok:
@@ -137,7 +251,7 @@ class IncineroarAPI:
                     response=response_data,
                 )
 
-            return response_data
+            return response, response_data
 
         except requests.RequestException as e:
             raise APIError(f"Request failed: {str(e)}")
@@ -146,6 +260,9 @@ class IncineroarAPI:
 
     def _dict_to_team(self, data: Dict[str, Any]) -> Team:
         """Convert dictionary to Team instance."""
+        parsed_team = None
+        if self.parse_teams:
+            parsed_team = parse_team(data["data"], self.team_parse_cache)
         return Team(
             name=data["name"],
             season=data["season"],
@@ -154,6 +271,7 @@ class IncineroarAPI:
             id=data.get("id"),
             description=data.get("description", ""),
             tags=data.get("tags", []),
+            parsed_team=parsed_team,
         )
 
     def _team_to_dict(self, team: Team) -> Dict[str, Any]:
@@ -193,6 +311,23 @@ class IncineroarAPI:
             teams=teams,
         )
 
+    def _dict_to_tournament_import_job(
+        self, data: Dict[str, Any]
+    ) -> TournamentImportJob:
+        """Convert dictionary to TournamentImportJob instance."""
+        return TournamentImportJob(
+            id=data["id"],
+            status=data["status"],
+            name=data["name"],
+            season=data["season"],
+            format=data["format"],
+            url=data["url"],
+            tournament_id=data.get("tournament"),
+            error=data.get("error"),
+            created_at=data.get("createdAt"),
+            updated_at=data.get("updatedAt"),
+        )
+
     def _tournament_to_dict(self, tournament: Tournament) -> Dict[str, Any]:
         """Convert Tournament instance to dictionary."""
         result = {
@@ -260,6 +395,7 @@ class IncineroarAPI:
             team_id=data.get("team_id"),
             id=data.get("id"),
             turns=turns,
+            result=data.get("result"),
         )
 
     def _battle_to_dict(self, battle: Battle) -> Dict[str, Any]:
@@ -279,6 +415,8 @@ class IncineroarAPI:
             result["team_id"] = battle.team_id
         if battle.id is not None:
             result["id"] = battle.id
+        if battle.result is not None:
+            result["result"] = battle.result
         return result
 
     def _dict_to_training(self, data: Dict[str, Any]) -> Training:
@@ -292,13 +430,15 @@ class IncineroarAPI:
 
         return Training(
             name=data["name"],
+            description=data.get("description", ""),
             season=data.get("season"),
             format=data.get("format"),
             team=team,
             team_id=data.get("team_id"),
-            is_default=data.get("is_default", False),
+            is_default=data.get("isDefault", False),
             id=data.get("id"),
             battles=battles,
+            version=data.get("version"),
         )
 
     def _training_to_dict(self, training: Training) -> Dict[str, Any]:
@@ -442,6 +582,35 @@ class IncineroarAPI:
             tags=team.tags,
         )
 
+    def get_teams(self) -> List[Team]:
+        """
+        Get all teams for the authenticated user.
+
+        Returns:
+            List of Team instances
+        """
+        return self.get_team_changes().teams
+
+    def get_team_changes(self, updated_since: Optional[str] = None) -> TeamChanges:
+        """
+        Get the teams created or updated since a given time.
+
+        Args:
+            updated_since: ISO timestamp, usually the `synced_at` of a previous
+                call. All teams are returned when omitted
+
+        Returns:
+            TeamChanges with the changed teams, the server time to use as next
+            `updated_since` and, when filtering, the ids of all existing teams
+        """
+        params = {"updatedSince": updated_since} if updated_since else None
+        response = self._make_request("GET", "user/team", params=params)
+        return TeamChanges(
+            teams=[self._dict_to_team(team_data) for team_data in response["teams"]],
+            synced_at=response["syncedAt"],
+            team_ids=response.get("teamIds"),
+        )
+
     def get_team_by_id(self, team_id: str) -> Team:
         """
         Get a specific team by ID for the authenticated user.
@@ -477,11 +646,36 @@ class IncineroarAPI:
         Returns:
             List of Training instances
         """
-        response = self._make_request("GET", "user/training")
-        return [
-            self._dict_to_training(training_data)
-            for training_data in response["trainings"]
-        ]
+        return self.get_training_changes().trainings
+
+    def get_training_changes(
+        self, updated_since: Optional[str] = None
+    ) -> TrainingChanges:
+        """
+        Get the trainings that changed since a given time.
+
+        A training is considered changed when the training, its team or any of
+        its battles were created or updated after `updated_since`.
+
+        Args:
+            updated_since: ISO timestamp, usually the `synced_at` of a previous
+                call. All trainings are returned when omitted
+
+        Returns:
+            TrainingChanges with the changed trainings, the server time to use as
+            next `updated_since` and, when filtering, the ids of all existing
+            trainings
+        """
+        params = {"updatedSince": updated_since} if updated_since else None
+        response = self._make_request("GET", "user/training", params=params)
+        return TrainingChanges(
+            trainings=[
+                self._dict_to_training(training_data)
+                for training_data in response["trainings"]
+            ],
+            synced_at=response["syncedAt"],
+            training_ids=response.get("trainingIds"),
+        )
 
     def create_training(self, **training_data) -> Training:
         """
@@ -533,20 +727,117 @@ class IncineroarAPI:
             True if successful
         """
         response = self._make_request("DELETE", f"user/training/{training_id}")
+        self.invalidate_training_analysis(training_id)
         return response.get("success", False)
 
-    def get_training_analysis(self, training_id: str) -> Dict[str, Any]:
+    def get_training_analysis(
+        self, training_id: str, version: Optional[int] = None, full: bool = False
+    ) -> Dict[str, Any]:
         """
         Get analysis for a specific training.
 
+        Analyses are memoized by training. When the memoized analysis was
+        computed for `version`, it is returned without a request, otherwise
+        it is revalidated with its ETag and only downloaded again if the
+        training changed.
+
         Args:
             training_id: Training ID
+            version: Training version known by the caller (`Training.version`)
+            full: Make the server rebuild the analysis from every battle
+                instead of its incrementally updated aggregate, bypassing
+                the memo
 
         Returns:
             Training analysis data
         """
-        response = self._make_request("GET", f"user/training/{training_id}/analyze")
-        return response["analysis"]
+        memo = None if full else self._analysis_memo.get(training_id)
+        if memo is not None and version is not None and memo[1] == version:
+            return memo[2]
+
+        headers = {"If-None-Match": memo[0]} if memo is not None else None
+        response, response_data = self._send(
+            "GET",
+            f"user/training/{training_id}/analyze",
+            params={"full": "true"} if full else None,
+            headers=headers,
+        )
+        server_version = response.headers.get("X-Training-Version")
+        server_version = int(server_version) if server_version else None
+        self.analytics_version = response.headers.get(
+            "X-Analytics-Version", self.analytics_version
+        )
+        if response.status_code == 304 and memo is not None:
+            self._analysis_memo[training_id] = (memo[0], server_version, memo[2])
+            return memo[2]
+
+        analysis = response_data["analysis"]
+        etag = response.headers.get("ETag")
+        if etag:
+            self._analysis_memo[training_id] = (etag, server_version, analysis)
+        return analysis
+
+    def time_training_analysis(
+        self, training_id: str, full: bool = False
+    ) -> TimedResponse:
+        """
+        Get the analysis of a training with its latency and size, for
+        benchmarks. The memo is neither used nor updated.
+
+        Args:
+            training_id: Training ID
+            full: Make the server rebuild the analysis from every battle
+
+        Returns:
+            TimedResponse with the response content
+        """
+        start = time.perf_counter()
+        response, response_data = self._send(
+            "GET",
+            f"user/training/{training_id}/analyze",
+            params={"full": "true"} if full else None,
+        )
+        return TimedResponse(
+            response_data, time.perf_counter() - start, len(response.content)
+        )
+
+    def invalidate_training_analysis(self, training_id: Optional[str] = None) -> None:
+        """
+        Forget the memoized analysis of a training, or of every training.
+
+        Args:
+            training_id: Training ID, all trainings when omitted
+        """
+        if training_id is None:
+            self._analysis_memo.clear()
+        else:
+            self._analysis_memo.pop(training_id, None)
+
+    def analyze_training(self, training: Training) -> Dict[str, Any]:
+        """
+        Get the analysis of a training, reusing the result cache when a training
+        with the same content was already analyzed by the same version of the
+        server analytics. That version is known from the first analysis
+        response, which is never read from the cache.
+
+        Args:
+            training: Training with its battles, as returned by the API
+
+        Returns:
+            Training analysis data
+        """
+        if self.result_cache is None:
+            return self.get_training_analysis(training.id, training.version)
+        analysis = None
+        if self.analytics_version is not None:
+            analysis = self.result_cache.get_analysis(training, self.analytics_version)
+        if analysis is None:
+            analysis = self.get_training_analysis(training.id, training.version)
+            if self.analytics_version is not None:
+                self.result_cache.put_analysis(
+                    training, self.analytics_version, analysis
+                )
+        return analysis
 
     # Battle methods
 
@@ -580,6 +871,7 @@ class IncineroarAPI:
         response = self._make_request(
             "POST", f"user/training/{training_id}/battle", data=battle_data
         )
+        self.invalidate_training_analysis(training_id)
         return self._dict_to_battle(response["battle"])
 
     def create_training_battle_from_model(
@@ -628,6 +920,7 @@ class IncineroarAPI:
         response = self._make_request(
             "DELETE", f"user/training/{training_id}/battle/{battle_id}"
         )
+        self.invalidate_training_analysis(training_id)
         return response.get("success", False)
 
     # Tournament methods
@@ -651,6 +944,9 @@ class IncineroarAPI:
         """
         Create a new tournament (admin only).
 
+        URL sources are imported by a server job, see `submit_tournament_import`,
+        and the call returns once the job finished.
+
         Args:
             name: Tournament name
             season: Season number
@@ -664,6 +960,10 @@ class IncineroarAPI:
         if source not in ["pokedata", "pokedata_url"]:
             raise ValueError("source must be either 'pokedata' or 'pokedata_url'")
 
+        if source == "pokedata_url":
+            job = self.submit_tournament_import(name, season, format, data)
+            return self.wait_for_tournament(job.id)
+
         payload = {
             "name": name,
             "season": season,
@@ -673,7 +973,10 @@ class IncineroarAPI:
         }
 
         response = self._make_request("POST", "tournament", data=payload)
-        return self._dict_to_tournament(response["tournament"])
+        tournament = self._dict_to_tournament(response["tournament"])
+        if self.metagame_trends is not None:
+            self.metagame_trends.add_tournament(tournament)
+        return tournament
 
     def create_tournament_from_model(self, tournament: Tournament) -> Tournament:
         """
@@ -719,14 +1022,411 @@ class IncineroarAPI:
             True if successful
         """
         response = self._make_request("DELETE", f"tournament/{tournament_id}")
-        return response.get("success", False)
+        success = response.get("success", False)
+        if success and self.metagame_trends is not None:
+            self.metagame_trends.remove_tournament(tournament_id)
+        return success
+
+    def submit_tournament_import(
+        self, name: str, season: int, format: str, url: str
+    ) -> TournamentImportJob:
+        """
+        Queue the import of a tournament from a pokedata URL (admin only).
+
+        The server fetches and parses the URL in the background, so many
+        imports can be submitted without waiting for each other.
+
+        Args:
+            name: Tournament name
+            season: Season number
+            format: Format string
+            url: Pokedata URL
+
+        Returns:
+            Queued import job
+        """
+        payload = {
+            "name": name,
+            "season": season,
+            "format": format,
+            "source": "pokedata_url",
+            "data": url,
+        }
+        response = self._make_request("POST", "tournament/import", data=payload)
+        return self._dict_to_tournament_import_job(response["job"])
+
+    def get_tournament_import(self, job_id: str) -> TournamentImportJob:
+        """
+        Get the current state of a tournament import job (admin only).
+
+        Args:
+            job_id: Import job ID
+
+        Returns:
+            TournamentImportJob instance
+        """
+        response = self._make_request("GET", f"tournament/import/{job_id}")
+        return self._dict_to_tournament_import_job(response["job"])
+
+    def wait_for_tournament(
+        self,
+        job_id: str,
+        timeout: float = 60.0,
+        initial_interval: float = 0.1,
+        max_interval: float = 2.0,
+    ) -> Tournament:
+        """
+        Poll an import job until it finishes and return the created tournament.
+
+        The polling interval doubles after every poll up to `max_interval`,
+        with random jitter so concurrent waiters do not poll in lockstep.
+
+        Args:
+            job_id: Import job ID
+            timeout: Maximum time to wait in seconds
+            initial_interval: Delay before the second poll in seconds
+            max_interval: Maximum delay between polls in seconds
+
+        Returns:
+            Created Tournament instance
+
+        Raises:
+            TournamentImportError: If the import failed
+            TimeoutError: If the job did not finish within `timeout`
+        """
+        deadline = time.monotonic() + timeout
+        interval = initial_interval
+        while True:
+            job = self.get_tournament_import(job_id)
+            if job.status == "succeeded" and job.tournament_id is not None:
+                tournament = self.get_tournament_by_id(job.tournament_id)
+                if self.metagame_trends is not None:
+                    self.metagame_trends.add_tournament(tournament)
+                return tournament
+            if job.status == "failed":
+                raise TournamentImportError(job)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Tournament import {job_id} still {job.status} after {timeout}s"
+                )
+            time.sleep(min(random.uniform(interval / 2, interval), remaining))
+            interval = min(interval * 2, max_interval)
+
+    # Test run methods
+
+    def delete_test_runs(
+        self, run_id: Optional[str] = None, before: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Delete everything created by a test run, or by any test run before a
+        date (admin only, on servers started with ENABLE_TEST_ROUTES=true).
+
+        Args:
+            run_id: Test run ID, see `run_id` of the client
+            before: Creation date before which test runs are deleted
+
+        Returns:
+            Number of deleted teams, trainings, battles, tournaments and
+            tournament imports
+        """
+        if (run_id is None) == (before is None):
+            raise ValueError("Expected either a run_id or a before date")
+        params = (
+            {"runId": run_id} if run_id is not None else {"before": before.isoformat()}
+        )
+        response = self._make_request("DELETE", "test/runs", params=params)
+        return response["deleted"]
+
+    # Account export/import methods
+
+    def _list_ids(self, endpoint: str, key: str) -> List[str]:
+        """List the ids of teams, trainings or tournaments without their content."""
+        response = self._make_request("GET", endpoint, params={"idsOnly": "true"})
+        return response[key]
+
+    @staticmethod
+    def _map_bounded(
+        executor: ThreadPoolExecutor, fn: Callable, items: Iterable, window: int
+    ) -> Iterator:
+        """Like executor.map, but with at most `window` calls in flight."""
+        pending: deque = deque()
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    @staticmethod
+    def _ref_id(value: Any) -> Optional[str]:
+        """Id of a reference that may or may not have been populated."""
+        if isinstance(value, dict):
+            return value.get("id")
+        return value
+
+    @staticmethod
+    def _finish_transfer_stats(
+        stats: AccountTransferStats, path: Union[str, os.PathLike], start: float
+    ) -> AccountTransferStats:
+        stats.bytes = os.path.getsize(path)
+        stats.seconds = time.perf_counter() - start
+        if stats.seconds > 0:
+            records = (
+                stats.teams
+                + stats.trainings
+                + stats.battles
+                + stats.tournaments
+                + stats.skipped
+            )
+            stats.records_per_second = records / stats.seconds
+            stats.bytes_per_second = stats.bytes / stats.seconds
+        return stats
+
+    def export_account(
+        self,
+        path: Union[str, os.PathLike],
+        include_tournaments: bool = True,
+        max_workers: int = 8,
+    ) -> AccountTransferStats:
+        """
+        Export the authenticated user's data to a gzip compressed NDJSON file.
+
+        Every line is a `{"type": ..., "data": ...}` record: a header, then the
+        teams, each training followed by its battles, and the tournaments.
+        Populated team references are replaced by the team id. Entities are
+        fetched one at a time, so memory stays bounded by the largest training
+        or tournament instead of the size of the account.
+
+        Args:
+            path: Destination file
+            include_tournaments: Also export the tournaments, which are shared
+                by every user
+            max_workers: Number of concurrent requests
+
+        Returns:
+            AccountTransferStats with the exported counts and throughput
+        """
+        start = time.perf_counter()
+        stats = AccountTransferStats()
+        window = max_workers * 2
+
+        def get_team(team_id: str) -> Dict[str, Any]:
+            return self._make_request("GET", f"user/team/{team_id}")["team"]
+
+        def get_training(training_id: str) -> Dict[str, Any]:
+            response = self._make_request("GET", f"user/training/{training_id}")
+            return response["training"]
+
+        def get_tournament(tournament_id: str) -> Dict[str, Any]:
+            response = self._make_request(
+                "GET", f"tournament/{tournament_id}", params={"analysis": "false"}
+            )
+            return response["tournament"]
+
+        with (
+            gzip.open(path, "wt", encoding="utf-8") as file,
+            ThreadPoolExecutor(max_workers) as executor,
+        ):
+
+            def write(record_type: str, data: Dict[str, Any]) -> None:
+                file.write(json.dumps({"type": record_type, "data": data}) + "\n")
+
+            write(
+                "header",
+                {
+                    "version": ACCOUNT_EXPORT_VERSION,
+                    "exportedAt": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+
+            team_ids = self._list_ids("user/team", "teamIds")
+            for team in self._map_bounded(executor, get_team, team_ids, window):
+                write("team", team)
+                stats.teams += 1
+
+            training_ids = self._list_ids("user/training", "trainingIds")
+            for training in self._map_bounded(
+                executor, get_training, training_ids, window
+            ):
+                battles = training.pop("battles", [])
+                training["team"] = self._ref_id(training.get("team"))
+                write("training", training)
+                stats.trainings += 1
+                for battle in battles:
+                    battle["team"] = self._ref_id(battle.get("team"))
+                    battle["training"] = training["id"]
+                    write("battle", battle)
+                    stats.battles += 1
+
+            if include_tournaments:
+                tournament_ids = self._list_ids("tournament", "tournamentIds")
+                for tournament in self._map_bounded(
+                    executor, get_tournament, tournament_ids, window
+                ):
+                    write("tournament", tournament)
+                    stats.tournaments += 1
+
+        return self._finish_transfer_stats(stats, path, start)
+
+    @staticmethod
+    def _read_account_records(
+        path: Union[str, os.PathLike],
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Lazily read the records of an account export, checking its header."""
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(next(file, "{}"))
+            version = header.get("data", {}).get("version")
+            if header.get("type") != "header" or version != ACCOUNT_EXPORT_VERSION:
+                raise ValueError(f"Unsupported account export version {version}")
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["type"], record["data"]
+
+    def _get_default_training_id(self) -> Optional[str]:
+        """Id of the authenticated user's default training."""
+        response = self._make_request(
+            "GET", "user/training", params={"idsOnly": "true"}
+        )
+        return response.get("defaultTrainingId")
+
+    def import_account(
+        self,
+        path: Union[str, os.PathLike],
+        batch_size: int = 50,
+        max_workers: int = 8,
+    ) -> AccountTransferStats:
+        """
+        Import a file created by `export_account` into the authenticated user.
+
+        Records are read lazily, buffered by type and created in batches of
+        concurrent requests.
+        Exported team and training ids are remapped to the newly created ones,
+        battles are added to their training in their original order and the
+        exported default training is merged into the user's default training.
+        Tournaments are shared and created by admins from raw pokedata, which
+        is not part of the export, so they are counted as skipped.
+
+        Args:
+            path: File created by `export_account`
+            batch_size: Maximum number of records of a type created at once
+            max_workers: Number of concurrent requests
+
+        Returns:
+            AccountTransferStats with the imported counts and throughput
+        """
+        start = time.perf_counter()
+        stats = AccountTransferStats()
+        team_ids: Dict[str, str] = {}
+        training_ids: Dict[str, str] = {}
+        default_training_id: List[Optional[str]] = []
+
+        def create_team(team: Dict[str, Any]) -> Tuple[str, str]:
+            created = self.create_team(
+                data=team["data"],
+                name=team["name"],
+                description=team.get("description", ""),
+                season=team["season"],
+                format=team["format"],
+                tags=team.get("tags", []),
+            )
+            return team["id"], created.id
+
+        def create_training(training: Dict[str, Any]) -> Tuple[str, str]:
+            payload = {
+                "name": training["name"],
+                "description": training.get("description", ""),
+            }
+            for key in ("season", "format"):
+                if training.get(key) is not None:
+                    payload[key] = training[key]
+            if training.get("team") in team_ids:
+                payload["teamId"] = team_ids[training["team"]]
+            response = self._make_request("POST", "user/training", data=payload)
+            return training["id"], response["training"]["id"]
+
+        def create_battles(battles: List[Dict[str, Any]]) -> int:
+            for battle in battles:
+                payload = {
+                    "name": battle["name"],
+                    "notes": battle.get("notes", ""),
+                    "turns": battle.get("turns", []),
+                }
+                if battle.get("result") is not None:
+                    payload["result"] = battle["result"]
+                self._make_request(
+                    "POST",
+                    f"user/training/{training_ids[battle['training']]}/battle",
+                    data=payload,
+                )
+            return len(battles)
+
+        # Buffered by type across the whole file, trainings and battles
+        # alternating in it. Teams are created before the trainings, and
+        # trainings before the battles, that reference them
+        pending: Dict[str, List[Dict[str, Any]]] = {
+            "team": [],
+            "training": [],
+            "battle": [],
+        }
+
+        def flush(record_type: str) -> None:
+            if record_type == "training":
+                flush("team")
+            elif record_type == "battle":
+                flush("training")
+            batch, pending[record_type] = pending[record_type], []
+            if not batch:
+                return
+            if record_type == "team":
+                team_ids.update(executor.map(create_team, batch))
+                stats.teams += len(batch)
+            elif record_type == "training":
+                to_create = []
+                for training in batch:
+                    if not training.get("isDefault"):
+                        to_create.append(training)
+                        continue
+                    if not default_training_id:
+                        default_training_id.append(self._get_default_training_id())
+                    if default_training_id[0] is None:
+                        to_create.append(training)
+                    else:
+                        training_ids[training["id"]] = default_training_id[0]
+                training_ids.update(executor.map(create_training, to_create))
+                stats.trainings += len(batch)
+            else:
+                # Battles of a training are created in order, trainings
+                # concurrently
+                by_training: Dict[str, List[Dict[str, Any]]] = {}
+                for battle in batch:
+                    by_training.setdefault(battle["training"], []).append(battle)
+                stats.battles += sum(executor.map(create_battles, by_training.values()))
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            for record_type, data in self._read_account_records(path):
+                if record_type not in pending:
+                    stats.skipped += 1
+                    continue
+                pending[record_type].append(data)
+                if len(pending[record_type]) >= batch_size:
+                    flush(record_type)
+            flush("battle")
+
+        return self._finish_transfer_stats(stats, path, start)
 
 
 # Convenience functions for common operations
 
 
 def create_authenticated_api(
-    username: str, password: str, base_url: str = NEXT_PUBLIC_APP_URL
+    username: str,
+    password: str,
+    base_url: str = NEXT_PUBLIC_APP_URL,
+    run_id: Optional[str] = None,
+    compact: bool = True,
 ) -> IncineroarAPI:
     """
     Create and authenticate an API client in one step.
@@ -735,11 +1435,14 @@ def create_authenticated_api(
         username: User's username
         password: User's password
         base_url: API base URL
+        run_id: Test run id tagging the entities created by the client
+        compact: Ask for the compact binary encoding of the training routes,
+            False to debug readable JSON traffic
 
     Returns:
         Authenticated IncineroarAPI instance
     """
-    api = IncineroarAPI(base_url)
+    api = IncineroarAPI(base_url, compact=compact, run_id=run_id)
     api.authenticate(username, password)
     return api
 
@@ -0,0 +1,207 @@
+"""
+Production builds of the app, started by the tests.
+
+With `E2E_APP_SERVER=true` the tests run against `next start` instead of an
+app started by hand. The app is built once per session, and the build is
+reused while the hash of its sources (and of the `NEXT_PUBLIC_` variables
+inlined into it) is unchanged. Each pytest-xdist worker then starts its own
+instance on a free port, waits until it responds and stops it at the end of
+the session. A production build compiles nothing on request and serves pages
+much faster than the development server, like the deployed app.
+
+Usage (from the e2e directory):
+    uv run python -m src.util.app_server --port 3000
+"""
+
+import argparse
+import hashlib
+import os
+import signal
+import socket
+import subprocess
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Dict, Optional, Type
+
+import requests
+
+APP_DIR = Path(__file__).resolve().parents[3]
+BUILD_DIR = APP_DIR / ".next"
+# Hash of the sources of the build in BUILD_DIR
+BUILD_HASH_FILE = BUILD_DIR / "e2e-build.sha256"
+LOG_DIR = Path(__file__).resolve().parents[2] / ".app-server"
+# Files and directories the build depends on
+BUILD_SOURCES = [
+    "app",
+    "src",
+    "public",
+    ".env",
+    "instrumentation.ts",
+    "next.config.ts",
+    "package-lock.json",
+    "package.json",
+    "postcss.config.mjs",
+    "proxy.ts",
+    "tsconfig.json",
+]
+# Seconds between the attempts to reach a starting instance
+POLL_INTERVAL = 0.25
+
+
+def source_hash() -> str:
+    """Hash of the build sources and of the inlined environment variables."""
+    digest = hashlib.sha256()
+    for source in BUILD_SOURCES:
+        path = APP_DIR / source
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            if file.is_file():
+                digest.update(str(file.relative_to(APP_DIR)).encode())
+                digest.update(file.read_bytes())
+    for name, value in sorted(os.environ.items()):
+        if name.startswith("NEXT_PUBLIC_"):
+            digest.update(f"{name}={value}".encode())
+    return digest.hexdigest()
+
+
+def build(force: bool = False) -> bool:
+    """
+    Builds the app, unless the last build has the same sources.
+
+    Args:
+        force: Build even when the sources are unchanged
+
+    Returns:
+        Whether the app was built
+
+    Raises:
+        subprocess.CalledProcessError: If the build fails
+    """
+    current = source_hash()
+    if (
+        not force
+        and (BUILD_DIR / "BUILD_ID").is_file()
+        and BUILD_HASH_FILE.is_file()
+        and BUILD_HASH_FILE.read_text().strip() == current
+    ):
+        return False
+    BUILD_HASH_FILE.unlink(missing_ok=True)
+    subprocess.run(["npm", "run", "build"], cwd=APP_DIR, check=True)
+    BUILD_HASH_FILE.write_text(current + "\n")
+    return True
+
+
+class AppServerError(Exception):
+    """The app did not start."""
+
+
+class AppServer:
+    """`next start` instance of the last build, on a port."""
+
+    def __init__(
+        self,
+        port: int,
+        env: Optional[Dict[str, str]] = None,
+        name: Optional[str] = None,
+        reservation: Optional[socket.socket] = None,
+    ):
+        """
+        Args:
+            port: Port to listen on
+            env: Environment variables of the app, besides the current ones
+            name: Name of the instance, for its log file
+            reservation: Socket bound to the port, keeping other processes
+                from taking it, closed right before the instance starts
+        """
+        self.port = port
+        self.url = f"http://localhost:{port}"
+        # Only ever started by the tests, see ENABLE_TEST_ROUTES in example.env
+        self.env = {**os.environ, "ENABLE_TEST_ROUTES": "true", **(env or {})}
+        self.log_path = LOG_DIR / f"{name or port}.log"
+        self.process: Optional[subprocess.Popen[bytes]] = None
+        self.reservation = reservation
+
+    def start(self, timeout: float = 60):
+        """
+        Starts the instance and waits until it responds.
+
+        Raises:
+            AppServerError: If it exits or does not respond in time
+        """
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.reservation is not None:
+            self.reservation.close()
+            self.reservation = None
+        with open(self.log_path, "wb") as log:
+            # In a process group of its own, with the node process npx starts
+            self.process = subprocess.Popen(
+                ["npx", "next", "start", "--port", str(self.port)],
+                cwd=APP_DIR,
+                env=self.env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                if b"EADDRINUSE" in self.log_path.read_bytes():
+                    raise AppServerError(
+                        f"Port {self.port} is taken by another process, "
+                        f"see {self.log_path}"
+                    )
+                raise AppServerError(
+                    f"{self.url} exited with {self.process.returncode}, "
+                    f"see {self.log_path}"
+                )
+            try:
+                requests.get(self.url, timeout=POLL_INTERVAL * 4)
+                return
+            except requests.RequestException:
+                time.sleep(POLL_INTERVAL)
+        self.stop()
+        raise AppServerError(f"{self.url} did not respond, see {self.log_path}")
+
+    def stop(self, timeout: float = 10):
+        """Stops the instance, killed if it does not stop in time."""
+        if self.process is None or self.process.poll() is not None:
+            return
+        os.killpg(self.process.pid, signal.SIGTERM)
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+
+    def __enter__(self) -> "AppServer":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ):
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    build(args.rebuild)
+    with AppServer(args.port) as server:
+        print(f"Serving {server.url}, logs in {server.log_path}")
+        try:
+            assert server.process is not None
+            server.process.wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Blocking of the assets no assertion checks in the browser contexts of tests.
+
+Every navigation of the page objects downloads fonts, images (sprites, through
+the Next image optimizer too) and media. The browser contexts of the tests
+abort those requests, or answer them with an empty response (`--stub-assets`),
+by resource type and URL pattern. Tests measuring page performance opt out
+with `@pytest.mark.full_assets`, as do whole runs with `--no-asset-blocking`.
+
+The size and load time of the assets that do load are recorded to a history
+file, from which the bytes and time each test saves are estimated. They are
+recorded as user properties of the tests (in JUnit XML reports, for
+instance) and summed up at the end of the run.
+"""
+
+import fnmatch
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Union
+from urllib.parse import urlsplit
+
+import pytest
+from playwright.sync_api import BrowserContext, Request, Route
+
+ASSET_HISTORY_FILE = Path(__file__).resolve().parents[2] / ".asset_sizes.json"
+DEFAULT_RESOURCE_TYPES = ("font", "image", "media")
+DEFAULT_URL_PATTERNS = ("**/PokeAPI/sprites/**",)
+
+
+def asset_key(url: str) -> str:
+    """URL of an asset without its fragment, the key of its recorded size."""
+    return urlsplit(url)._replace(fragment="").geturl()
+
+
+@dataclass
+class AssetRules:
+    """Requests blocked in the browser contexts."""
+
+    resource_types: Sequence[str] = DEFAULT_RESOURCE_TYPES
+    # Glob patterns of full URLs
+    url_patterns: Sequence[str] = DEFAULT_URL_PATTERNS
+    # Answered with an empty response instead of aborted
+    stub: bool = False
+
+    def blocks(self, request: Request) -> bool:
+        return request.resource_type in self.resource_types or any(
+            fnmatch.fnmatch(request.url, pattern) for pattern in self.url_patterns
+        )
+
+
+@dataclass
+class AssetSize:
+    bytes: int
+    # Seconds from the request to the end of the response
+    seconds: float
+
+
+@dataclass
+class AssetSavings:
+    """
+    Blocked requests of a test, with their estimated size and load time.
+
+    Load times are summed although assets load concurrently, so the time saved
+    is an upper bound.
+    """
+
+    requests: int = 0
+    bytes: int = 0
+    seconds: float = 0
+    # Blocked requests whose size was never recorded
+    unknown: int = 0
+
+    def add(self, other: "AssetSavings"):
+        self.requests += other.requests
+        self.bytes += other.bytes
+        self.seconds += other.seconds
+        self.unknown += other.unknown
+
+
+def load_history(path: Union[str, Path]) -> Dict[str, AssetSize]:
+    """Recorded asset sizes, empty when missing or unreadable."""
+    try:
+        data = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+    return {url: AssetSize(**size) for url, size in data.items()}
+
+
+def save_history(path: Union[str, Path], history: Dict[str, AssetSize]):
+    path = Path(path)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    data = {url: asdict(size) for url, size in sorted(history.items())}
+    tmp_path.write_text(json.dumps(data, indent=2) + "\n")
+    tmp_path.replace(path)
+
+
+class AssetBlockingPlugin:
+    """Blocks assets in the contexts of the tests and reports the savings."""
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.enabled = not config.getoption("no_asset_blocking")
+        self.rules = AssetRules(
+            config.getoption("block_resource_types") or DEFAULT_RESOURCE_TYPES,
+            [*DEFAULT_URL_PATTERNS, *config.getoption("block_url_patterns")],
+            config.getoption("stub_assets"),
+        )
+        self.history = load_history(ASSET_HISTORY_FILE)
+        # Of the tests of this process, by node id
+        self._savings: Dict[str, AssetSavings] = {}
+        self._sizes: Dict[str, Dict[str, AssetSize]] = {}
+        # Of the whole run, on the xdist controller
+        self.savings = AssetSavings()
+        self.tests = 0
+        self.sizes: Dict[str, AssetSize] = {}
+
+    def install(self, context: BrowserContext, item: pytest.Item):
+        """Blocks the assets of a test's context, or records their sizes."""
+        if self.enabled and item.get_closest_marker("full_assets") is None:
+            savings = self._savings.setdefault(item.nodeid, AssetSavings())
+            context.route("**/*", lambda route: self._route(route, savings))
+        else:
+            sizes = self._sizes.setdefault(item.nodeid, {})
+            context.on("requestfinished", lambda request: self._record(request, sizes))
+
+    def _route(self, route: Route, savings: AssetSavings):
+        request = route.request
+        if not self.rules.blocks(request):
+            route.fallback()
+            return
+        savings.requests += 1
+        size = self.history.get(asset_key(request.url))
+        if size is None:
+            savings.unknown += 1
+        else:
+            savings.bytes += size.bytes
+            savings.seconds += size.seconds
+        if self.rules.stub:
+            route.fulfill(status=200, body=b"")
+        else:
+            route.abort("blockedbyclient")
+
+    def _record(self, request: Request, sizes: Dict[str, AssetSize]):
+        if not self.rules.blocks(request):
+            return
+        timing = request.timing
+        sizes[asset_key(request.url)] = AssetSize(
+            request.sizes()["responseBodySize"],
+            max(timing["responseEnd"], 0) / 1000,
+        )
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        # The context of the test is closed by its teardown
+        if call.when != "teardown":
+            return (yield)
+        savings = self._savings.pop(item.nodeid, None)
+        if savings is not None:
+            item.user_properties += [
+                ("blocked_asset_requests", savings.requests),
+                ("blocked_asset_bytes", savings.bytes),
+                ("blocked_asset_seconds", round(savings.seconds, 3)),
+            ]
+        report = yield
+        # Kept on the report, so that they reach the xdist controller
+        report.asset_savings = asdict(savings) if savings else None
+        report.asset_sizes = {
+            url: asdict(size) for url, size in self._sizes.pop(item.nodeid, {}).items()
+        }
+        return report
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport):
+        savings = getattr(report, "asset_savings", None)
+        if savings is not None:
+            self.savings.add(AssetSavings(**savings))
+            self.tests += 1
+        for url, size in getattr(report, "asset_sizes", {}).items():
+            self.sizes[url] = AssetSize(**size)
+
+    def pytest_sessionfinish(self, session: pytest.Session):
+        # Workers report to the controller, which saves the history
+        if hasattr(session.config, "workerinput") or not self.sizes:
+            return
+        save_history(ASSET_HISTORY_FILE, {**self.history, **self.sizes})
+
+    def pytest_terminal_summary(self, terminalreporter: Any):
+        if hasattr(self.config, "workerinput") or not self.tests:
+            return
+        savings = self.savings
+        terminalreporter.write_sep("=", "asset blocking")
+        line = (
+            f"{savings.requests} requests blocked in {self.tests} tests, "
+            f"saving ~{savings.bytes / 1e3:,.0f} kB and ~{savings.seconds:.1f}s "
+            "of loading"
+        )
+        if savings.unknown:
+            line += (
+                f" ({savings.unknown} never loaded yet, run with "
+                "--no-asset-blocking to record their size)"
+            )
+        terminalreporter.write_line(line)
+
+
+def parse_list(value: str) -> List[str]:
+    """Comma-separated option value."""
+    return [item for item in value.split(",") if item]
@@ -0,0 +1,79 @@
+"""
+Cached Playwright storage states of signed in users.
+
+The state of a user holds the `jwt` cookie the sign in form would set, with a
+token from the API. It is saved in `playwright/.auth/{username}.json` and
+reused, by later test runs too, while the API still accepts its token, so UI
+tests start signed in without going through the login form.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Union
+from urllib.parse import urlsplit
+
+from src.models.user import User
+from src.util.api import APIError, IncineroarAPI, create_api_with_token
+from src.util.constants import NEXT_PUBLIC_APP_URL
+from src.util.cookie import get_cookie
+
+AUTH_STATE_DIR = Path(__file__).resolve().parents[2] / "playwright" / ".auth"
+
+
+def jwt_cookie(token: str, base_url: str = NEXT_PUBLIC_APP_URL) -> Dict[str, Any]:
+    """Cookie set by the app on sign in, in the Playwright cookie format."""
+    return {
+        "name": "jwt",
+        "value": token,
+        "domain": urlsplit(base_url).hostname,
+        "path": "/",
+        "expires": -1,
+        "httpOnly": True,
+        "secure": False,
+        "sameSite": "Lax",
+    }
+
+
+def _is_valid(state: Dict[str, Any], base_url: str) -> bool:
+    cookie = get_cookie("jwt", state.get("cookies", []))
+    if cookie is None:
+        return False
+    try:
+        create_api_with_token(cookie["value"], base_url).get_current_user()
+    except APIError:
+        return False
+    return True
+
+
+def load_storage_state(
+    user: User,
+    directory: Union[str, Path] = AUTH_STATE_DIR,
+    base_url: str = NEXT_PUBLIC_APP_URL,
+) -> Dict[str, Any]:
+    """
+    Storage state of a signed in user, authenticating only when needed.
+
+    Args:
+        user: User to sign in
+        directory: Directory of the saved storage states
+        base_url: URL of the app
+
+    Returns:
+        Storage state with the user's `jwt` cookie, usable as the
+        `storage_state` of a browser context
+    """
+    path = Path(directory) / f"{user.username}.json"
+    if path.is_file():
+        state = json.loads(path.read_text())
+        if _is_valid(state, base_url):
+            return state
+
+    token = IncineroarAPI(base_url).authenticate(user.username, user.password)
+    state = {"cookies": [jwt_cookie(token, base_url)], "origins": []}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written then renamed, other test processes may read it concurrently
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(state, indent=2))
+    tmp_path.replace(path)
+    return state
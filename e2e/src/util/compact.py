@@ -0,0 +1,287 @@
+"""
+Compact binary encoding for API payloads and on-disk corpora.
+
+Values are JSON-like (null, booleans, numbers, strings, lists and dicts) and
+every string, object keys included, is written once in a string table and
+referenced by index afterwards. Battle turns repeat keys like `index`, `name`,
+`type`, `user` and `targets`, as well as pokemon and move names, on every
+action, so they shrink to a byte or two each.
+
+Layout: `b"IC"`, version byte, varint string count, strings (varint byte length
+and UTF-8 bytes), then the root value. Each value starts with a tag byte:
+integers are zigzag varints, floats are little-endian float64, strings are
+varint indexes into the table, lists are a varint length followed by the items
+and dicts a varint length followed by (key index, value) pairs.
+
+The server implements the same encoder in `src/utils/compact.ts`.
+"""
+
+import struct
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from src.models.team import Team
+from src.models.training import Action, Battle, Training, Turn
+
+COMPACT_CONTENT_TYPE = "application/vnd.incineroar.compact"
+
+_MAGIC = b"IC"
+_VERSION = 1
+
+_NULL = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STRING = 5
+_LIST = 6
+_DICT = 7
+
+_FLOAT64 = struct.Struct("<d")
+
+
+class CompactDecodeError(ValueError):
+    """Raised when data is not a valid compact payload."""
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        if offset >= len(data):
+            raise CompactDecodeError("Unexpected end of data")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def encode(value: Any) -> bytes:
+    """
+    Encode a JSON-like value.
+
+    Args:
+        value: None, bool, int, float, str, list/tuple or dict with str keys
+
+    Returns:
+        Encoded bytes
+    """
+    strings: Dict[str, int] = {}
+    body = bytearray()
+
+    def write_string(string: str) -> None:
+        index = strings.get(string)
+        if index is None:
+            index = strings[string] = len(strings)
+        _write_varint(body, index)
+
+    def write(value: Any) -> None:
+        if value is None:
+            body.append(_NULL)
+        elif value is True:
+            body.append(_TRUE)
+        elif value is False:
+            body.append(_FALSE)
+        elif isinstance(value, int):
+            body.append(_INT)
+            _write_varint(body, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            body.append(_FLOAT)
+            body.extend(_FLOAT64.pack(value))
+        elif isinstance(value, str):
+            body.append(_STRING)
+            write_string(value)
+        elif isinstance(value, (list, tuple)):
+            body.append(_LIST)
+            _write_varint(body, len(value))
+            for item in value:
+                write(item)
+        elif isinstance(value, dict):
+            body.append(_DICT)
+            _write_varint(body, len(value))
+            for key, item in value.items():
+                write_string(key)
+                write(item)
+        else:
+            raise TypeError(f"Cannot encode {type(value).__name__}")
+
+    write(value)
+
+    out = bytearray(_MAGIC)
+    out.append(_VERSION)
+    _write_varint(out, len(strings))
+    for string in strings:
+        encoded = string.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out.extend(encoded)
+    out.extend(body)
+    return bytes(out)
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decode bytes created by `encode` (or by the server encoder).
+
+    Args:
+        data: Encoded bytes
+
+    Returns:
+        Decoded value
+
+    Raises:
+        CompactDecodeError: If the data is not a valid compact payload
+    """
+    if data[:2] != _MAGIC or len(data) < 3:
+        raise CompactDecodeError("Missing compact header")
+    if data[2] != _VERSION:
+        raise CompactDecodeError(f"Unsupported compact version {data[2]}")
+
+    count, offset = _read_varint(data, 3)
+    strings: List[str] = []
+    try:
+        for _ in range(count):
+            length, offset = _read_varint(data, offset)
+            strings.append(data[offset : offset + length].decode("utf-8"))
+            offset += length
+    except UnicodeDecodeError as e:
+        raise CompactDecodeError(str(e)) from e
+
+    position = offset
+
+    # Hot path: varints below 128 (almost every index and length) are read
+    # inline instead of through _read_varint
+    def varint() -> int:
+        nonlocal position
+        byte = data[position]
+        if byte < 0x80:
+            position += 1
+            return byte
+        value, position = _read_varint(data, position)
+        return value
+
+    def read() -> Any:
+        nonlocal position
+        tag = data[position]
+        position += 1
+        if tag == _STRING:
+            index = data[position]
+            if index < 0x80:
+                position += 1
+                return strings[index]
+            return strings[varint()]
+        if tag == _DICT:
+            result = {}
+            for _ in range(varint()):
+                index = data[position]
+                if index < 0x80:
+                    position += 1
+                    result[strings[index]] = read()
+                else:
+                    result[strings[varint()]] = read()
+            return result
+        if tag == _INT:
+            value = varint()
+            return (value >> 1) ^ -(value & 1)
+        if tag == _LIST:
+            return [read() for _ in range(varint())]
+        if tag == _NULL:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _FLOAT:
+            position += _FLOAT64.size
+            return _FLOAT64.unpack_from(data, position - _FLOAT64.size)[0]
+        raise CompactDecodeError(f"Unknown tag {tag} at offset {position - 1}")
+
+    try:
+        value = read()
+    except (IndexError, struct.error) as e:
+        raise CompactDecodeError("Unexpected end of data") from e
+    if position != len(data):
+        raise CompactDecodeError("Trailing data after value")
+    return value
+
+
+# Model corpora
+
+
+def _team_from_dict(data: Dict[str, Any]) -> Team:
+    return Team(**data)
+
+
+def battle_from_dict(data: Dict[str, Any]) -> Battle:
+    """Rebuild a Battle model from a dictionary created by `battle_to_dict`."""
+    turns = [
+        Turn(index=turn["index"], actions=[Action(**a) for a in turn["actions"]])
+        for turn in data["turns"]
+    ]
+    team = _team_from_dict(data["team"]) if data["team"] else None
+    return Battle(**{**data, "turns": turns, "team": team})
+
+
+def training_from_dict(data: Dict[str, Any]) -> Training:
+    """Rebuild a Training model from a dictionary created by `training_to_dict`."""
+    battles = [battle_from_dict(battle) for battle in data["battles"]]
+    team = _team_from_dict(data["team"]) if data["team"] else None
+    return Training(**{**data, "battles": battles, "team": team})
+
+
+def _without_parsed_team(team: Union[Team, None]) -> Union[Team, None]:
+    # parsed_team is derived from data and is rebuilt by the parser on demand
+    return replace(team, parsed_team=None) if team is not None else None
+
+
+def battle_to_dict(battle: Battle) -> Dict[str, Any]:
+    """Convert a Battle model, without parsed teams, to an encodable dictionary."""
+    return asdict(replace(battle, team=_without_parsed_team(battle.team)))
+
+
+def training_to_dict(training: Training) -> Dict[str, Any]:
+    """Convert a Training model, without parsed teams, to an encodable dictionary."""
+    return asdict(
+        replace(
+            training,
+            team=_without_parsed_team(training.team),
+            battles=[
+                replace(battle, team=_without_parsed_team(battle.team))
+                for battle in training.battles
+            ],
+        )
+    )
+
+
+def dump_battles(battles: List[Battle], path: Union[str, Path]) -> None:
+    """Write Battle models to a compact corpus file."""
+    Path(path).write_bytes(
+        encode({"battles": [battle_to_dict(battle) for battle in battles]})
+    )
+
+
+def load_battles(path: Union[str, Path]) -> List[Battle]:
+    """Read Battle models from a file written by `dump_battles`."""
+    data = decode(Path(path).read_bytes())
+    return [battle_from_dict(battle) for battle in data["battles"]]
+
+
+def dump_trainings(trainings: List[Training], path: Union[str, Path]) -> None:
+    """Write Training models, battles included, to a compact corpus file."""
+    Path(path).write_bytes(
+        encode({"trainings": [training_to_dict(t) for t in trainings]})
+    )
+
+
+def load_trainings(path: Union[str, Path]) -> List[Training]:
+    """Read Training models from a file written by `dump_trainings`."""
+    data = decode(Path(path).read_bytes())
+    return [training_from_dict(training) for training in data["trainings"]]
@@ -1,9 +1,65 @@
 import os
+import socket
+import uuid
+from urllib.parse import urlsplit
 
 from dotenv import find_dotenv, load_dotenv
 
 load_dotenv(find_dotenv())
 
-NEXT_PUBLIC_APP_URL = os.getenv("NEXT_PUBLIC_APP_URL") or "http://localhost:3000"
+# pytest-xdist worker ("gw0", "gw1", ...), None when not running in parallel
+WORKER_ID = os.getenv("PYTEST_XDIST_WORKER")
+WORKER_INDEX = int(WORKER_ID[2:]) if WORKER_ID else 0
+# Comma-separated URLs of one app (with its own database) per worker
+E2E_APP_URLS = [url for url in (os.getenv("E2E_APP_URLS") or "").split(",") if url]
+
+# The tests start the app themselves, on a production build, one instance per
+# worker (src/util/app_server.py)
+E2E_APP_SERVER = (os.getenv("E2E_APP_SERVER") or "").lower() in ("1", "true")
+
+
+def _reserve_port() -> socket.socket:
+    # Bound without listening: no other process gets the port until it is closed
+    sock = socket.socket()
+    sock.bind(("", 0))
+    return sock
+
+
+# Port of the instance started by this process, with E2E_APP_SERVER. The app
+# URL is set on import, so the port is reserved from then until the instance
+# starts (AppServer.start)
+E2E_APP_PORT_RESERVATION = (
+    _reserve_port() if E2E_APP_SERVER and not E2E_APP_URLS else None
+)
+E2E_APP_PORT = (
+    E2E_APP_PORT_RESERVATION.getsockname()[1] if E2E_APP_PORT_RESERVATION else None
+)
+
+if E2E_APP_URLS:
+    NEXT_PUBLIC_APP_URL = E2E_APP_URLS[WORKER_INDEX % len(E2E_APP_URLS)]
+elif E2E_APP_PORT is not None:
+    NEXT_PUBLIC_APP_URL = f"http://localhost:{E2E_APP_PORT}"
+else:
+    NEXT_PUBLIC_APP_URL = os.getenv("NEXT_PUBLIC_APP_URL") or "http://localhost:3000"
+# Hosts of an app running on this machine
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+# Whether the app can reach the servers the tests start, e.g. the pokedata
+# stand-in (src/util/pokedata_server.py), unlike a deployment
+APP_IS_LOCAL = E2E_APP_SERVER or urlsplit(NEXT_PUBLIC_APP_URL).hostname in LOCAL_HOSTS
 USER_PASSWORDS = os.getenv("BASE_USER_PASSWORDS_MAP") or "\{\}"
 ENVIRONMENT = os.getenv("NEXT_PUBLIC_ENVIRONMENT")
+POKEDATA_SERVER_HOST = os.getenv("POKEDATA_SERVER_HOST") or "127.0.0.1"
+POKEDATA_SERVER_PORT = int(os.getenv("POKEDATA_SERVER_PORT") or 3999)
+# Test run tagging the entities created by the harness, shared by the xdist
+# workers of a run
+RUN_ID = os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+# Age after which the entities of other test runs are deleted at session start
+STALE_RUN_HOURS = float(os.getenv("E2E_STALE_RUN_HOURS") or 2)
+# Comma-separated MONGODB_URIs of the app databases, one per E2E_APP_URLS app,
+# for the module data snapshots (src/util/snapshots.py)
+E2E_MONGODB_URIS = [
+    uri for uri in (os.getenv("E2E_MONGODB_URIS") or "").split(",") if uri
+]
+E2E_MONGODB_URI = (
+    E2E_MONGODB_URIS[WORKER_INDEX % len(E2E_MONGODB_URIS)] if E2E_MONGODB_URIS else None
+)
@@ -1,7 +1,7 @@
 import json
 from pathlib import Path
 
-from src.util.constants import USER_PASSWORDS
+from src.util.constants import E2E_APP_URLS, USER_PASSWORDS, WORKER_ID
 
 users_json_path = Path(__file__).resolve().parents[3] / "data" / "users.json"
 
@@ -17,3 +17,22 @@ def load_users():
                 "password": passwords[user["username"]],
             }
     return users
+
+
+def worker_username(username: str) -> str:
+    """
+    Username of a base user for the current pytest-xdist worker.
+
+    Workers sharing one app use their own copies of the base users, seeded
+    with `E2E_WORKERS`, so they never change each other's data. Workers with
+    an app and database each (`E2E_APP_URLS`) use the base users.
+
+    Args:
+        username: Username in data/users.json
+
+    Returns:
+        Username to sign in with
+    """
+    if WORKER_ID is None or E2E_APP_URLS:
+        return username
+    return f"{username}-{WORKER_ID}"
@@ -0,0 +1,629 @@
+"""
+Seeded generator of synthetic trainings, battles and pokedata tournaments.
+
+Every generated entity is derived from the seed and its own index only, so
+the same seed always gives the same dataset, whatever is generated before it
+or in which order. Battles are doubles with 4 of 6 pokemon brought per side,
+shaped like the output of the replay parser: leads switch in on turn 0, each
+active pokemon then moves or switches out every turn, and pokemon faint and
+are replaced until a side runs out of pokemon or the battle runs out of turns.
+
+Generated data is streamed, one training at a time, either to the API
+(`populate`) or to a file in the account export format (`write_account_export`)
+that `IncineroarAPI.import_account` loads in concurrent batches, so datasets
+of millions of actions never have to fit in memory.
+
+Usage (from the e2e directory):
+    uv run python -m src.util.datagen --trainings 100 --battles 100 \\
+        --output synthetic.ndjson.gz
+"""
+
+import argparse
+import gzip
+import json
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.models.tournament import Tournament
+from src.models.training import Action, Battle, Training, Turn
+from src.util.api import ACCOUNT_EXPORT_VERSION, IncineroarAPI, create_authenticated_api
+from src.util.data import load_users
+
+# National dex id, name, abilities, moves
+POKEMON: List[Tuple[int, str, List[str], List[str]]] = [
+    (
+        727,
+        "incineroar",
+        ["Intimidate"],
+        ["Fake Out", "Flare Blitz", "Knock Off", "Parting Shot"],
+    ),
+    (
+        812,
+        "rillaboom",
+        ["Grassy Surge"],
+        ["Fake Out", "Grassy Glide", "Wood Hammer", "U-turn"],
+    ),
+    (
+        591,
+        "amoonguss",
+        ["Regenerator"],
+        ["Spore", "Rage Powder", "Pollen Puff", "Protect"],
+    ),
+    (
+        987,
+        "flutter-mane",
+        ["Protosynthesis"],
+        ["Moonblast", "Shadow Ball", "Icy Wind", "Protect"],
+    ),
+    (
+        892,
+        "urshifu-single-strike",
+        ["Unseen Fist"],
+        ["Wicked Blow", "Close Combat", "Sucker Punch", "Protect"],
+    ),
+    (
+        641,
+        "tornadus-incarnate",
+        ["Prankster"],
+        ["Tailwind", "Bleakwind Storm", "Taunt", "Protect"],
+    ),
+    (
+        1002,
+        "chien-pao",
+        ["Sword of Ruin"],
+        ["Icicle Crash", "Sucker Punch", "Sacred Sword", "Protect"],
+    ),
+    (
+        645,
+        "landorus-incarnate",
+        ["Sheer Force"],
+        ["Earth Power", "Sludge Bomb", "Substitute", "Protect"],
+    ),
+    (
+        1017,
+        "ogerpon",
+        ["Defiant"],
+        ["Ivy Cudgel", "Follow Me", "Horn Leech", "Spiky Shield"],
+    ),
+    (
+        981,
+        "farigiraf",
+        ["Armor Tail"],
+        ["Trick Room", "Psychic Noise", "Hyper Voice", "Protect"],
+    ),
+    (
+        547,
+        "whimsicott",
+        ["Prankster"],
+        ["Moonblast", "Tailwind", "Encore", "Sunny Day"],
+    ),
+    (
+        1000,
+        "gholdengo",
+        ["Good as Gold"],
+        ["Make It Rain", "Shadow Ball", "Nasty Plot", "Protect"],
+    ),
+    (
+        983,
+        "kingambit",
+        ["Defiant"],
+        ["Kowtow Cleave", "Sucker Punch", "Iron Head", "Protect"],
+    ),
+    (
+        149,
+        "dragonite",
+        ["Inner Focus"],
+        ["Extreme Speed", "Tera Blast", "Scale Shot", "Protect"],
+    ),
+    (
+        94,
+        "gengar",
+        ["Cursed Body"],
+        ["Shadow Ball", "Sludge Bomb", "Will-O-Wisp", "Protect"],
+    ),
+    (38, "ninetales", ["Drought"], ["Heat Wave", "Solar Beam", "Encore", "Protect"]),
+    (
+        908,
+        "meowscarada",
+        ["Protean"],
+        ["Flower Trick", "Knock Off", "U-turn", "Protect"],
+    ),
+    (700, "sylveon", ["Pixilate"], ["Hyper Voice", "Quick Attack", "Yawn", "Protect"]),
+    (
+        445,
+        "garchomp",
+        ["Rough Skin"],
+        ["Earthquake", "Dragon Claw", "Rock Slide", "Protect"],
+    ),
+    (
+        1008,
+        "miraidon",
+        ["Hadron Engine"],
+        ["Electro Drift", "Draco Meteor", "Volt Switch", "Protect"],
+    ),
+]
+ITEMS = [
+    "Sitrus Berry",
+    "Choice Specs",
+    "Focus Sash",
+    "Assault Vest",
+    "Covert Cloak",
+    "Safety Goggles",
+    "Life Orb",
+    "Rocky Helmet",
+]
+TERA_TYPES = ["Fire", "Water", "Grass", "Ghost", "Dark", "Fairy", "Steel", "Normal"]
+
+PokemonEntry = Tuple[int, str, List[str], List[str]]
+
+
+@dataclass
+class DatasetConfig:
+    """
+    Distributions of the generated data.
+
+    Species are picked with Zipf-like weights, the i-th species of `species`
+    weighing `1 / i ** species_skew`, so a few species dominate the usage as in
+    real metagames (0 for uniform usage). Ranges are inclusive.
+    """
+
+    species: List[PokemonEntry] = field(default_factory=lambda: list(POKEMON))
+    species_skew: float = 1.0
+    turns_per_battle: Tuple[int, int] = (4, 12)
+    # Chance of an active pokemon switching out instead of moving on a turn
+    switch_rate: float = 0.1
+    # Chance of an active pokemon fainting on a turn
+    faint_rate: float = 0.12
+    players_per_event: Tuple[int, int] = (32, 256)
+    season: int = 2025
+    format: str = "reg h"
+
+
+@dataclass
+class DatasetStats:
+    trainings: int = 0
+    battles: int = 0
+    turns: int = 0
+    actions: int = 0
+
+    def add(self, training: Training) -> None:
+        self.trainings += 1
+        for battle in training.battles:
+            self.battles += 1
+            self.turns += len(battle.turns)
+            self.actions += sum(len(turn.actions) for turn in battle.turns)
+
+
+def _display_name(name: str) -> str:
+    return name.replace("-", " ").title()
+
+
+class DataGenerator:
+    """Deterministic generator of Training, Battle and Tournament models."""
+
+    def __init__(self, seed: int = 0, config: Optional[DatasetConfig] = None):
+        """
+        Create a generator, which keeps no state between generated entities.
+
+        Args:
+            seed: Random seed, the same seed gives the same data
+            config: Distributions of the generated data, defaults when None
+        """
+        self.seed = seed
+        self.config = config or DatasetConfig()
+        self._weights = [
+            1 / (rank**self.config.species_skew)
+            for rank in range(1, len(self.config.species) + 1)
+        ]
+
+    def _rng(self, *key: Union[str, int]) -> random.Random:
+        # String seeds are hashed with SHA-512, independent of PYTHONHASHSEED
+        return random.Random(":".join(str(part) for part in (self.seed, *key)))
+
+    def _sample_species(self, rng: random.Random, count: int) -> List[PokemonEntry]:
+        # Weighted sampling without replacement (Efraimidis-Spirakis keys)
+        keys = [rng.random() ** (1 / weight) for weight in self._weights]
+        ranked = sorted(range(len(keys)), key=keys.__getitem__, reverse=True)
+        return [self.config.species[index] for index in ranked[:count]]
+
+    def battle(self, training_index: int, battle_index: int) -> Battle:
+        """
+        Generate a doubles battle of the p1 (training owner) side.
+
+        Args:
+            training_index: Index of the training the battle belongs to
+            battle_index: Index of the battle in its training
+
+        Returns:
+            Battle with its turns, without id
+        """
+        rng = self._rng("battle", training_index, battle_index)
+        config = self.config
+        moves: Dict[str, List[str]] = {}
+        active: Dict[str, List[str]] = {}
+        bench: Dict[str, List[str]] = {}
+        for player in ("p1", "p2"):
+            brought = []
+            for _, name, _, species_moves in self._sample_species(rng, 4):
+                brought.append(_display_name(name))
+                moves[brought[-1]] = species_moves
+            active[player], bench[player] = brought[:2], brought[2:]
+
+        def opponent(player: str) -> str:
+            return "p2" if player == "p1" else "p1"
+
+        def switch_in(player: str, previous: str, incoming: str) -> Action:
+            return Action(0, "to", "switch", previous, [incoming], player)
+
+        leads = [
+            switch_in(player, "", pokemon)
+            for player in ("p1", "p2")
+            for pokemon in active[player]
+        ]
+        for index, action in enumerate(leads):
+            action.index = index
+        turns = [Turn(0, leads)]
+        last_turn = rng.randint(*config.turns_per_battle)
+        turn_index = 1
+        while turn_index <= last_turn and active["p1"] and active["p2"]:
+            actions: List[Action] = []
+            order = [(p, pokemon) for p in ("p1", "p2") for pokemon in active[p]]
+            rng.shuffle(order)
+            for player, pokemon in order:
+                if pokemon not in active[player]:
+                    continue
+                if bench[player] and rng.random() < config.switch_rate:
+                    incoming = bench[player].pop(rng.randrange(len(bench[player])))
+                    position = active[player].index(pokemon)
+                    active[player][position] = incoming
+                    bench[player].append(pokemon)
+                    actions.append(switch_in(player, pokemon, incoming))
+                    continue
+                target = rng.choice(active[opponent(player)])
+                actions.append(
+                    Action(
+                        0,
+                        rng.choice(moves[pokemon]),
+                        "move",
+                        pokemon,
+                        [f"{opponent(player)}:{target}"],
+                        player,
+                    )
+                )
+
+            for player, pokemon in order:
+                if (
+                    pokemon not in active[player]
+                    or rng.random() >= config.faint_rate
+                    or not active[opponent(player)]
+                ):
+                    continue
+                fainted_by = rng.choice(active[opponent(player)])
+                actions.append(
+                    Action(
+                        0,
+                        "fainted by",
+                        "effect",
+                        f"{player}:{pokemon}",
+                        [f"{opponent(player)}:{fainted_by}"],
+                        player,
+                    )
+                )
+                position = active[player].index(pokemon)
+                if bench[player]:
+                    incoming = bench[player].pop(rng.randrange(len(bench[player])))
+                    active[player][position] = incoming
+                    actions.append(switch_in(player, pokemon, incoming))
+                else:
+                    active[player].pop(position)
+
+            for index, action in enumerate(actions):
+                action.index = index
+            turns.append(Turn(turn_index, actions))
+            turn_index += 1
+
+        remaining = {
+            player: len(active[player]) + len(bench[player]) for player in active
+        }
+        if remaining["p1"] > remaining["p2"]:
+            result = "win"
+        elif remaining["p1"] < remaining["p2"]:
+            result = "loose"
+        else:
+            result = "tie"
+        return Battle(
+            name=f"Battle {battle_index + 1}",
+            notes="",
+            season=config.season,
+            format=config.format,
+            turns=turns,
+            result=result,
+        )
+
+    def training(self, index: int, battles: int) -> Training:
+        """
+        Generate a training with its battles.
+
+        Args:
+            index: Index of the training in the dataset
+            battles: Number of battles of the training
+
+        Returns:
+            Training with its battles, without ids
+        """
+        return Training(
+            name=f"Synthetic training {index + 1}",
+            description=f"Synthetic training (seed {self.seed})",
+            season=self.config.season,
+            format=self.config.format,
+            battles=[self.battle(index, i) for i in range(battles)],
+        )
+
+    def trainings(self, count: int, battles: int) -> Iterator[Training]:
+        """Lazily generate `count` trainings of `battles` battles each."""
+        for index in range(count):
+            yield self.training(index, battles)
+
+    def standings(self, index: int, players: Optional[int] = None) -> List[Dict]:
+        """
+        Generate the pokedata standings of an event.
+
+        Args:
+            index: Index of the event in the dataset
+            players: Number of players, drawn from `players_per_event` when None
+
+        Returns:
+            Standings in the pokedata JSON format, a team of 6 per player
+        """
+        rng = self._rng("standings", index)
+        if players is None:
+            players = rng.randint(*self.config.players_per_event)
+        standings = []
+        for placing in range(1, players + 1):
+            decklist = []
+            for pokemon_id, name, abilities, moves in self._sample_species(rng, 6):
+                decklist.append(
+                    {
+                        "id": str(pokemon_id),
+                        "name": _display_name(name),
+                        "teratype": rng.choice(TERA_TYPES),
+                        "ability": rng.choice(abilities),
+                        "item": rng.choice(ITEMS),
+                        "badges": moves,
+                    }
+                )
+            wins = rng.randint(0, 9)
+            standings.append(
+                {
+                    "name": f"Player {placing}",
+                    "placing": placing,
+                    "record": {"wins": wins, "losses": 9 - wins, "ties": 0},
+                    "decklist": decklist,
+                }
+            )
+        return standings
+
+    def tournament(self, index: int, players: Optional[int] = None) -> Tournament:
+        """Generate a tournament with raw pokedata standings as its data."""
+        return Tournament(
+            name=f"Synthetic event {index + 1}",
+            season=self.config.season,
+            format=self.config.format,
+            data=json.dumps(self.standings(index, players)),
+            source="pokedata",
+        )
+
+    def tournaments(self, count: int) -> Iterator[Tournament]:
+        """Lazily generate `count` tournaments."""
+        for index in range(count):
+            yield self.tournament(index)
+
+
+def synthetic_standings(players: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate pokedata standings with a team of 6 for every player.
+
+    Args:
+        players: Number of players
+        seed: Random seed, the same seed gives the same standings
+
+    Returns:
+        Standings in the pokedata JSON format
+    """
+    return DataGenerator(seed).standings(0, players)
+
+
+def _turn_to_dict(turn: Turn) -> Dict[str, Any]:
+    # Same as dataclasses.asdict, which is the bottleneck of large exports
+    return {
+        "index": turn.index,
+        "actions": [
+            {
+                "index": action.index,
+                "name": action.name,
+                "type": action.type,
+                "user": action.user,
+                "targets": list(action.targets),
+                "player": action.player,
+            }
+            for action in turn.actions
+        ],
+    }
+
+
+def write_account_export(
+    path: Union[str, Path], trainings: Iterator[Training]
+) -> DatasetStats:
+    """
+    Stream trainings to a file that `IncineroarAPI.import_account` can load.
+
+    Args:
+        path: Destination gzip compressed NDJSON file
+        trainings: Trainings with their battles, e.g. `DataGenerator.trainings`
+
+    Returns:
+        DatasetStats of the written data
+    """
+    stats = DatasetStats()
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+
+        def write(record_type: str, data: Dict[str, Any]) -> None:
+            file.write(json.dumps({"type": record_type, "data": data}) + "\n")
+
+        write(
+            "header",
+            {
+                "version": ACCOUNT_EXPORT_VERSION,
+                "exportedAt": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+        for training in trainings:
+            training_id = f"{stats.trainings:024x}"
+            write(
+                "training",
+                {
+                    "id": training_id,
+                    "name": training.name,
+                    "description": training.description,
+                    "season": training.season,
+                    "format": training.format,
+                    "isDefault": False,
+                    "team": None,
+                },
+            )
+            for battle in training.battles:
+                write(
+                    "battle",
+                    {
+                        "name": battle.name,
+                        "notes": battle.notes,
+                        "result": battle.result,
+                        "turns": [_turn_to_dict(turn) for turn in battle.turns],
+                        "team": None,
+                        "training": training_id,
+                    },
+                )
+            stats.add(training)
+    return stats
+
+
+def write_recordings(
+    directory: Union[str, Path], tournaments: Iterator[Tournament]
+) -> List[Path]:
+    """
+    Write tournament standings as recordings of the pokedata stand-in server.
+
+    Args:
+        directory: Recordings directory of `PokedataServer`
+        tournaments: Tournaments with raw pokedata standings as data
+
+    Returns:
+        Paths of the written files, served as `recording_url(path.stem)`
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index, tournament in enumerate(tournaments):
+        path = directory / f"synthetic-{index + 1}.json"
+        path.write_text(tournament.data)
+        paths.append(path)
+    return paths
+
+
+def populate(
+    api: IncineroarAPI, trainings: Iterator[Training], max_workers: int = 8
+) -> DatasetStats:
+    """
+    Stream trainings and their battles into the authenticated user's account.
+
+    Trainings are created concurrently, at most `max_workers` at a time, each
+    with its battles added in order.
+
+    Args:
+        api: Authenticated API client
+        trainings: Trainings with their battles, e.g. `DataGenerator.trainings`
+        max_workers: Number of trainings created concurrently
+
+    Returns:
+        DatasetStats of the created data
+    """
+    stats = DatasetStats()
+
+    def create(training: Training) -> Training:
+        created = api.create_training_from_model(
+            Training(
+                name=training.name,
+                description=training.description,
+                season=training.season,
+                format=training.format,
+            )
+        )
+        assert created.id is not None
+        for battle in training.battles:
+            created.battles.append(
+                api.create_training_battle_from_model(created.id, battle)
+            )
+        return training
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        pending: deque = deque()
+        for training in trainings:
+            pending.append(executor.submit(create, training))
+            if len(pending) >= max_workers * 2:
+                stats.add(pending.popleft().result())
+        while pending:
+            stats.add(pending.popleft().result())
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trainings", type=int, default=10)
+    parser.add_argument("--battles", type=int, default=10, help="per training")
+    parser.add_argument("--turns", type=int, nargs=2, default=[4, 12])
+    parser.add_argument("--switch-rate", type=float, default=0.1)
+    parser.add_argument("--faint-rate", type=float, default=0.12)
+    parser.add_argument("--species-skew", type=float, default=1.0)
+    parser.add_argument("--tournaments", type=int, default=0)
+    parser.add_argument("--players", type=int, nargs=2, default=[32, 256])
+    parser.add_argument("--output", help="account export file for the trainings")
+    parser.add_argument("--recordings", help="directory for the tournaments")
+    parser.add_argument("--username", help="create the data for this user")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    generator = DataGenerator(
+        args.seed,
+        DatasetConfig(
+            species_skew=args.species_skew,
+            turns_per_battle=tuple(args.turns),
+            switch_rate=args.switch_rate,
+            faint_rate=args.faint_rate,
+            players_per_event=tuple(args.players),
+        ),
+    )
+    trainings = generator.trainings(args.trainings, args.battles)
+    if args.username:
+        password = load_users()[args.username]["password"]
+        api = create_authenticated_api(args.username, password)
+        stats = populate(api, trainings, args.workers)
+        for tournament in generator.tournaments(args.tournaments):
+            api.create_tournament_from_model(tournament)
+    else:
+        stats = write_account_export(args.output or "synthetic.ndjson.gz", trainings)
+        if args.recordings:
+            write_recordings(args.recordings, generator.tournaments(args.tournaments))
+    print(
+        f"{stats.trainings} trainings, {stats.battles} battles, "
+        f"{stats.turns} turns, {stats.actions} actions"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Test datasets shared by the modules of a session.
+
+Modules declare the datasets they need by key, with the seed function
+creating them. A dataset read by several modules is built once per session
+(per xdist worker) with a seeder of its own, restored from its snapshot when
+possible, and deleted at the end of the session.
+
+Tests changing a dataset get a clone instead: a private copy, seeded with
+their module's factories and deleted with the module. The shared copy, if
+any, is deleted first, so that the pages of its owner never list both copies;
+it is built again, from its snapshot, for the next module that reads it.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from pymongo import MongoClient
+
+from src.util.seeding import CleanupError, Factory, Seeder
+from src.util.snapshots import Snapshots
+
+T = TypeVar("T")
+
+
+@dataclass
+class SharedDataset:
+    seed: Callable[..., Any]
+    seeder: Seeder
+    data: Any
+
+
+class DatasetRegistry:
+    """Datasets shared by key, built once and kept until released."""
+
+    def __init__(
+        self, client: Optional[MongoClient] = None, run_id: Optional[str] = None
+    ):
+        self.client = client
+        self.run_id = run_id
+        self._datasets: Dict[str, SharedDataset] = {}
+
+    def shared(self, key: str, seed: Callable[..., T], *args: Any) -> T:
+        """
+        Dataset shared with the other modules, built on first use.
+
+        Args:
+            key: Name of the dataset
+            seed: Function creating the dataset, always the same for a key
+            *args: Arguments of the seed function, factories being bound to
+                the dataset's own seeder
+
+        Returns:
+            What the seed function returns, not to be changed by the tests
+        """
+        dataset = self._datasets.get(key)
+        if dataset is not None:
+            if dataset.seed is not seed:
+                raise ValueError(
+                    f"Dataset {key} is seeded by {dataset.seed.__qualname__}"
+                )
+            return dataset.data
+
+        seeder = Seeder(run_id=self.run_id)
+        args = tuple(
+            arg.bind(seeder) if isinstance(arg, Factory) else arg for arg in args
+        )
+        try:
+            data = Snapshots(seeder, self.client)(seed, *args)
+        except BaseException:
+            seeder.close()
+            raise
+        self._datasets[key] = SharedDataset(seed, seeder, data)
+        return data
+
+    def clone(
+        self, key: str, snapshots: Snapshots, seed: Callable[..., T], *args: Any
+    ) -> T:
+        """
+        Private copy of a dataset, for tests changing it.
+
+        Args:
+            key: Name of the dataset
+            snapshots: Snapshots of the module, whose seeder deletes the copy
+            seed: Function creating the dataset
+            *args: Arguments of the seed function, with the module's factories
+
+        Returns:
+            What the seed function returns
+        """
+        self.release(key)
+        return snapshots(seed, *args)
+
+    def release(self, key: str):
+        """Deletes the shared copy of a dataset, if built."""
+        dataset = self._datasets.pop(key, None)
+        if dataset is not None:
+            dataset.seeder.close()
+
+    def close(self):
+        """
+        Deletes every shared dataset.
+
+        Raises:
+            CleanupError: If cleanups failed, once every dataset was released
+        """
+        errors: List[Exception] = []
+        for key in list(self._datasets):
+            try:
+                self.release(key)
+            except CleanupError as error:
+                errors.extend(error.errors)
+        if errors:
+            raise CleanupError(errors) from errors[0]
+
+
+class Datasets:
+    """Datasets of a module, shared through the registry or cloned."""
+
+    def __init__(self, registry: DatasetRegistry, snapshots: Snapshots):
+        self.registry = registry
+        self.snapshots = snapshots
+
+    def shared(self, key: str, seed: Callable[..., T], *args: Any) -> T:
+        return self.registry.shared(key, seed, *args)
+
+    def clone(self, key: str, seed: Callable[..., T], *args: Any) -> T:
+        return self.registry.clone(key, self.snapshots, seed, *args)
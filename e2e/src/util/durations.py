@@ -0,0 +1,236 @@
+"""
+Duration-aware scheduling of the tests across pytest-xdist workers.
+
+Every run records the duration of each test (setup, call and teardown) and of
+the setup of each fixture wider than a function (module, class and session
+fixtures, such as the `test_data` of a module) to a history file. Later
+parallel runs hand whole modules, or whole `xdist_group`s, to the workers
+longest first, estimated from that history, so the slowest modules start
+first instead of ending a run on a single busy worker. Module and class
+fixtures are thus set up on a single worker, once.
+
+At the end of each run the critical path is reported: the busiest worker,
+its modules and the slowest fixture setup in each of them.
+
+Usage (from the e2e directory):
+    uv run pytest -n 4 --dist loadgroup --duration-schedule
+"""
+
+import json
+import os
+import statistics
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pytest
+from xdist.remote import Producer
+from xdist.scheduler import LoadScopeScheduling
+from xdist.workermanage import WorkerController
+
+DURATIONS_FILE = Path(__file__).resolve().parents[2] / ".durations.json"
+# Weight of the latest run in the recorded durations, the rest being history
+SMOOTHING = 0.5
+# Estimated duration of the tests without any history
+DEFAULT_DURATION = 1.0
+
+
+def strip_group(nodeid: str) -> str:
+    """Node id without the `@group` suffix added by `--dist loadgroup`."""
+    # Skips an `@` in the values of parametrized tests, as xdist does
+    if nodeid.rfind("@") > nodeid.rfind("]"):
+        return nodeid.rsplit("@", 1)[0]
+    return nodeid
+
+
+def work_unit(nodeid: str) -> str:
+    """Unit of work of a test: its `xdist_group`, or else its module."""
+    if strip_group(nodeid) != nodeid:
+        return nodeid.rsplit("@", 1)[1]
+    return nodeid.split("::", 1)[0]
+
+
+class DurationHistory:
+    """Test and fixture setup durations (seconds) of the previous runs."""
+
+    def __init__(
+        self,
+        tests: Optional[Dict[str, float]] = None,
+        fixtures: Optional[Dict[str, float]] = None,
+    ):
+        self.tests = tests or {}
+        self.fixtures = fixtures or {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DurationHistory":
+        """History saved at the path, empty when missing or unreadable."""
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return cls()
+        return cls(data.get("tests"), data.get("fixtures"))
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        data = {"tests": self.tests, "fixtures": self.fixtures}
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+        tmp_path.replace(path)
+
+    def update(self, tests: Dict[str, float], fixtures: Dict[str, float]):
+        """Merges the durations of a run, smoothed with the previous ones."""
+        for recorded, durations in ((self.tests, tests), (self.fixtures, fixtures)):
+            for key, duration in durations.items():
+                previous = recorded.get(key)
+                recorded[key] = round(
+                    duration
+                    if previous is None
+                    else SMOOTHING * duration + (1 - SMOOTHING) * previous,
+                    3,
+                )
+
+    def estimate(self, nodeid: str) -> float:
+        """Expected duration of a test, the mean test duration if unknown."""
+        duration = self.tests.get(strip_group(nodeid))
+        if duration is not None:
+            return duration
+        if self.tests:
+            return statistics.fmean(self.tests.values())
+        return DEFAULT_DURATION
+
+
+class DurationScheduling(LoadScopeScheduling):
+    """
+    Load scheduling of whole modules (or `xdist_group`s), the longest first.
+
+    Like `--dist loadscope`, each work unit runs on a single worker, but
+    tests of a class are kept with the rest of their module and the units
+    are queued by their estimated duration instead of their number of tests.
+    """
+
+    def __init__(
+        self,
+        config: pytest.Config,
+        log: Optional[Producer] = None,
+        history: Optional[DurationHistory] = None,
+    ):
+        super().__init__(config, log)
+        self.history = history or DurationHistory()
+        self._ordered = False
+
+    def _split_scope(self, nodeid: str) -> str:
+        return work_unit(nodeid)
+
+    def _assign_work_unit(self, node: WorkerController):
+        # The queue is complete before the first assignment
+        if not self._ordered:
+            self.workqueue = OrderedDict(
+                sorted(
+                    self.workqueue.items(),
+                    key=lambda item: -sum(map(self.history.estimate, item[1])),
+                )
+            )
+            self._ordered = True
+        super()._assign_work_unit(node)
+
+
+class DurationPlugin:
+    """Records the durations of a run and schedules by the previous ones."""
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.path = Path(config.getoption("durations_history"))
+        self.history = DurationHistory.load(self.path)
+        self.tests: Dict[str, float] = defaultdict(float)
+        self.fixtures: Dict[str, float] = {}
+        self.scopes: Dict[str, str] = {}
+        self.workers: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        # Fixtures set up since the last test setup report of this process
+        self._fixture_setups: Dict[str, float] = {}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_xdist_make_scheduler(
+        self, config: pytest.Config, log: Producer
+    ) -> Optional[DurationScheduling]:
+        if not config.getoption("duration_schedule"):
+            return None
+        return DurationScheduling(config, log, self.history)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(
+        self, fixturedef: pytest.FixtureDef[Any], request: pytest.FixtureRequest
+    ):
+        start = time.perf_counter()
+        try:
+            return (yield)
+        finally:
+            if fixturedef.scope != "function":
+                scope = request.node.nodeid or "session"
+                key = f"{scope}::{fixturedef.argname}"
+                self._fixture_setups[key] = time.perf_counter() - start
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        report = yield
+        if call.when == "setup":
+            # Kept on the report, so that it reaches the xdist controller
+            report.fixture_durations = self._fixture_setups
+            self._fixture_setups = {}
+        return report
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport):
+        nodeid = strip_group(report.nodeid)
+        node = getattr(report, "node", None)
+        worker = node.gateway.id if node is not None else "main"
+        self.tests[nodeid] += report.duration
+        self.workers[worker][work_unit(report.nodeid)] += report.duration
+        for key, duration in getattr(report, "fixture_durations", {}).items():
+            self.fixtures[key] = duration
+            self.scopes[key] = work_unit(report.nodeid)
+
+    def pytest_sessionfinish(self, session: pytest.Session):
+        # Workers report to the controller, which saves the history
+        if hasattr(session.config, "workerinput") or not self.tests:
+            return
+        self.history.update(self.tests, self.fixtures)
+        self.history.save(self.path)
+
+    def critical_path(self) -> Tuple[str, float, List[Tuple[str, float]]]:
+        """Busiest worker, its busy time and its work units, slowest first."""
+        worker, scopes = max(
+            self.workers.items(), key=lambda item: sum(item[1].values())
+        )
+        units = sorted(scopes.items(), key=lambda item: -item[1])
+        return worker, sum(scopes.values()), units
+
+    def slowest_fixture(self, scope: str) -> Optional[Tuple[str, float]]:
+        """Slowest fixture setup of a work unit, with its duration."""
+        fixtures = [
+            (key, duration)
+            for key, duration in self.fixtures.items()
+            if self.scopes[key] == scope
+        ]
+        return max(fixtures, key=lambda item: item[1], default=None)
+
+    def pytest_terminal_summary(self, terminalreporter: Any):
+        if hasattr(self.config, "workerinput") or not self.workers:
+            return
+        worker, busy, units = self.critical_path()
+        terminalreporter.write_sep("=", "critical path")
+        others = ", ".join(
+            f"{name} {sum(scopes.values()):.1f}s"
+            for name, scopes in sorted(self.workers.items())
+            if name != worker
+        )
+        terminalreporter.write_line(
+            f"{worker} busy {busy:.1f}s" + (f" (others: {others})" if others else "")
+        )
+        for scope, duration in units:
+            line = f"  {duration:8.1f}s  {scope}"
+            fixture = self.slowest_fixture(scope)
+            if fixture is not None:
+                line += f"  (slowest setup: {fixture[0]} {fixture[1]:.1f}s)"
+            terminalreporter.write_line(line)
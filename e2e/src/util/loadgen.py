@@ -0,0 +1,489 @@
+"""
+Scenario-based load generator built on IncineroarAPI.
+
+A scenario is a list of steps, each a function of a VirtualUser that makes
+client calls, run in order with a think time between them. The generator
+runs weighted scenarios either closed-loop (a fixed number of virtual users,
+each starting a new scenario when its previous one ends) or open-loop (new
+scenarios arriving at a fixed rate, whether or not the previous ones ended),
+ramping the users or the arrival rate up linearly. Every HTTP request made by
+the clients is timed and grouped by endpoint, ids replaced by `{id}`.
+
+Virtual users share the given accounts and each works in a training of its
+own, deleted at the end of the run.
+
+Usage (from the e2e directory):
+    uv run python -m src.util.loadgen --users 50 --ramp-up 30 --duration 120 \\
+        --report load.html
+    uv run python -m src.util.loadgen --rate 20 --duration 120 --report load.json
+"""
+
+import argparse
+import html
+import json
+import math
+import random
+import re
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.models.training import Battle, Training
+from src.util.api import IncineroarAPI
+from src.util.constants import NEXT_PUBLIC_APP_URL
+from src.util.data import load_users
+from src.util.datagen import DataGenerator
+
+_ID_SEGMENT = re.compile(r"/[0-9a-f]{24}(?=/|$)")
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Endpoint of a request, e.g. `GET /api/user/training/{id}/analyze`."""
+    path = _ID_SEGMENT.sub("/{id}", urlsplit(url).path)
+    return f"{method.upper()} {path}"
+
+
+class LoadStats:
+    """Thread-safe latency samples and errors per endpoint and scenario."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.scenarios: Dict[str, List[float]] = defaultdict(list)
+        self.scenario_errors: Dict[str, int] = defaultdict(int)
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    def record_request(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def record_scenario(self, name: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.scenarios[name].append(seconds)
+            if not ok:
+                self.scenario_errors[name] += 1
+
+    @staticmethod
+    def _summary(samples: List[float], errors: int, duration: float) -> Dict:
+        ordered = sorted(samples)
+
+        def percentile(p: float) -> float:
+            if len(ordered) == 1:
+                return ordered[0] * 1000
+            quantiles = statistics.quantiles(ordered, n=100, method="inclusive")
+            return quantiles[int(p) - 1] * 1000
+
+        return {
+            "count": len(ordered),
+            "errors": errors,
+            "error_rate": errors / len(ordered),
+            "throughput": len(ordered) / duration if duration > 0 else 0.0,
+            "p50_ms": percentile(50),
+            "p90_ms": percentile(90),
+            "p99_ms": percentile(99),
+            "max_ms": ordered[-1] * 1000,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Throughput, error rate and latency percentiles of the run."""
+        with self._lock:
+            duration = (self.end or time.perf_counter()) - self.start
+            return {
+                "duration": duration,
+                "endpoints": {
+                    endpoint: self._summary(samples, self.errors[endpoint], duration)
+                    for endpoint, samples in sorted(self.latencies.items())
+                },
+                "scenarios": {
+                    name: self._summary(samples, self.scenario_errors[name], duration)
+                    for name, samples in sorted(self.scenarios.items())
+                },
+            }
+
+
+class VirtualUser:
+    """A signed in client with a training of its own to add battles to."""
+
+    def __init__(
+        self,
+        index: int,
+        username: str,
+        password: str,
+        stats: LoadStats,
+        base_url: str = NEXT_PUBLIC_APP_URL,
+        seed: int = 0,
+    ):
+        self.index = index
+        self.username = username
+        self.password = password
+        self.rng = random.Random(f"{seed}:{index}")
+        self.generator = DataGenerator(seed)
+        self.battles: List[Battle] = []
+        self.training_id: Optional[str] = None
+        self._battle_count = 0
+
+        self.api = IncineroarAPI(base_url)
+        # Failed requests are load test results, not something to retry
+        self.api.session.mount("http://", HTTPAdapter(max_retries=0))
+        self.api.session.mount("https://", HTTPAdapter(max_retries=0))
+        request = self.api.session.request
+
+        def timed_request(method: str, url: str, **kwargs: Any) -> requests.Response:
+            start = time.perf_counter()
+            try:
+                response = request(method, url, **kwargs)
+            except requests.RequestException:
+                stats.record_request(
+                    endpoint_name(method, url), time.perf_counter() - start, False
+                )
+                raise
+            # The body is read by requests before returning
+            stats.record_request(
+                endpoint_name(method, url), time.perf_counter() - start, response.ok
+            )
+            return response
+
+        self.api.session.request = timed_request  # type: ignore[method-assign]
+
+    def setup(self) -> None:
+        self.api.authenticate(self.username, self.password)
+        training = self.api.create_training_from_model(
+            Training(name=f"Load test {self.index}", season=2025, format="reg h")
+        )
+        self.training_id = training.id
+
+    def teardown(self) -> None:
+        if self.training_id is not None:
+            self.api.delete_training(self.training_id)
+            self.training_id = None
+
+    def next_battle(self) -> Battle:
+        battle = self.generator.battle(self.index, self._battle_count)
+        self._battle_count += 1
+        return battle
+
+
+# Steps
+
+
+def login(user: VirtualUser) -> None:
+    user.api.authenticate(user.username, user.password)
+
+
+def list_trainings(user: VirtualUser) -> None:
+    user.api.get_trainings()
+
+
+def add_battle(user: VirtualUser, max_battles: int = 50) -> None:
+    assert user.training_id is not None
+    user.battles.append(
+        user.api.create_training_battle_from_model(user.training_id, user.next_battle())
+    )
+    # Keep the training size steady over long runs
+    if len(user.battles) > max_battles:
+        battle = user.battles.pop(0)
+        if battle.id is not None:
+            user.api.delete_battle(user.training_id, battle.id)
+
+
+def analyze(user: VirtualUser) -> None:
+    assert user.training_id is not None
+    user.api.get_training_analysis(user.training_id)
+
+
+def browse_metagame(user: VirtualUser) -> None:
+    user.api.get_tournaments()
+
+
+Step = Callable[[VirtualUser], None]
+
+
+@dataclass
+class Scenario:
+    name: str
+    steps: List[Step]
+    weight: float = 1.0
+    # Seconds between steps, drawn uniformly
+    think_time: Tuple[float, float] = (0.5, 2.0)
+
+
+SCENARIOS = {
+    "player": Scenario(
+        "player", [login, list_trainings, add_battle, analyze], weight=3
+    ),
+    "analyst": Scenario("analyst", [list_trainings, analyze, analyze]),
+    "metagame": Scenario("metagame", [login, browse_metagame, list_trainings]),
+}
+
+
+def run_scenario(
+    user: VirtualUser,
+    scenario: Scenario,
+    stats: LoadStats,
+    scheduled: Optional[float] = None,
+) -> None:
+    """
+    Run the steps of a scenario and record its latency and outcome.
+
+    Args:
+        user: Virtual user running the scenario
+        scenario: Scenario to run
+        stats: Stats receiving the scenario latency
+        scheduled: perf_counter time the scenario was due to start, so the
+            time spent waiting for a free worker counts in open-loop runs
+    """
+    start = scheduled if scheduled is not None else time.perf_counter()
+    ok = True
+    try:
+        for index, step in enumerate(scenario.steps):
+            if index > 0:
+                time.sleep(user.rng.uniform(*scenario.think_time))
+            step(user)
+    except Exception:
+        ok = False
+    stats.record_scenario(scenario.name, time.perf_counter() - start, ok)
+
+
+@dataclass
+class LoadConfig:
+    accounts: List[Tuple[str, str]]
+    scenarios: List[Scenario] = field(default_factory=lambda: list(SCENARIOS.values()))
+    duration: float = 60.0
+    ramp_up: float = 0.0
+    # Closed-loop virtual users, used when `rate` is None
+    users: int = 10
+    # Open-loop scenario arrivals per second
+    rate: Optional[float] = None
+    max_workers: int = 200
+    base_url: str = NEXT_PUBLIC_APP_URL
+    seed: int = 0
+
+
+class LoadGenerator:
+    """Closed-loop or open-loop runner of weighted scenarios."""
+
+    def __init__(self, config: LoadConfig):
+        self.config = config
+        self.stats = LoadStats()
+        self._rng = random.Random(config.seed)
+        self._users: List[VirtualUser] = []
+        self._users_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _new_user(self) -> VirtualUser:
+        with self._users_lock:
+            index = len(self._users)
+            username, password = self.config.accounts[index % len(self.config.accounts)]
+            user = VirtualUser(
+                index,
+                username,
+                password,
+                self.stats,
+                self.config.base_url,
+                self.config.seed,
+            )
+            self._users.append(user)
+        user.setup()
+        return user
+
+    def _pick(self, rng: random.Random) -> Scenario:
+        scenarios = self.config.scenarios
+        return rng.choices(scenarios, [s.weight for s in scenarios])[0]
+
+    def _closed_loop_user(self, index: int, deadline: float) -> None:
+        ramp_up = self.config.ramp_up
+        time.sleep(ramp_up * index / self.config.users)
+        user = self._new_user()
+        while time.perf_counter() < deadline:
+            run_scenario(user, self._pick(user.rng), self.stats)
+
+    def _open_loop_task(self, scheduled: float, scenario: Scenario) -> None:
+        user = getattr(self._local, "user", None)
+        if user is None:
+            user = self._local.user = self._new_user()
+        run_scenario(user, scenario, self.stats, scheduled)
+
+    def _arrival_time(self, arrivals: float) -> float:
+        # Inverse of the expected number of arrivals after t seconds, which is
+        # rate * t^2 / (2 * ramp_up) during the ramp-up, linear after it
+        rate, ramp_up = self.config.rate or 0.0, self.config.ramp_up
+        ramp_arrivals = rate * ramp_up / 2
+        if arrivals <= ramp_arrivals:
+            return math.sqrt(2 * ramp_up * arrivals / rate)
+        return ramp_up + (arrivals - ramp_arrivals) / rate
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the load until the configured duration elapsed.
+
+        Returns:
+            Report of LoadStats.report, with the run configuration
+        """
+        config = self.config
+        self.stats.start = time.perf_counter()
+        deadline = self.stats.start + config.ramp_up + config.duration
+        try:
+            if config.rate is None:
+                with ThreadPoolExecutor(config.users) as executor:
+                    futures = [
+                        executor.submit(self._closed_loop_user, index, deadline)
+                        for index in range(config.users)
+                    ]
+                    for future in futures:
+                        # Raises the errors of the user setups
+                        future.result()
+            else:
+                with ThreadPoolExecutor(config.max_workers) as executor:
+                    pending: Set[Future] = set()
+                    arrivals = 0.0
+                    try:
+                        while True:
+                            # Poisson arrivals, with the rate ramping up linearly
+                            arrivals += self._rng.expovariate(1.0)
+                            scheduled = self.stats.start + self._arrival_time(arrivals)
+                            if scheduled >= deadline:
+                                break
+                            time.sleep(max(0.0, scheduled - time.perf_counter()))
+                            pending.add(
+                                executor.submit(
+                                    self._open_loop_task,
+                                    scheduled,
+                                    self._pick(self._rng),
+                                )
+                            )
+                            done = {future for future in pending if future.done()}
+                            pending -= done
+                            for future in done:
+                                # Raises the errors of the user setups
+                                future.result()
+                        for future in pending:
+                            future.result()
+                    except BaseException:
+                        # The queued scenarios would fail the same way
+                        executor.shutdown(cancel_futures=True)
+                        raise
+        finally:
+            self.stats.end = time.perf_counter()
+            for user in self._users:
+                try:
+                    user.teardown()
+                except Exception:
+                    pass
+
+        report = self.stats.report()
+        report["config"] = {
+            "mode": "closed" if config.rate is None else "open",
+            "users": config.users if config.rate is None else len(self._users),
+            "rate": config.rate,
+            "duration": config.duration,
+            "ramp_up": config.ramp_up,
+            "scenarios": [s.name for s in config.scenarios],
+        }
+        return report
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    """Standalone HTML page of a load report."""
+
+    def table(title: str, rows: Dict[str, Dict[str, float]]) -> str:
+        header = "".join(
+            f"<th>{name}</th>"
+            for name in (
+                title,
+                "count",
+                "req/s",
+                "errors",
+                "error %",
+                "p50 ms",
+                "p90 ms",
+                "p99 ms",
+                "max ms",
+            )
+        )
+        body = "".join(
+            "<tr>"
+            f"<td>{html.escape(name)}</td><td>{row['count']}</td>"
+            f"<td>{row['throughput']:.2f}</td><td>{row['errors']}</td>"
+            f"<td>{row['error_rate'] * 100:.1f}</td><td>{row['p50_ms']:.1f}</td>"
+            f"<td>{row['p90_ms']:.1f}</td><td>{row['p99_ms']:.1f}</td>"
+            f"<td>{row['max_ms']:.1f}</td>"
+            "</tr>"
+            for name, row in rows.items()
+        )
+        return f"<table><tr>{header}</tr>{body}</table>"
+
+    config = html.escape(json.dumps(report["config"]))
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        "<title>Load test report</title><style>"
+        "body{font-family:sans-serif}table{border-collapse:collapse;margin:1em 0}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}"
+        "td:first-child,th:first-child{text-align:left}"
+        "</style></head><body><h1>Load test report</h1>"
+        f"<p>{config}, {report['duration']:.1f} s</p>"
+        f"{table('endpoint', report['endpoints'])}"
+        f"{table('scenario', report['scenarios'])}"
+        "</body></html>"
+    )
+
+
+def write_report(report: Dict[str, Any], path: Union[str, Path]) -> None:
+    """Write a load report as HTML (.html) or JSON (any other suffix)."""
+    path = Path(path)
+    if path.suffix == ".html":
+        path.write_text(render_html(report))
+    else:
+        path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accounts", nargs="+", default=["mewtwo"])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=10, help="closed-loop users")
+    parser.add_argument("--rate", type=float, help="open-loop scenarios per second")
+    parser.add_argument("--ramp-up", type=float, default=0.0)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", action="append", default=[], help=".html/.json")
+    args = parser.parse_args()
+
+    users = load_users()
+    config = LoadConfig(
+        accounts=[(name, users[name]["password"]) for name in args.accounts],
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        users=args.users,
+        rate=args.rate,
+        seed=args.seed,
+    )
+    if args.scenarios:
+        config.scenarios = [SCENARIOS[name] for name in args.scenarios]
+    report = LoadGenerator(config).run()
+
+    print(f"{'endpoint':<48}{'count':>8}{'req/s':>8}{'err %':>7}{'p50':>8}{'p99':>8}")
+    for name, row in {**report["endpoints"], **report["scenarios"]}.items():
+        print(
+            f"{name:<48}{row['count']:>8}{row['throughput']:>8.1f}"
+            f"{row['error_rate'] * 100:>7.1f}{row['p50_ms']:>8.1f}"
+            f"{row['p99_ms']:>8.1f}"
+        )
+    for path in args.report:
+        write_report(report, path)
+
+
+if __name__ == "__main__":
+    main()
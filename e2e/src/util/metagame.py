@@ -0,0 +1,228 @@
+"""
+Incremental metagame usage aggregation across seasons and formats.
+
+Usage counters are kept per (season, format) and updated whenever a tournament
+is added or removed, so trend queries never need to walk every tournament.
+"""
+
+import json
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.models.tournament import Tournament
+from src.util.team_parser import parse_team
+
+MetagameKey = Tuple[int, str]
+
+
+@dataclass
+class SpeciesUsage:
+    species: str
+    count: int
+    share: float
+
+
+@dataclass
+class SpeciesUsageDelta:
+    species: str
+    previous_share: float
+    current_share: float
+    delta: float
+
+
+class MetagameTrends:
+    """
+    Per-(season, format) pokemon usage counters.
+
+    The species contributed by each tournament are remembered, so removing a
+    tournament only needs its id and costs O(teams in the tournament).
+    """
+
+    FILE_VERSION = 1
+
+    def __init__(self):
+        self._usage: Dict[MetagameKey, Counter] = {}
+        self._teams: Counter = Counter()
+        self._tournaments: Dict[str, Tuple[MetagameKey, List[List[str]]]] = {}
+
+    @staticmethod
+    def _key(season: int, format: str) -> MetagameKey:
+        return season, format.strip().lower()
+
+    def __contains__(self, tournament_id: str) -> bool:
+        return tournament_id in self._tournaments
+
+    def keys(self) -> List[MetagameKey]:
+        """Tracked (season, format) pairs."""
+        return sorted(key for key, count in self._teams.items() if count > 0)
+
+    def _apply(self, key: MetagameKey, teams: List[List[str]], sign: int) -> None:
+        usage = self._usage.setdefault(key, Counter())
+        for species in teams:
+            for name in species:
+                usage[name] += sign
+                if usage[name] <= 0:
+                    del usage[name]
+        self._teams[key] += sign * len(teams)
+        if self._teams[key] <= 0:
+            del self._teams[key]
+            del self._usage[key]
+
+    def add_tournament(self, tournament: Tournament) -> None:
+        """
+        Add the usage of a tournament, replacing it if already tracked.
+
+        Args:
+            tournament: Tournament with id and teams
+        """
+        if tournament.id is None:
+            raise ValueError("Tournament must have an id to be tracked")
+        self.remove_tournament(tournament.id)
+        key = self._key(tournament.season, tournament.format)
+        teams = [
+            sorted({pokemon.species.lower() for pokemon in parse_team(team.data)})
+            for team in tournament.teams
+        ]
+        self._tournaments[tournament.id] = (key, teams)
+        self._apply(key, teams, 1)
+
+    def remove_tournament(self, tournament_id: str) -> bool:
+        """
+        Remove the usage of a tracked tournament.
+
+        Args:
+            tournament_id: Tournament ID
+
+        Returns:
+            True if the tournament was tracked
+        """
+        entry = self._tournaments.pop(tournament_id, None)
+        if entry is None:
+            return False
+        key, teams = entry
+        self._apply(key, teams, -1)
+        return True
+
+    def team_count(self, season: int, format: str) -> int:
+        """Number of teams tracked for a season and format."""
+        return self._teams.get(self._key(season, format), 0)
+
+    def top(self, season: int, format: str, n: int = 10) -> List[SpeciesUsage]:
+        """
+        Most used pokemon of a season and format.
+
+        Args:
+            season: Season number
+            format: Format string
+            n: Number of pokemon to return
+
+        Returns:
+            List of SpeciesUsage sorted by usage
+        """
+        key = self._key(season, format)
+        total = self._teams.get(key, 0)
+        usage = self._usage.get(key)
+        if not total or usage is None:
+            return []
+        return [
+            SpeciesUsage(species, count, count / total)
+            for species, count in usage.most_common(n)
+        ]
+
+    def share(self, season: int, format: str, species: str) -> float:
+        """Fraction of the teams of a season and format using a pokemon."""
+        key = self._key(season, format)
+        total = self._teams.get(key, 0)
+        if not total:
+            return 0.0
+        return self._usage[key][species.lower()] / total
+
+    def delta(
+        self,
+        format: str,
+        previous_season: int,
+        current_season: int,
+        n: Optional[int] = None,
+        current_format: Optional[str] = None,
+    ) -> List[SpeciesUsageDelta]:
+        """
+        Usage share changes between two seasons.
+
+        Args:
+            format: Format of the previous season
+            previous_season: Season to compare against
+            current_season: Season to compare
+            n: Maximum number of results (all by default)
+            current_format: Format of the current season (defaults to `format`)
+
+        Returns:
+            List of SpeciesUsageDelta sorted by the absolute change in share
+        """
+        previous_key = self._key(previous_season, format)
+        current_key = self._key(current_season, current_format or format)
+        previous_total = self._teams.get(previous_key, 0)
+        current_total = self._teams.get(current_key, 0)
+        previous_usage = self._usage.get(previous_key, Counter())
+        current_usage = self._usage.get(current_key, Counter())
+
+        deltas = []
+        for species in set(previous_usage) | set(current_usage):
+            previous_share = (
+                previous_usage[species] / previous_total if previous_total else 0.0
+            )
+            current_share = (
+                current_usage[species] / current_total if current_total else 0.0
+            )
+            deltas.append(
+                SpeciesUsageDelta(
+                    species,
+                    previous_share,
+                    current_share,
+                    current_share - previous_share,
+                )
+            )
+        deltas.sort(key=lambda d: (-abs(d.delta), d.species))
+        return deltas if n is None else deltas[:n]
+
+    # Serialization
+
+    def to_dict(self) -> Dict:
+        """Serialize the tracked tournaments into a JSON compatible dictionary."""
+        return {
+            "version": self.FILE_VERSION,
+            "tournaments": {
+                tournament_id: {"season": key[0], "format": key[1], "teams": teams}
+                for tournament_id, (key, teams) in self._tournaments.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MetagameTrends":
+        """Rebuild the counters from a dictionary created by `to_dict`."""
+        if data.get("version") != cls.FILE_VERSION:
+            raise ValueError(f"Unsupported metagame file version {data.get('version')}")
+        trends = cls()
+        for tournament_id, entry in data["tournaments"].items():
+            key = cls._key(entry["season"], entry["format"])
+            trends._tournaments[tournament_id] = (key, entry["teams"])
+            trends._apply(key, entry["teams"], 1)
+        return trends
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the aggregator to disk atomically."""
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(self.to_dict(), file)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "MetagameTrends":
+        """Load an aggregator saved with `save`, or an empty one if missing."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with open(path, "r") as file:
+            return cls.from_dict(json.load(file))
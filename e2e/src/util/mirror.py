@@ -0,0 +1,414 @@
+"""
+Local SQLite mirror of a user's teams, trainings, battles and turns.
+
+The mirror is kept up to date with delta syncs: each sync only downloads the
+entities that changed since the previous one (using the `updatedSince` filter
+of the user routes) and prunes the ones that were deleted, so analysis code can
+query the local database at disk speed instead of re-downloading the history.
+"""
+
+import json
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Union
+
+from src.models.team import Team
+from src.models.training import Action, Battle, Training, Turn
+from src.util.api import IncineroarAPI
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    season INTEGER,
+    format TEXT,
+    data TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS teams_season_format ON teams (season, format);
+
+CREATE TABLE IF NOT EXISTS trainings (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    season INTEGER,
+    format TEXT,
+    team_id TEXT,
+    is_default INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trainings_season_format ON trainings (season, format);
+
+CREATE TABLE IF NOT EXISTS battles (
+    id TEXT PRIMARY KEY,
+    training_id TEXT NOT NULL REFERENCES trainings (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    notes TEXT,
+    result TEXT,
+    season INTEGER,
+    format TEXT,
+    team_id TEXT
+);
+CREATE INDEX IF NOT EXISTS battles_training ON battles (training_id, position);
+CREATE INDEX IF NOT EXISTS battles_season_format ON battles (season, format);
+
+CREATE TABLE IF NOT EXISTS turns (
+    battle_id TEXT NOT NULL REFERENCES battles (id) ON DELETE CASCADE,
+    turn_index INTEGER NOT NULL,
+    actions TEXT NOT NULL,
+    PRIMARY KEY (battle_id, turn_index)
+);
+
+CREATE TABLE IF NOT EXISTS battle_pokemon (
+    battle_id TEXT NOT NULL REFERENCES battles (id) ON DELETE CASCADE,
+    player TEXT NOT NULL,
+    pokemon TEXT NOT NULL,
+    PRIMARY KEY (battle_id, player, pokemon)
+);
+CREATE INDEX IF NOT EXISTS battle_pokemon_pokemon ON battle_pokemon (pokemon, player);
+"""
+
+TEAMS_SYNCED_AT = "teams_synced_at"
+TRAININGS_SYNCED_AT = "trainings_synced_at"
+
+
+def _pokemon_name(name: str) -> str:
+    """Name of a pokemon as stored in the mirror and matched by the queries."""
+    return name.replace("-", " ").strip().lower()
+
+
+def _battle_pokemon(battle: Battle) -> set[tuple[str, str]]:
+    """Collect the (player, pokemon) pairs that appear in the battle actions."""
+    pokemon: set[tuple[str, str]] = set()
+    for turn in battle.turns:
+        for action in turn.actions:
+            for raw in [action.user, *action.targets]:
+                if not raw:
+                    continue
+                player, _, name = raw.partition(":")
+                if not name:
+                    player, name = action.player or "", raw
+                if player.startswith("p1"):
+                    player = "p1"
+                elif player.startswith("p2"):
+                    player = "p2"
+                pokemon.add((player, _pokemon_name(name)))
+    return pokemon
+
+
+class LocalMirror:
+    """SQLite mirror of the data of the user authenticated in an IncineroarAPI."""
+
+    def __init__(self, api: IncineroarAPI, path: Union[str, Path] = ":memory:"):
+        """
+        Open (or create) a mirror database.
+
+        Args:
+            api: Authenticated API client used to sync
+            path: SQLite database path
+        """
+        self.api = api
+        self.connection = sqlite3.connect(str(path))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "LocalMirror":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    # Sync
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    @staticmethod
+    def _prune(cursor: sqlite3.Cursor, table: str, ids: Optional[List[str]]) -> int:
+        if ids is None:
+            return 0
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM keep_ids")
+        cursor.executemany(
+            "INSERT OR IGNORE INTO keep_ids VALUES (?)", [(i,) for i in ids]
+        )
+        cursor.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM keep_ids)")
+        return cursor.rowcount
+
+    def sync(self, full: bool = False) -> dict[str, int]:
+        """
+        Pull the changes since the last sync.
+
+        Args:
+            full: Ignore the last sync time and download everything
+
+        Returns:
+            Number of teams and trainings upserted and deleted
+        """
+        teams_since = None if full else self._get_meta(TEAMS_SYNCED_AT)
+        trainings_since = None if full else self._get_meta(TRAININGS_SYNCED_AT)
+        team_changes = self.api.get_team_changes(teams_since)
+        training_changes = self.api.get_training_changes(trainings_since)
+
+        with self.connection:
+            cursor = self.connection.cursor()
+            for team in team_changes.teams:
+                self._upsert_team(cursor, team)
+            for training in training_changes.trainings:
+                self._upsert_training(cursor, training)
+
+            team_ids = team_changes.team_ids
+            training_ids = training_changes.training_ids
+            if full:
+                team_ids = [team.id for team in team_changes.teams if team.id]
+                training_ids = [t.id for t in training_changes.trainings if t.id]
+            deleted_teams = self._prune(cursor, "teams", team_ids)
+            deleted_trainings = self._prune(cursor, "trainings", training_ids)
+
+            self._set_meta(TEAMS_SYNCED_AT, team_changes.synced_at)
+            self._set_meta(TRAININGS_SYNCED_AT, training_changes.synced_at)
+
+        return {
+            "teams": len(team_changes.teams),
+            "trainings": len(training_changes.trainings),
+            "deleted_teams": deleted_teams,
+            "deleted_trainings": deleted_trainings,
+        }
+
+    def _upsert_team(self, cursor: sqlite3.Cursor, team: Team) -> None:
+        cursor.execute(
+            "INSERT OR REPLACE INTO teams "
+            "(id, name, description, season, format, data, tags) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                team.id,
+                team.name,
+                team.description,
+                team.season,
+                team.format,
+                team.data,
+                json.dumps(team.tags),
+            ),
+        )
+
+    def _upsert_training(self, cursor: sqlite3.Cursor, training: Training) -> None:
+        team_id = training.team.id if training.team else training.team_id
+        cursor.execute(
+            "INSERT INTO trainings "
+            "(id, name, description, season, format, team_id, is_default) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+            "description = excluded.description, season = excluded.season, "
+            "format = excluded.format, team_id = excluded.team_id, "
+            "is_default = excluded.is_default",
+            (
+                training.id,
+                training.name,
+                training.description,
+                training.season,
+                training.format,
+                team_id,
+                int(training.is_default),
+            ),
+        )
+        # Battles of a changed training are replaced as a whole, which also
+        # drops the battles deleted since the previous sync
+        cursor.execute("DELETE FROM battles WHERE training_id = ?", (training.id,))
+        for position, battle in enumerate(training.battles):
+            self._insert_battle(cursor, training.id or "", position, battle)
+
+    def _insert_battle(
+        self, cursor: sqlite3.Cursor, training_id: str, position: int, battle: Battle
+    ) -> None:
+        team_id = battle.team.id if battle.team else battle.team_id
+        cursor.execute(
+            "INSERT INTO battles "
+            "(id, training_id, position, name, notes, result, season, format, team_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                battle.id,
+                training_id,
+                position,
+                battle.name,
+                battle.notes,
+                battle.result,
+                battle.season,
+                battle.format,
+                team_id,
+            ),
+        )
+        cursor.executemany(
+            "INSERT INTO turns (battle_id, turn_index, actions) VALUES (?, ?, ?)",
+            [
+                (
+                    battle.id,
+                    turn.index,
+                    json.dumps([asdict(action) for action in turn.actions]),
+                )
+                for turn in battle.turns
+            ],
+        )
+        cursor.executemany(
+            "INSERT INTO battle_pokemon (battle_id, player, pokemon) VALUES (?, ?, ?)",
+            [
+                (battle.id, player, pokemon)
+                for player, pokemon in _battle_pokemon(battle)
+            ],
+        )
+
+    # Queries
+
+    def execute(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        """Run an arbitrary read query against the mirror."""
+        return self.connection.execute(sql, tuple(params)).fetchall()
+
+    def _row_to_team(self, row: sqlite3.Row) -> Team:
+        return Team(
+            name=row["name"],
+            season=row["season"],
+            format=row["format"],
+            data=row["data"],
+            id=row["id"],
+            description=row["description"] or "",
+            tags=json.loads(row["tags"]),
+        )
+
+    def _row_to_battle(self, row: sqlite3.Row, with_turns: bool) -> Battle:
+        turns = []
+        if with_turns:
+            turns = [
+                Turn(
+                    index=turn_row["turn_index"],
+                    actions=[
+                        Action(**action) for action in json.loads(turn_row["actions"])
+                    ],
+                )
+                for turn_row in self.connection.execute(
+                    "SELECT turn_index, actions FROM turns "
+                    "WHERE battle_id = ? ORDER BY turn_index",
+                    (row["id"],),
+                )
+            ]
+        return Battle(
+            name=row["name"],
+            notes=row["notes"] or "",
+            season=row["season"],
+            format=row["format"],
+            team_id=row["team_id"],
+            id=row["id"],
+            turns=turns,
+            result=row["result"],
+        )
+
+    @staticmethod
+    def _filters(**filters: Any) -> tuple[str, list[Any]]:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def teams(
+        self, season: Optional[int] = None, format: Optional[str] = None
+    ) -> List[Team]:
+        """Get the mirrored teams, optionally filtered by season and format."""
+        where, params = self._filters(season=season, format=format)
+        rows = self.connection.execute(f"SELECT * FROM teams{where}", params)
+        return [self._row_to_team(row) for row in rows]
+
+    def trainings(
+        self,
+        season: Optional[int] = None,
+        format: Optional[str] = None,
+        with_battles: bool = False,
+    ) -> List[Training]:
+        """
+        Get the mirrored trainings.
+
+        Args:
+            season: Only trainings of this season
+            format: Only trainings of this format
+            with_battles: Also load the battles (and turns) of each training
+
+        Returns:
+            List of Training instances
+        """
+        where, params = self._filters(season=season, format=format)
+        trainings = []
+        for row in self.connection.execute(f"SELECT * FROM trainings{where}", params):
+            training = Training(
+                name=row["name"],
+                description=row["description"] or "",
+                season=row["season"],
+                format=row["format"],
+                team_id=row["team_id"],
+                is_default=bool(row["is_default"]),
+                id=row["id"],
+            )
+            if with_battles:
+                training.battles = self.battles(training_id=row["id"])
+            trainings.append(training)
+        return trainings
+
+    def battles(
+        self,
+        training_id: Optional[str] = None,
+        season: Optional[int] = None,
+        format: Optional[str] = None,
+        pokemon: Optional[str] = None,
+        player: Optional[str] = None,
+        with_turns: bool = True,
+    ) -> List[Battle]:
+        """
+        Get the mirrored battles.
+
+        Args:
+            training_id: Only battles of this training
+            season: Only battles of this season
+            format: Only battles of this format
+            pokemon: Only battles where this pokemon appears
+            player: Side of `pokemon` ('p1' for the user, 'p2' for the rival)
+            with_turns: Load the turns of each battle
+
+        Returns:
+            List of Battle instances
+        """
+        where, params = self._filters(
+            **{
+                "b.training_id": training_id,
+                "b.season": season,
+                "b.format": format,
+                "p.pokemon": _pokemon_name(pokemon) if pokemon else None,
+                "p.player": player if pokemon else None,
+            }
+        )
+        join = " JOIN battle_pokemon p ON p.battle_id = b.id" if pokemon else ""
+        rows = self.connection.execute(
+            f"SELECT DISTINCT b.* FROM battles b{join}{where} "
+            "ORDER BY b.training_id, b.position",
+            params,
+        ).fetchall()
+        return [self._row_to_battle(row, with_turns) for row in rows]
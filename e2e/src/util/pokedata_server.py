@@ -0,0 +1,198 @@
+"""
+Local stand-in for pokedata standings and the PokeAPI pokemon endpoint.
+
+Tournament URL imports make the app download a pokedata standings JSON and
+look up every pokemon id on PokeAPI. This server answers both from the local
+machine, so URL imports run offline and in a deterministic time:
+
+- `/standings/synthetic/{players}.json?seed={seed}`: standings with `players`
+  players from the seeded data generator, the same for the same seed
+- `/standings/recorded/{name}.json`: `{name}.json` from the recordings
+  directory, e.g. a standings file saved from pokedata.ovh
+- `/api/v2/pokemon/{id}`: `{"id", "name"}` of the pokemon used by the
+  synthetic standings
+
+The app uses the PokeAPI stand-in when started with
+`POKEAPI_URL=http://{POKEDATA_SERVER_HOST}:{POKEDATA_SERVER_PORT}/api/v2`.
+
+Usage (from the e2e directory):
+    uv run python -m src.util.pokedata_server --latency 0.2 --bandwidth 1000000
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from src.util.constants import POKEDATA_SERVER_HOST, POKEDATA_SERVER_PORT
+from src.util.datagen import POKEMON, synthetic_standings
+
+_NAMES_BY_ID = {pokemon_id: name for pokemon_id, name, _, _ in POKEMON}
+_SYNTHETIC_PATH = re.compile(r"^/standings/synthetic/(\d+)\.json$")
+_RECORDED_PATH = re.compile(r"^/standings/recorded/([\w.-]+)\.json$")
+_POKEMON_PATH = re.compile(r"^/api/v2/pokemon/(\d+)/?$")
+
+
+@lru_cache(maxsize=16)
+def _synthetic_body(players: int, seed: int) -> bytes:
+    return json.dumps(synthetic_standings(players, seed)).encode("utf-8")
+
+
+class PokedataServer:
+    """Threaded HTTP server for pokedata standings and PokeAPI lookups."""
+
+    def __init__(
+        self,
+        host: str = POKEDATA_SERVER_HOST,
+        port: int = POKEDATA_SERVER_PORT,
+        latency: float = 0.0,
+        bandwidth: Optional[int] = None,
+        recordings_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Create a server, call `start` (or use it as a context manager) to serve.
+
+        Args:
+            host: Host to bind, also used in the URLs given to the app
+            port: Port to bind, 0 for any free port
+            latency: Delay in seconds before answering each request
+            bandwidth: Maximum bytes per second sent per response, unlimited
+                when None
+            recordings_dir: Directory of recorded standings JSON files
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.recordings_dir = Path(recordings_dir) if recordings_dir else None
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def pokeapi_url(self) -> str:
+        """Value of the app's POKEAPI_URL to use this server."""
+        return f"{self.url}/api/v2"
+
+    def standings_url(self, players: int, seed: int = 0) -> str:
+        """URL of synthetic standings with `players` players."""
+        return f"{self.url}/standings/synthetic/{players}.json?seed={seed}"
+
+    def recording_url(self, name: str) -> str:
+        """URL of the recorded standings `{recordings_dir}/{name}.json`."""
+        return f"{self.url}/standings/recorded/{name}.json"
+
+    def start(self) -> "PokedataServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="pokedata-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "PokedataServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _body(self, path: str, query: Dict[str, List[str]]) -> Optional[bytes]:
+        match = _SYNTHETIC_PATH.match(path)
+        if match:
+            seed = int(query.get("seed", ["0"])[0])
+            return _synthetic_body(int(match.group(1)), seed)
+
+        match = _RECORDED_PATH.match(path)
+        if match and self.recordings_dir is not None:
+            recording = self.recordings_dir / f"{match.group(1)}.json"
+            return recording.read_bytes() if recording.is_file() else None
+
+        match = _POKEMON_PATH.match(path)
+        if match:
+            pokemon_id = int(match.group(1))
+            name = _NAMES_BY_ID.get(pokemon_id)
+            if name is None:
+                return None
+            return json.dumps({"id": pokemon_id, "name": name}).encode("utf-8")
+        return None
+
+    def _send(self, handler: BaseHTTPRequestHandler, body: bytes) -> None:
+        if not self.bandwidth:
+            handler.wfile.write(body)
+            return
+        # Chunks of 1/20 s worth of bandwidth, each followed by its share of
+        # the transfer time
+        chunk_size = max(1, self.bandwidth // 20)
+        for offset in range(0, len(body), chunk_size):
+            chunk = body[offset : offset + chunk_size]
+            handler.wfile.write(chunk)
+            time.sleep(len(chunk) / self.bandwidth)
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                try:
+                    body = server._body(parts.path, parse_qs(parts.query))
+                except ValueError:
+                    body = None
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                server._send(self, body)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=POKEDATA_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=POKEDATA_SERVER_PORT)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=int, default=None)
+    parser.add_argument("--recordings", default=None)
+    args = parser.parse_args()
+
+    server = PokedataServer(
+        args.host, args.port, args.latency, args.bandwidth, args.recordings
+    )
+    print(f"Serving on {server.url}, POKEAPI_URL={server.pokeapi_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Byte-offset index over a corpus of Showdown replay HTML files.
+
+Replay files are mostly CSS and HTML boilerplate around a single
+`<script class="battle-log-data">` element holding the battle log. The index
+records where that log starts and ends in each file, along with the players,
+the format and a content hash, so later passes can mmap a file and slice the
+log directly instead of reading and searching the whole document.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.models.replay import ReplayIndexEntry
+
+LOG_START_MARKER = b'class="battle-log-data">'
+LOG_END_MARKER = b"</script>"
+
+_MAGIC = b"RPIX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+_STRING_LENGTH = struct.Struct("<I")
+_COUNT = struct.Struct("<I")
+# path, size, mtime_ns, log_start, log_end, sha256, format, player count
+_ENTRY = struct.Struct("<IQqQQ32sIB")
+_NO_STRING = 0xFFFFFFFF
+
+_PLAYER_RE = re.compile(rb"^\|player\|p\d\|([^|\r\n]+)", re.MULTILINE)
+_TIER_RE = re.compile(rb"^\|tier\|([^\r\n]+)", re.MULTILINE)
+
+
+class ReplayLogNotFoundError(Exception):
+    """Raised when a file does not contain a battle log section."""
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        super().__init__(f"No battle log found in {path}")
+        self.path = path
+
+
+def unescape_log(log: bytes) -> str:
+    """Decode a raw battle log, undoing the `<\\/` escaping used inside scripts."""
+    return log.decode("utf-8").replace("<\\/", "</")
+
+
+def scan_replay(path: Union[str, os.PathLike]) -> ReplayIndexEntry:
+    """
+    Locate the battle log of a replay file and extract its metadata.
+
+    Args:
+        path: Replay HTML file
+
+    Returns:
+        ReplayIndexEntry for the file
+
+    Raises:
+        ReplayLogNotFoundError: If the file has no battle log section
+    """
+    stat = os.stat(path)
+    if stat.st_size == 0:
+        raise ReplayLogNotFoundError(path)
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        marker = data.find(LOG_START_MARKER)
+        if marker == -1:
+            raise ReplayLogNotFoundError(path)
+        log_start = marker + len(LOG_START_MARKER)
+        log_end = data.find(LOG_END_MARKER, log_start)
+        if log_end == -1:
+            raise ReplayLogNotFoundError(path)
+
+        log = data[log_start:log_end]
+        tier = _TIER_RE.search(log)
+        return ReplayIndexEntry(
+            path=os.fspath(path),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            log_start=log_start,
+            log_end=log_end,
+            sha256=hashlib.sha256(data).hexdigest(),
+            format=tier.group(1).decode("utf-8").strip() if tier else None,
+            players=[
+                player.decode("utf-8").strip() for player in _PLAYER_RE.findall(log)
+            ],
+        )
+
+
+class ReplayIndex:
+    """
+    Index of replay files keyed by path, stored in a compact binary file.
+
+    Strings (paths, formats and player names) are written once in a string
+    table and referenced by position from fixed-size entry records.
+    """
+
+    def __init__(self, entries: Optional[Iterable[ReplayIndexEntry]] = None):
+        self.entries: Dict[str, ReplayIndexEntry] = {}
+        for entry in entries or []:
+            self.entries[entry.path] = entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, path: Union[str, os.PathLike]) -> bool:
+        return os.fspath(path) in self.entries
+
+    def __iter__(self) -> Iterator[ReplayIndexEntry]:
+        return iter(self.entries.values())
+
+    def get(self, path: Union[str, os.PathLike]) -> Optional[ReplayIndexEntry]:
+        """Entry of an indexed file, if any."""
+        return self.entries.get(os.fspath(path))
+
+    def is_stale(self, entry: ReplayIndexEntry) -> bool:
+        """Whether the file of an entry changed or disappeared since indexed."""
+        try:
+            stat = os.stat(entry.path)
+        except FileNotFoundError:
+            return True
+        return stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns
+
+    def update(
+        self, paths: Iterable[Union[str, os.PathLike]], prune: bool = False
+    ) -> Tuple[int, int]:
+        """
+        Index new or modified files, skipping the ones unchanged since indexed.
+
+        Files without a battle log are ignored.
+
+        Args:
+            paths: Replay files to index
+            prune: Drop the entries of files not present in `paths`
+
+        Returns:
+            Tuple with the number of (indexed, unchanged) files
+        """
+        indexed = unchanged = 0
+        seen = set()
+        for path in paths:
+            key = os.fspath(path)
+            seen.add(key)
+            entry = self.entries.get(key)
+            if entry is not None and not self.is_stale(entry):
+                unchanged += 1
+                continue
+            try:
+                self.entries[key] = scan_replay(key)
+            except ReplayLogNotFoundError:
+                self.entries.pop(key, None)
+                continue
+            indexed += 1
+        if prune:
+            for key in set(self.entries) - seen:
+                del self.entries[key]
+        return indexed, unchanged
+
+    def update_directory(
+        self, directory: Union[str, os.PathLike], pattern: str = "**/*.html"
+    ) -> Tuple[int, int]:
+        """Index the replay files of a directory, pruning deleted ones."""
+        return self.update(sorted(Path(directory).glob(pattern)), prune=True)
+
+    def find(
+        self, format: Optional[str] = None, player: Optional[str] = None
+    ) -> List[ReplayIndexEntry]:
+        """
+        Indexed replays matching a format and/or player (case insensitive).
+
+        Args:
+            format: Format as written in the `|tier|` line
+            player: Name of either player
+
+        Returns:
+            List of matching entries
+        """
+        format = format.lower() if format else None
+        player = player.lower() if player else None
+        return [
+            entry
+            for entry in self.entries.values()
+            if (format is None or (entry.format or "").lower() == format)
+            and (player is None or player in (p.lower() for p in entry.players))
+        ]
+
+    # Log access
+
+    @staticmethod
+    def read_log_bytes(entry: ReplayIndexEntry) -> bytes:
+        """Raw battle log of an entry, read by slicing a memory map of the file."""
+        with (
+            open(entry.path, "rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            return data[entry.log_start : entry.log_end]
+
+    def _fresh(self, entry: ReplayIndexEntry) -> ReplayIndexEntry:
+        """Rescan the file of an entry if it changed since it was indexed."""
+        if not self.is_stale(entry):
+            return entry
+        entry = scan_replay(entry.path)
+        self.entries[entry.path] = entry
+        return entry
+
+    def read_log(self, path: Union[str, os.PathLike]) -> str:
+        """
+        Battle log of an indexed file, rescanning it first if it changed.
+
+        Args:
+            path: Indexed replay file
+
+        Returns:
+            Unescaped battle log text
+        """
+        entry = self.entries.get(os.fspath(path))
+        if entry is None:
+            raise KeyError(os.fspath(path))
+        return unescape_log(self.read_log_bytes(self._fresh(entry)))
+
+    def iter_logs(
+        self, entries: Optional[Iterable[ReplayIndexEntry]] = None
+    ) -> Iterator[Tuple[ReplayIndexEntry, str]]:
+        """Yield (entry, battle log) for the given entries, all by default."""
+        for entry in entries if entries is not None else list(self.entries.values()):
+            entry = self._fresh(entry)
+            yield entry, unescape_log(self.read_log_bytes(entry))
+
+    # Serialization
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Write the index to a binary file atomically."""
+        strings: List[str] = []
+        positions: Dict[str, int] = {}
+
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return _NO_STRING
+            if value not in positions:
+                positions[value] = len(strings)
+                strings.append(value)
+            return positions[value]
+
+        records = []
+        for entry in self.entries.values():
+            players = [intern(player) for player in entry.players[:255]]
+            records.append(
+                _ENTRY.pack(
+                    intern(entry.path),
+                    entry.size,
+                    entry.mtime_ns,
+                    entry.log_start,
+                    entry.log_end,
+                    bytes.fromhex(entry.sha256),
+                    intern(entry.format),
+                    len(players),
+                )
+                + struct.pack(f"<{len(players)}I", *players)
+            )
+
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, len(strings)))
+            for value in strings:
+                encoded = value.encode("utf-8")
+                file.write(_STRING_LENGTH.pack(len(encoded)) + encoded)
+            file.write(_COUNT.pack(len(records)))
+            file.writelines(records)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "ReplayIndex":
+        """Load an index saved with `save`, or an empty one if missing."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        data = path.read_bytes()
+        magic, version, string_count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Unsupported replay index file {path}")
+        offset = _HEADER.size
+
+        strings: List[str] = []
+        for _ in range(string_count):
+            (length,) = _STRING_LENGTH.unpack_from(data, offset)
+            offset += _STRING_LENGTH.size
+            strings.append(data[offset : offset + length].decode("utf-8"))
+            offset += length
+
+        def lookup(position: int) -> Optional[str]:
+            return None if position == _NO_STRING else strings[position]
+
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        entries = []
+        for _ in range(count):
+            (
+                path_position,
+                size,
+                mtime_ns,
+                log_start,
+                log_end,
+                digest,
+                format_position,
+                player_count,
+            ) = _ENTRY.unpack_from(data, offset)
+            offset += _ENTRY.size
+            players = struct.unpack_from(f"<{player_count}I", data, offset)
+            offset += 4 * player_count
+            entries.append(
+                ReplayIndexEntry(
+                    path=strings[path_position],
+                    size=size,
+                    mtime_ns=mtime_ns,
+                    log_start=log_start,
+                    log_end=log_end,
+                    sha256=digest.hex(),
+                    format=lookup(format_position),
+                    players=[strings[position] for position in players],
+                )
+            )
+        return cls(entries)
@@ -0,0 +1,261 @@
+"""
+Content-addressed on-disk cache of parsed replays and analysis results.
+
+Entries are keyed by the SHA-256 of what they were computed from (replay bytes
+or the battles of a Training) and stored with the compact encoding. The cache
+directory holds one namespace per combination of cache/parser versions, so
+bumping a version makes every entry computed by the previous one unreachable.
+Other processes may still use other namespaces: they are only deleted once
+unused for `STALE_NAMESPACE_SECONDS`, or by an explicit `prune`. Analyses are
+also keyed by the analytics version the server reports, so they never outlive
+a change of the analytics. Entries are evicted least recently used first once
+the size cap is reached.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+from src.models.training import Battle, Training
+from src.util.compact import battle_from_dict, battle_to_dict, decode, encode
+
+# Bump when the output of the replay parsing changes, entries computed by the
+# previous version are then unreachable
+REPLAY_PARSER_VERSION = 1
+
+DEFAULT_VERSIONS: Dict[str, Union[str, int]] = {
+    "cache": 1,
+    "replay_parser": REPLAY_PARSER_VERSION,
+}
+
+# Namespaces unused for longer are deleted when a cache is opened
+STALE_NAMESPACE_SECONDS = 30 * 24 * 3600
+# The last use of a namespace is the modification time of its VERSIONS file,
+# refreshed at most this often
+_TOUCH_INTERVAL = 3600
+_VERSIONS_FILE = "VERSIONS"
+
+
+def replay_key(data: bytes) -> str:
+    """Cache key of a replay file content, same as ReplayIndexEntry.sha256."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def training_key(training: Training) -> str:
+    """
+    Cache key of the content of a Training that its analysis depends on.
+
+    Only the results and turns of the battles, in order, are hashed: the ids,
+    names, descriptions, version and teams of the training and its battles do
+    not change the analysis, so renamed or copied trainings share a key.
+
+    Args:
+        training: Training with its battles
+
+    Returns:
+        SHA-256 of the canonical JSON of the battles
+    """
+    battles = [
+        {"result": battle.result, "turns": [asdict(turn) for turn in battle.turns]}
+        for battle in training.battles
+    ]
+    canonical = json.dumps(battles, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def analysis_key(training: Training, analytics_version: str) -> str:
+    """Cache key of the analysis of a Training by a version of the analytics."""
+    return hashlib.sha256(
+        f"{training_key(training)}:{analytics_version}".encode("utf-8")
+    ).hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of compact encoded values with a size cap and LRU eviction."""
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        max_bytes: int = 256 * 1024 * 1024,
+        versions: Optional[Dict[str, Union[str, int]]] = None,
+    ):
+        """
+        Open (or create) a cache.
+
+        Args:
+            directory: Directory holding the cache namespaces
+            max_bytes: Maximum total size of the entries
+            versions: Versions overriding DEFAULT_VERSIONS, e.g. of a parser
+                that is not part of this package
+        """
+        self.max_bytes = max_bytes
+        self.versions = {**DEFAULT_VERSIONS, **(versions or {})}
+        self.hits = 0
+        self.misses = 0
+
+        versions_json = json.dumps(self.versions, sort_keys=True)
+        digest = hashlib.sha256(versions_json.encode("utf-8")).hexdigest()
+        self.namespace = digest[:16]
+        self.directory = Path(directory)
+        self.root = self.directory / self.namespace
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / _VERSIONS_FILE).write_text(versions_json)
+        self._touched_at = time.time()
+        self.prune(STALE_NAMESPACE_SECONDS)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def prune(self, max_age: float = 0) -> int:
+        """
+        Delete the other namespaces, e.g. of previous versions.
+
+        Args:
+            max_age: Only delete the namespaces unused for this many seconds,
+                the default deletes them even while other processes use them
+
+        Returns:
+            Number of deleted namespaces
+        """
+        deleted = 0
+        # Only directories created by a cache (with a VERSIONS file) are removed
+        for path in self.directory.iterdir():
+            if path == self.root:
+                continue
+            try:
+                used_at = (path / _VERSIONS_FILE).stat().st_mtime
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            if time.time() - used_at >= max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                deleted += 1
+        return deleted
+
+    def _touch(self) -> None:
+        # Keeps the namespace from being pruned as stale while in use
+        now = time.time()
+        if now - self._touched_at < _TOUCH_INTERVAL:
+            return
+        self._touched_at = now
+        try:
+            os.utime(self.root / _VERSIONS_FILE)
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _entries(self) -> Iterator[Tuple[float, int, Path]]:
+        for path in self.root.glob("??/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    @property
+    def size(self) -> int:
+        """Total size of the entries in bytes."""
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Raw entry content, marking the entry as recently used."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch()
+        return data
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        """Store raw entry content, evicting old entries if over the size cap."""
+        path = self._path(key)
+        # Parents included, in case another process pruned the namespace
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._touch()
+        try:
+            self._size -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Evict down to 90% of the cap so a full cache is not rescanned on
+        # every insertion
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(self._entries()):
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+
+    def get(self, key: str) -> Optional[Any]:
+        """Decoded value of an entry, None if missing."""
+        data = self.get_bytes(key)
+        return decode(data) if data is not None else None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-like value."""
+        self.put_bytes(key, encode(value))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Value of an entry, computing and storing it when missing."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        path = self._path(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        self._size -= size
+
+    def clear(self) -> None:
+        """Remove every entry of the current namespace."""
+        for _, _, path in list(self._entries()):
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    # Typed helpers
+
+    def get_battle(self, replay: bytes) -> Optional[Battle]:
+        """Battle parsed from a replay, if cached."""
+        data = self.get(replay_key(replay))
+        return battle_from_dict(data) if data is not None else None
+
+    def put_battle(self, replay: bytes, battle: Battle) -> None:
+        """Store the Battle parsed from a replay."""
+        self.put(replay_key(replay), battle_to_dict(battle))
+
+    def get_analysis(
+        self, training: Training, analytics_version: str
+    ) -> Optional[Dict[str, Any]]:
+        """Analysis of a training with the same content, if cached."""
+        return self.get(analysis_key(training, analytics_version))
+
+    def put_analysis(
+        self, training: Training, analytics_version: str, analysis: Dict[str, Any]
+    ) -> None:
+        """Store the analysis of a training by a version of the analytics."""
+        self.put(analysis_key(training, analytics_version), analysis)
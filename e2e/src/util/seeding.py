@@ -0,0 +1,171 @@
+"""
+Batched, concurrent creation and deletion of test data.
+
+Entities submitted to a Seeder are queued, then created concurrently, all the
+queued ones at once, when the result of any of them is first needed. Each
+user gets a single authenticated client, shared by its creations. When the
+seeder is closed, the created entities are deleted concurrently, one stage at
+a time, so that entities are deleted before the ones they depend on (battles
+before their trainings, trainings before their teams).
+"""
+
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+from src.models.user import User
+from src.util.api import IncineroarAPI, create_authenticated_api
+
+T = TypeVar("T")
+
+
+class CleanupError(Exception):
+    """Cleanups of a seeder failed, every other one having run."""
+
+    def __init__(self, errors: List[Exception]):
+        super().__init__(
+            f"{len(errors)} cleanups failed: "
+            + "; ".join(f"{type(error).__name__}: {error}" for error in errors)
+        )
+        self.errors = errors
+
+
+class Pending(Generic[T]):
+    """Queued creation, made (with every other queued one) on `result()`."""
+
+    def __init__(self, seeder: "Seeder", create: Callable[[], T]):
+        self._seeder = seeder
+        self._create = create
+        self._future: Optional["Future[T]"] = None
+
+    def result(self) -> T:
+        if self._future is None:
+            self._seeder.flush()
+        assert self._future is not None
+        return self._future.result()
+
+
+class Seeder:
+    """Queue of test data creations, run concurrently, and their cleanup."""
+
+    def __init__(self, max_workers: int = 8, run_id: Optional[str] = None):
+        self.run_id = run_id
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._queue: List[Pending[Any]] = []
+        self._apis: Dict[str, IncineroarAPI] = {}
+        # Entities created by the factories, in creation order
+        self.created: List[Any] = []
+        self._cleanups: Dict[int, List[Callable[[], Any]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def api(self, user: User) -> IncineroarAPI:
+        """Authenticated client of the user, shared by all its creations."""
+        with self._lock:
+            api = self._apis.get(user.username)
+            if api is None:
+                api = create_authenticated_api(
+                    user.username, user.password, run_id=self.run_id
+                )
+                self._apis[user.username] = api
+        return api
+
+    def submit(self, create: Callable[[], T]) -> Pending[T]:
+        """Queues a creation, made on the next flush."""
+        pending = Pending(self, create)
+        self._queue.append(pending)
+        return pending
+
+    def flush(self):
+        """Makes every queued creation concurrently and waits for them."""
+        queue, self._queue = self._queue, []
+        for pending in queue:
+            pending._future = self._executor.submit(pending._create)
+        wait([pending._future for pending in queue])
+
+    def record(self, entity: Any):
+        """Records an entity created by a factory."""
+        with self._lock:
+            self.created.append(entity)
+
+    def on_close(self, stage: int, cleanup: Callable[[], Any]):
+        """Runs the cleanup when closing, after the ones of earlier stages."""
+        with self._lock:
+            self._cleanups[stage].append(cleanup)
+
+    def close(self):
+        """
+        Deletes the created entities, stage by stage, each concurrently.
+
+        Raises:
+            CleanupError: If cleanups failed, once every stage has run
+        """
+        errors: List[Exception] = []
+        try:
+            self.flush()
+            for stage in sorted(self._cleanups):
+                for future in [
+                    self._executor.submit(cleanup)
+                    for cleanup in self._cleanups.pop(stage)
+                ]:
+                    try:
+                        future.result()
+                    except Exception as error:
+                        errors.append(error)
+        finally:
+            self._executor.shutdown()
+        if errors:
+            raise CleanupError(errors) from errors[0]
+
+
+class Factory(Generic[T]):
+    """
+    Creates entities of a kind for users, through a seeder.
+
+    Calling the factory creates an entity right away, with every creation
+    queued before it; `submit` only queues it. The entities are deleted, at the
+    given stage, when the seeder is closed.
+    """
+
+    def __init__(
+        self,
+        seeder: Seeder,
+        create: Callable[..., T],
+        delete: Callable[..., Any],
+        stage: int,
+    ):
+        self.seeder = seeder
+        self.create = create
+        self.delete = delete
+        self.stage = stage
+
+    def bind(self, seeder: Seeder) -> "Factory[T]":
+        """Same factory, creating through another seeder."""
+        return Factory(seeder, self.create, self.delete, self.stage)
+
+    def submit(self, user: User, *args: Any) -> Pending[T]:
+        """
+        Queues the creation of an entity.
+
+        Args:
+            user: Owner of the entity
+            *args: Arguments of `create`, after the user's client
+
+        Returns:
+            Pending creation, whose `result()` is the created entity
+        """
+
+        def _create() -> T:
+            api = self.seeder.api(user)
+            created = self.create(api, *args)
+            if getattr(created, "id", None) is not None:
+                self.seeder.record(created)
+                self.seeder.on_close(
+                    self.stage, lambda: self.delete(api, *args, created)
+                )
+            return created
+
+        return self.seeder.submit(_create)
+
+    def __call__(self, user: User, *args: Any) -> T:
+        return self.submit(user, *args).result()
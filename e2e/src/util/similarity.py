@@ -0,0 +1,278 @@
+"""
+MinHash/LSH similarity search for teams.
+
+Each team paste is turned into a set of features (pokemon, pokemon+item and
+pokemon+move) and summarized by a MinHash signature. Signatures are split in
+bands and hashed into LSH buckets so that top-k lookups only compare against
+teams sharing at least one bucket instead of every indexed team.
+"""
+
+import hashlib
+import random
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.models.team import Team
+from src.models.tournament import Tournament, TournamentTeam
+from src.util.team_parser import parse_team
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def team_features(data: str) -> Set[str]:
+    """
+    Build the feature set of a team paste.
+
+    Args:
+        data: Team data in Showdown paste format (a bare species name also works)
+
+    Returns:
+        Set of normalized `pokemon`, `pokemon@item` and `pokemon:move` features
+    """
+    features: Set[str] = set()
+    for pokemon_set in parse_team(data):
+        species = pokemon_set.species.lower()
+        features.add(species)
+        if pokemon_set.item:
+            features.add(f"{species}@{pokemon_set.item.lower()}")
+        for move in pokemon_set.moves:
+            features.add(f"{species}:{move.lower()}")
+    return features
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity between two feature sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """Computes MinHash signatures using a seeded universal hash family."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    @staticmethod
+    def _hash_feature(feature: str) -> int:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") & _MAX_HASH
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a feature set.
+
+        Args:
+            features: Features of a team
+
+        Returns:
+            Tuple with `num_perm` minimum hash values
+        """
+        hashes = [self._hash_feature(f) for f in features]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+    @staticmethod
+    def estimate(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimate the Jaccard similarity from two signatures."""
+        matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return matches / len(sig_a)
+
+
+class TeamSimilarityIndex:
+    """
+    LSH index of team signatures for near-duplicate team lookups.
+
+    Teams are indexed by an arbitrary key, `add_team` uses the team id and
+    `add_tournament` uses `{tournament_id}:{player}`.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        """
+        Initialize the index.
+
+        Args:
+            num_perm: Number of hash functions per signature
+            bands: Number of LSH bands, must divide num_perm. More bands find
+                less similar candidates at the cost of larger buckets
+            seed: Seed of the hash family, indexes must share it to be comparable
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [
+            defaultdict(set) for _ in range(bands)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.signatures
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start : start + self.rows]
+
+    def add(self, key: str, data: str) -> None:
+        """
+        Index a team paste under a key, replacing any previous entry.
+
+        Args:
+            key: Unique key of the team
+            data: Team data
+        """
+        if key in self.signatures:
+            self.remove(key)
+        signature = self.hasher.signature(team_features(data))
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].add(key)
+
+    def remove(self, key: str) -> None:
+        """Remove a team from the index if present."""
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is None:
+                continue
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+    def add_team(self, team: Team) -> str:
+        """Index a user `Team`, returns the key used."""
+        key = team.id or team.name
+        self.add(key, team.data)
+        return key
+
+    def add_tournament_team(self, tournament_id: str, team: TournamentTeam) -> str:
+        """Index a single `TournamentTeam`, returns the key used."""
+        key = f"{tournament_id}:{team.player}"
+        self.add(key, team.data)
+        return key
+
+    def add_tournament(self, tournament: Tournament) -> List[str]:
+        """Index every team of a tournament, returns the keys used."""
+        tournament_id = tournament.id or tournament.name
+        return [
+            self.add_tournament_team(tournament_id, team) for team in tournament.teams
+        ]
+
+    def _candidates(self, signature: Tuple[int, ...]) -> Set[str]:
+        candidates: Set[str] = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return candidates
+
+    def query(
+        self, data: str, k: int = 10, exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most similar indexed teams.
+
+        Only teams sharing an LSH bucket with the query are scored, so teams
+        with a low similarity may not be returned even if k is not reached.
+
+        Args:
+            data: Team data to look up
+            k: Maximum number of results
+            exclude: Key to leave out of the results (e.g. the query's own key)
+
+        Returns:
+            List of (key, estimated Jaccard similarity) sorted by similarity
+        """
+        signature = self.hasher.signature(team_features(data))
+        scored = [
+            (key, MinHasher.estimate(signature, self.signatures[key]))
+            for key in self._candidates(signature)
+            if key != exclude
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:k]
+
+    def query_team(self, team: Team, k: int = 10) -> List[Tuple[str, float]]:
+        """Find the teams most similar to a user `Team`, excluding itself."""
+        return self.query(team.data, k, exclude=team.id)
+
+    def similar_pairs(self, threshold: float = 0.5) -> List[Tuple[str, str, float]]:
+        """
+        Find all pairs of indexed teams above a similarity threshold.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity
+
+        Returns:
+            List of (key_a, key_b, similarity) with key_a < key_b
+        """
+        seen: Set[Tuple[str, str]] = set()
+        pairs: List[Tuple[str, str, float]] = []
+        for buckets in self._buckets:
+            for keys in buckets.values():
+                if len(keys) < 2:
+                    continue
+                ordered = sorted(keys)
+                for i, key_a in enumerate(ordered):
+                    for key_b in ordered[i + 1 :]:
+                        if (key_a, key_b) in seen:
+                            continue
+                        seen.add((key_a, key_b))
+                        score = MinHasher.estimate(
+                            self.signatures[key_a], self.signatures[key_b]
+                        )
+                        if score >= threshold:
+                            pairs.append((key_a, key_b, score))
+        pairs.sort(key=lambda item: (-item[2], item[0], item[1]))
+        return pairs
+
+    def clusters(self, threshold: float = 0.5) -> List[List[str]]:
+        """
+        Group indexed teams into clusters of near-duplicates.
+
+        Clusters are the connected components of the pairs returned by
+        `similar_pairs`; teams without similar pairs are not returned.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity to link two teams
+
+        Returns:
+            List of clusters sorted by size, each one a sorted list of keys
+        """
+        parent: Dict[str, str] = {}
+
+        def find(key: str) -> str:
+            parent.setdefault(key, key)
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for key_a, key_b, _ in self.similar_pairs(threshold):
+            root_a, root_b = find(key_a), find(key_b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for key in parent:
+            groups[find(key)].append(key)
+        return sorted(
+            (sorted(group) for group in groups.values()),
+            key=lambda group: (-len(group), group[0]),
+        )
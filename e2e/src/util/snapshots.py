@@ -0,0 +1,315 @@
+"""
+Snapshots of the test data of modules, restored instead of seeding it again.
+
+Seeding the data of a module through the API takes seconds, even
+concurrently, and is the longest setup of the slow modules. The first time a
+seed function runs, the documents of the entities its factories created, and
+what it returned, are saved to a snapshot database on the app's Mongo server,
+keyed by a hash of the seeding code: the module of the seed function, the
+seeder, the API client and the e2e and app models. The result is stored as
+JSON, the models it holds tagged with their class, rebuilt only if one of
+`SNAPSHOT_MODELS`: a shared database must not be able to run code in tests. Later runs restore the
+snapshot with one bulk insert per collection, under new ids, so that workers
+and modules never share documents, and delete the restored documents when
+the module's seeder is closed.
+
+When that code changes, so does the key: the snapshot is stale, the data is
+seeded through the API again and snapshotted anew, replacing the stale
+snapshot. Without a database (`E2E_MONGODB_URIS` unset or unreachable) the
+data is always seeded through the API.
+"""
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from src.models import team, tournament, training
+from src.util.constants import RUN_ID
+from src.util.data import load_users, worker_username
+from src.util.seeding import Seeder
+
+T = TypeVar("T")
+
+E2E_DIR = Path(__file__).resolve().parents[2]
+# Code the seeded data depends on, besides the module of the seed function
+SEEDING_SOURCES = [
+    Path(__file__),
+    E2E_DIR / "src" / "util" / "api.py",
+    E2E_DIR / "src" / "util" / "seeding.py",
+    *sorted((E2E_DIR / "src" / "models").glob("*.py")),
+    *sorted((E2E_DIR.parent / "src" / "db" / "models").glob("*.ts")),
+]
+SNAPSHOT_DATABASE = "incineroar-e2e-snapshots"
+# Collections of the entities the factories create
+ENTITY_COLLECTIONS = ("teams", "tournaments", "trainings", "battles")
+# Fields of the users referencing their entities
+OWNED_FIELDS = ("teams", "trainings")
+# Models a seed function may return, by name
+SNAPSHOT_MODELS: Dict[str, Type[Any]] = {
+    model.__name__: model
+    for module in (team, tournament, training)
+    for model in vars(module).values()
+    if dataclasses.is_dataclass(model) and model.__module__ == module.__name__
+}
+
+
+def connect(uri: Optional[str]) -> Optional[MongoClient]:
+    """Client of the app's Mongo server, None when missing or unreachable."""
+    if not uri:
+        return None
+    client: MongoClient = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        return None
+    return client
+
+
+def snapshot_key(seed: Callable[..., Any]) -> str:
+    """Hash of the code the data of a seed function depends on."""
+    digest = hashlib.sha256(f"{seed.__module__}.{seed.__qualname__}".encode())
+    for path in [Path(inspect.getfile(seed)), *SEEDING_SOURCES]:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _remap(value: Any, ids: Dict[Any, Any]) -> Any:
+    """Copy of a value with the mapped ids (and usernames) replaced."""
+    if isinstance(value, (ObjectId, str)):
+        return ids.get(value, value)
+    if isinstance(value, list):
+        return [_remap(item, ids) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_remap(item, ids) for item in value)
+    if isinstance(value, dict):
+        return {key: _remap(item, ids) for key, item in value.items()}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.replace(
+            value,
+            **{
+                field.name: _remap(getattr(value, field.name), ids)
+                for field in dataclasses.fields(value)
+                if field.init
+            },
+        )
+    return value
+
+
+def _to_json(value: Any) -> Any:
+    """JSON value of a seed result, with its models and tuples tagged."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json(item) for item in value]}
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {"__dict__": {key: _to_json(item) for key, item in value.items()}}
+    model = type(value).__name__
+    if SNAPSHOT_MODELS.get(model) is type(value):
+        return {
+            "__model__": model,
+            "fields": {
+                field.name: _to_json(getattr(value, field.name))
+                for field in dataclasses.fields(value)
+                if field.init
+            },
+        }
+    raise TypeError(f"Cannot snapshot a seed result holding {type(value)!r}")
+
+
+def _from_json(value: Any) -> Any:
+    """Seed result of a JSON value created by `_to_json`."""
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__tuple__" in value:
+        return tuple(_from_json(item) for item in value["__tuple__"])
+    if "__dict__" in value:
+        return {key: _from_json(item) for key, item in value["__dict__"].items()}
+    model = SNAPSHOT_MODELS[value["__model__"]]
+    return model(**{key: _from_json(item) for key, item in value["fields"].items()})
+
+
+class Snapshots:
+    """Module test data, seeded through a seeder or restored from Mongo."""
+
+    def __init__(self, seeder: Seeder, client: Optional[MongoClient] = None):
+        self.seeder = seeder
+        self.client = client
+
+    def __call__(self, seed: Callable[..., T], *args: Any) -> T:
+        """
+        Data of a seed function, restored from its snapshot when up to date.
+
+        Args:
+            seed: Function creating the data with the factories of the seeder
+            *args: Arguments of the seed function
+
+        Returns:
+            What the seed function returns, with the ids of the restored
+            entities when restored
+        """
+        if self.client is None:
+            return seed(*args)
+
+        key = snapshot_key(seed)
+        snapshot = self.client[SNAPSHOT_DATABASE].snapshots.find_one({"_id": key})
+        if snapshot is not None:
+            return self.restore(snapshot)
+
+        start = len(self.seeder.created)
+        result = seed(*args)
+        self.seeder.flush()
+        name = f"{seed.__module__}.{seed.__qualname__}"
+        self.save(key, name, self.seeder.created[start:], result)
+        return result
+
+    def save(self, key: str, name: str, entities: List[Any], result: Any):
+        """Saves the documents of the entities and the result of a seed."""
+        assert self.client is not None
+        stored_result = json.dumps(_to_json(result))
+        db = self.client.get_default_database("test")
+        snapshots = self.client[SNAPSHOT_DATABASE]
+
+        ids = {ObjectId(entity.id) for entity in entities}
+        documents = {
+            collection: list(db[collection].find({"_id": {"$in": list(ids)}}))
+            for collection in ENTITY_COLLECTIONS
+        }
+        documents["traininganalytics"] = list(
+            db.traininganalytics.find({"training": {"$in": list(ids)}})
+        )
+        base_usernames = {worker_username(base): base for base in load_users()}
+        owners = {}
+        for user in db.users.find(
+            {
+                "username": {"$in": list(base_usernames)},
+                "$or": [{field: {"$in": list(ids)}} for field in OWNED_FIELDS],
+            }
+        ):
+            owners[base_usernames[user["username"]]] = {
+                field: [ref for ref in user.get(field, []) if ref in ids]
+                for field in OWNED_FIELDS
+            }
+
+        # Documents are saved first, under an id of their own, so that a
+        # snapshot is only found once complete, whichever worker saves it
+        build = uuid.uuid4().hex
+        stored = [
+            {"build": build, "collection": collection, "document": document}
+            for collection, collection_documents in documents.items()
+            for document in collection_documents
+        ]
+        if stored:
+            snapshots.documents.insert_many(stored)
+        try:
+            snapshots.snapshots.insert_one(
+                {
+                    "_id": key,
+                    "name": name,
+                    "build": build,
+                    "createdAt": datetime.now(timezone.utc),
+                    "usernames": {base: worker_username(base) for base in owners},
+                    "owners": owners,
+                    "result": stored_result,
+                }
+            )
+        except DuplicateKeyError:
+            # Saved concurrently by another worker
+            snapshots.documents.delete_many({"build": build})
+            return
+
+        stale = list(snapshots.snapshots.find({"name": name, "_id": {"$ne": key}}))
+        snapshots.snapshots.delete_many({"_id": {"$in": [s["_id"] for s in stale]}})
+        snapshots.documents.delete_many({"build": {"$in": [s["build"] for s in stale]}})
+
+    def restore(self, snapshot: Dict[str, Any]) -> Any:
+        """Inserts copies of the documents of a snapshot, returns its result."""
+        assert self.client is not None
+        db = self.client.get_default_database("test")
+
+        documents: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for stored in self.client[SNAPSHOT_DATABASE].documents.find(
+            {"build": snapshot["build"]}
+        ):
+            documents[stored["collection"]].append(stored["document"])
+
+        ids: Dict[Any, Any] = {}
+        for document in (d for docs in documents.values() for d in docs):
+            new_id = ObjectId()
+            ids[document["_id"]] = new_id
+            ids[str(document["_id"])] = str(new_id)
+        for base, username in snapshot["usernames"].items():
+            ids[username] = worker_username(base)
+
+        # Timestamps are moved to now, keeping their order, so that the restored
+        # entities are not taken for the ones of a stale test run
+        offset = datetime.now(timezone.utc).replace(tzinfo=None) - snapshot[
+            "createdAt"
+        ].replace(tzinfo=None)
+        restored: Dict[str, List[ObjectId]] = {}
+        for collection, collection_documents in documents.items():
+            copies = [_remap(document, ids) for document in collection_documents]
+            for copy in copies:
+                for field in ("createdAt", "updatedAt"):
+                    if isinstance(copy.get(field), datetime):
+                        copy[field] += offset
+                if collection in ENTITY_COLLECTIONS:
+                    copy["runId"] = RUN_ID
+            db[collection].insert_many(copies)
+            restored[collection] = [copy["_id"] for copy in copies]
+
+        owners = {
+            worker_username(base): {
+                field: [ids[ref] for ref in refs] for field, refs in fields.items()
+            }
+            for base, fields in snapshot["owners"].items()
+        }
+        for username, fields in owners.items():
+            db.users.update_one(
+                {"username": username},
+                {"$push": {field: {"$each": refs} for field, refs in fields.items()}},
+            )
+        self.seeder.on_close(0, lambda: self.delete(restored, owners))
+
+        return _remap(_from_json(json.loads(snapshot["result"])), ids)
+
+    def delete(
+        self,
+        restored: Dict[str, List[ObjectId]],
+        owners: Dict[str, Dict[str, List[ObjectId]]],
+    ):
+        """Deletes restored documents, with the battles added to them since."""
+        assert self.client is not None
+        db = self.client.get_default_database("test")
+
+        for username, fields in owners.items():
+            db.users.update_one(
+                {"username": username},
+                {"$pull": {field: {"$in": refs} for field, refs in fields.items()}},
+            )
+        trainings = restored.get("trainings", [])
+        battles = [
+            battle
+            for training in db.trainings.find(
+                {"_id": {"$in": trainings}}, {"battles": 1}
+            )
+            for battle in training.get("battles", [])
+        ]
+        db.battles.delete_many({"_id": {"$in": battles}})
+        db.traininganalytics.delete_many({"training": {"$in": trainings}})
+        for collection, collection_ids in restored.items():
+            db[collection].delete_many({"_id": {"$in": collection_ids}})
@@ -0,0 +1,138 @@
+"""
+Parser for team data in Showdown paste format.
+
+Parsed teams are stored in an LRU cache keyed by a hash of the paste content,
+so identical pastes shared by many trainings, battles and tournaments are
+parsed only once.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from src.models.team import PokemonSet
+
+
+def _parse_species_line(line: str) -> Tuple[str, Optional[str]]:
+    """Extract species and item from a header like `Nick (Species) (M) @ Item`."""
+    item = None
+    if "@" in line:
+        line, item = line.split("@", 1)
+        item = item.strip() or None
+    name = line.strip()
+    for gender in ("(M)", "(F)"):
+        if name.endswith(gender):
+            name = name[: -len(gender)].strip()
+    if name.endswith(")") and "(" in name:
+        name = name[name.rindex("(") + 1 : -1]
+    return name.strip(), item
+
+
+def _parse_set(block: str) -> Optional[PokemonSet]:
+    lines = [line.strip() for line in block.split("\n") if line.strip()]
+    if not lines:
+        return None
+    species, item = _parse_species_line(lines[0])
+    if not species:
+        return None
+    pokemon_set = PokemonSet(species=species, item=item)
+    for line in lines[1:]:
+        if line.startswith("-"):
+            move = line.lstrip("- ").strip()
+            if move:
+                pokemon_set.moves.append(move)
+        elif line.startswith("Ability:"):
+            pokemon_set.ability = line.split(":", 1)[1].strip() or None
+        elif line.startswith("Tera Type:"):
+            pokemon_set.tera_type = line.split(":", 1)[1].strip() or None
+    return pokemon_set
+
+
+def parse_team_uncached(data: str) -> List[PokemonSet]:
+    """
+    Parse a team paste without going through the cache.
+
+    Args:
+        data: Team data in Showdown paste format (a bare species name also works)
+
+    Returns:
+        List of PokemonSet, one per pokemon in the paste
+    """
+    blocks = data.replace("\r\n", "\n").replace("\r", "\n").split("\n\n")
+    sets = [_parse_set(block) for block in blocks]
+    return [pokemon_set for pokemon_set in sets if pokemon_set is not None]
+
+
+class TeamParseCache:
+    """LRU cache of parsed teams keyed by the SHA-256 of the paste."""
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of parsed pastes to keep
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, List[PokemonSet]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(data: str) -> str:
+        """Content hash used as cache key."""
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def parse(self, data: str) -> List[PokemonSet]:
+        """
+        Parse a team paste, reusing the cached result when available.
+
+        The returned list is a copy, but the PokemonSet instances are shared
+        between callers and should not be mutated.
+
+        Args:
+            data: Team data in Showdown paste format
+
+        Returns:
+            List of PokemonSet
+        """
+        key = self.key(data)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return list(cached)
+
+        self.misses += 1
+        parsed = parse_team_uncached(data)
+        self._entries[key] = parsed
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return list(parsed)
+
+    def clear(self) -> None:
+        """Drop every cached entry and reset the statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+default_cache = TeamParseCache()
+
+
+def parse_team(data: str, cache: Optional[TeamParseCache] = None) -> List[PokemonSet]:
+    """
+    Parse a team paste using an LRU cache.
+
+    Args:
+        data: Team data in Showdown paste format
+        cache: Cache to use (defaults to the module-level cache)
+
+    Returns:
+        List of PokemonSet
+    """
+    # An empty cache is falsy (__len__), so it is compared with None
+    return (cache if cache is not None else default_cache).parse(data)
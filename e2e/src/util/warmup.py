@@ -0,0 +1,251 @@
+"""
+Warm-up of the app routes before the tests.
+
+A development server (`npm run dev`) compiles each page and API route on its
+first request, in seconds: the first test reaching a route pays for it, with
+skewed timings or timeouts. The warm-up requests every page route of the page
+objects and every API route of `IncineroarAPI` concurrently, waiting until
+each of them responds, then requests them again, to report their cold (first)
+and warm latencies. Any response will do, errors included: the placeholder
+ids of the dynamic routes get a 404 once the route is compiled.
+
+The tests warm the app (every app of `E2E_APP_URLS`) up at session start,
+once for all the xdist workers, unless run with `--no-warmup`.
+
+Usage (from the e2e directory):
+    uv run python -m src.util.warmup --url http://localhost:3000
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import pytest
+import requests
+
+from src.util.constants import E2E_APP_PORT, E2E_APP_URLS, NEXT_PUBLIC_APP_URL
+from src.util.data import load_users, worker_username
+
+# Id of the dynamic routes, of no existing entity
+PLACEHOLDER_ID = "0" * 24
+# Seconds between the attempts to reach a route that does not respond yet
+RETRY_INTERVAL = 0.5
+
+
+@dataclass(frozen=True)
+class Route:
+    method: str
+    # With `{id}` for the dynamic segments
+    path: str
+    # Pages under /home redirect to the sign in page without a session
+    signed_in: bool = False
+
+
+SIGN_IN_ROUTE = Route("POST", "/api/auth")
+PAGE_ROUTES = [
+    Route("GET", "/"),
+    Route("GET", "/auth"),
+    *(
+        Route("GET", path, signed_in=True)
+        for path in (
+            "/home",
+            "/home/teams",
+            "/home/teams/{id}",
+            "/home/metagame",
+            "/home/metagame/{id}",
+            "/home/metagame/admin",
+            "/home/training",
+            "/home/training/{id}",
+            "/home/training/{id}/analyze",
+            "/home/training/{id}/{id}",
+        )
+    ),
+]
+# Each route file is compiled whatever the method, unsupported ones get a 405
+API_ROUTES = [
+    SIGN_IN_ROUTE,
+    *(
+        Route("GET", f"/api/{endpoint}", signed_in=True)
+        for endpoint in (
+            "user/me",
+            "user/team",
+            "user/team/{id}",
+            "user/training",
+            "user/training/{id}",
+            "user/training/{id}/analyze",
+            "user/training/{id}/battle",
+            "user/training/{id}/battle/{id}",
+            "tournament",
+            "tournament/{id}",
+            "tournament/import",
+            "tournament/import/{id}",
+            "test/runs",
+        )
+    ),
+]
+
+
+@dataclass
+class RouteTiming:
+    route: Route
+    # Latencies in seconds, None without a response before the deadline
+    cold: Optional[float] = None
+    warm: Optional[float] = None
+    status: Optional[int] = None
+
+
+def _request(
+    base_url: str,
+    route: Route,
+    deadline: float,
+    token: Optional[str] = None,
+    json: Any = None,
+) -> Optional[requests.Response]:
+    """Requests a route until it responds, None if not before the deadline."""
+    url = base_url.rstrip("/") + route.path.format(id=PLACEHOLDER_ID)
+    cookies = {"jwt": token} if route.signed_in and token else None
+    # Without a shared session, whose cookies the responses would change
+    while True:
+        try:
+            return requests.request(
+                route.method,
+                url,
+                json=json,
+                cookies=cookies,
+                allow_redirects=False,
+                timeout=max(deadline - time.monotonic(), 1),
+            )
+        except requests.RequestException:
+            if time.monotonic() + RETRY_INTERVAL >= deadline:
+                return None
+            time.sleep(RETRY_INTERVAL)
+
+
+def warm_up(
+    base_url: str, username: str, password: str, timeout: float = 300
+) -> List[RouteTiming]:
+    """
+    Requests every route of the app twice, until they all respond.
+
+    Args:
+        base_url: URL of the app
+        username: User signing in, an admin reaches the admin pages
+        password: Password of the user
+        timeout: Seconds to wait for the app, and for all the routes to respond
+
+    Returns:
+        Cold and warm latency of each route, sign in first
+    """
+    deadline = time.monotonic() + timeout
+    credentials = {"username": username, "password": password}
+    routes = PAGE_ROUTES + API_ROUTES[1:]
+    timings: Dict[Route, RouteTiming] = {
+        route: RouteTiming(route) for route in [SIGN_IN_ROUTE, *routes]
+    }
+
+    with ThreadPoolExecutor(len(timings)) as pool:
+
+        def _time(route: Route, token: Optional[str], warm: bool):
+            json = credentials if route == SIGN_IN_ROUTE else None
+            start = time.perf_counter()
+            response = _request(base_url, route, deadline, token, json)
+            if response is None:
+                return None
+            timing = timings[route]
+            if warm:
+                timing.warm = time.perf_counter() - start
+            else:
+                timing.cold = time.perf_counter() - start
+            timing.status = response.status_code
+            return response
+
+        # Waits for the app, then signs in for the pages that need a session
+        response = _time(SIGN_IN_ROUTE, None, warm=False)
+        token = response.json().get("jwt") if response and response.ok else None
+        list(pool.map(lambda route: _time(route, token, False), routes))
+        list(pool.map(lambda route: _time(route, token, True), timings))
+
+    return list(timings.values())
+
+
+def _seconds(duration: Optional[float]) -> str:
+    return "-" if duration is None else f"{duration:.2f}s"
+
+
+def format_timings(timings: List[RouteTiming]) -> List[str]:
+    """Lines of a report of the routes, the slowest to compile first."""
+    lines = [f"{'cold':>8}  {'warm':>8}  {'status':>6}  route"]
+    for timing in sorted(timings, key=lambda timing: -(timing.cold or float("inf"))):
+        lines.append(
+            f"{_seconds(timing.cold):>8}  {_seconds(timing.warm):>8}  "
+            f"{timing.status or '-':>6}  {timing.route.method} {timing.route.path}"
+        )
+    return lines
+
+
+class WarmupPlugin:
+    """Warms the app routes up before the tests, and reports their latencies."""
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.timings: Dict[str, List[RouteTiming]] = {}
+
+    # Before pytest-xdist starts the workers, so that it runs once
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionstart(self, session: pytest.Session):
+        config = self.config
+        # Production builds (E2E_APP_SERVER) compile nothing on request
+        if (
+            hasattr(config, "workerinput")
+            or config.option.collectonly
+            or config.getoption("no_warmup")
+            or E2E_APP_PORT is not None
+        ):
+            return
+        admin = load_users()["mew"]
+        for base_url in E2E_APP_URLS or [NEXT_PUBLIC_APP_URL]:
+            timings = warm_up(
+                base_url,
+                worker_username("mew"),
+                admin["password"],
+                config.getoption("warmup_timeout"),
+            )
+            self.timings[base_url] = timings
+            unresponsive = [
+                f"{timing.route.method} {timing.route.path}"
+                for timing in timings
+                if timing.cold is None
+            ]
+            if unresponsive:
+                pytest.exit(
+                    f"{base_url} did not respond to {', '.join(unresponsive)}",
+                    pytest.ExitCode.INTERNAL_ERROR,
+                )
+
+    def pytest_terminal_summary(self, terminalreporter: Any):
+        for base_url, timings in self.timings.items():
+            terminalreporter.write_sep("=", f"route warmup {base_url}")
+            for line in format_timings(timings):
+                terminalreporter.write_line(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=NEXT_PUBLIC_APP_URL, help="app URL")
+    parser.add_argument(
+        "--username", default="mew", help="user of data/users.json to sign in as"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="seconds to wait for the app"
+    )
+    args = parser.parse_args()
+
+    password = load_users()[args.username]["password"]
+    timings = warm_up(args.url, worker_username(args.username), password, args.timeout)
+    print("\n".join(format_timings(timings)))
+
+
+if __name__ == "__main__":
+    main()
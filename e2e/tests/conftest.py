@@ -1,18 +1,145 @@
 from ast import Tuple
-from typing import Any, Callable, Generator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Generator, Optional
 
 import pytest
+from playwright.sync_api import BrowserContext, Page
+from pymongo import MongoClient
 
 from src.models.team import Team
 from src.models.tournament import Tournament
 from src.models.training import Battle, Training
 from src.models.user import User
-from src.util.api import IncineroarAPI, create_authenticated_api
-from src.util.data import load_users
+from src.util.api import APIError, IncineroarAPI, create_authenticated_api
+from src.util.app_server import AppServer, build
+from src.util.asset_blocking import AssetBlockingPlugin, parse_list
+from src.util.auth_state import load_storage_state
+from src.util.constants import (
+    APP_IS_LOCAL,
+    E2E_APP_PORT,
+    E2E_APP_PORT_RESERVATION,
+    E2E_MONGODB_URI,
+    RUN_ID,
+    STALE_RUN_HOURS,
+    WORKER_ID,
+)
+from src.util.data import load_users, worker_username
+from src.util.datasets import DatasetRegistry, Datasets
+from src.util.durations import DURATIONS_FILE, DurationPlugin
+from src.util.pokedata_server import PokedataServer
+from src.util.seeding import Factory, Seeder
+from src.util.snapshots import Snapshots, connect
+from src.util.warmup import WarmupPlugin
+
+
+def pytest_addoption(parser: pytest.Parser):
+    parser.addoption(
+        "--duration-schedule",
+        action="store_true",
+        help="run modules across xdist workers longest first, from past durations",
+    )
+    parser.addoption(
+        "--durations-history",
+        default=str(DURATIONS_FILE),
+        help="file of the recorded test and fixture durations",
+    )
+    parser.addoption(
+        "--no-asset-blocking",
+        action="store_true",
+        help="load every asset in the browser, and record the asset sizes",
+    )
+    parser.addoption(
+        "--stub-assets",
+        action="store_true",
+        help="answer blocked asset requests with empty responses, not errors",
+    )
+    parser.addoption(
+        "--block-resource-types",
+        type=parse_list,
+        help="comma-separated resource types to block, default font,image,media",
+    )
+    parser.addoption(
+        "--block-url",
+        dest="block_url_patterns",
+        action="append",
+        default=[],
+        help="glob pattern of URLs to block, besides the sprites (repeatable)",
+    )
+    parser.addoption(
+        "--no-warmup",
+        action="store_true",
+        help="do not request every app route before the tests",
+    )
+    parser.addoption(
+        "--warmup-timeout",
+        type=float,
+        default=300,
+        help="seconds to wait for every app route to respond at session start",
+    )
+
+
+UNIT_TESTS_DIR = Path(__file__).resolve().parent / "unit"
+
+
+def unit_tests_only(config: pytest.Config) -> bool:
+    """Whether the run only selects the unit tests, which need no app."""
+    paths = [
+        (config.invocation_params.dir / arg.split("::")[0]).resolve()
+        for arg in config.args
+    ]
+    return bool(paths) and all(path.is_relative_to(UNIT_TESTS_DIR) for path in paths)
 
 
 def pytest_configure(config: pytest.Config):
+    if unit_tests_only(config):
+        config.option.no_warmup = True
     config.addinivalue_line("markers", "user: existing test user")
+    config.addinivalue_line(
+        "markers", "full_assets: load every asset, for performance measurements"
+    )
+    config.pluginmanager.register(DurationPlugin(config), "durations-history")
+    config.pluginmanager.register(WarmupPlugin(config), "route-warmup")
+    config.pluginmanager.register(AssetBlockingPlugin(config), "asset-blocking")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session: pytest.Session):
+    # Built once, before pytest-xdist starts the workers and their instances
+    config = session.config
+    if E2E_APP_PORT is not None and not (
+        hasattr(config, "workerinput")
+        or config.option.collectonly
+        or unit_tests_only(config)
+    ):
+        build()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_server() -> Generator[Optional[AppServer], Any, None]:
+    # The instance of this worker, with E2E_APP_SERVER
+    if E2E_APP_PORT is None:
+        yield None
+        return
+    with AppServer(
+        E2E_APP_PORT, name=WORKER_ID or "main", reservation=E2E_APP_PORT_RESERVATION
+    ) as server:
+        yield server
+
+
+@pytest.fixture(scope="session", autouse=True)
+def sweep_stale_runs(app_server: Optional[AppServer]):
+    # Deletes what earlier test runs left behind, e.g. when they crashed before
+    # their teardowns, in a single request. Recent runs may still be running
+    admin = load_users()["mew"]
+    api = create_authenticated_api(worker_username("mew"), admin["password"])
+    before = datetime.now(timezone.utc) - timedelta(hours=STALE_RUN_HOURS)
+    try:
+        api.delete_test_runs(before=before)
+    except APIError as error:
+        # The app was not started with ENABLE_TEST_ROUTES=true
+        if error.status_code != 404:
+            raise
 
 
 @pytest.fixture
@@ -24,7 +151,11 @@ def user(request: pytest.FixtureRequest):
 
     username = marker.args[0]
     users = load_users()
-    return User(username, users[username]["role"], users[username]["password"])
+    return User(
+        worker_username(username),
+        users[username]["role"],
+        users[username]["password"],
+    )
 
 
 GetUser = Callable[[str], User]
@@ -35,86 +166,167 @@ def get_user() -> GetUser:
     users = load_users()
 
     def _get_user(username: str):
-        return User(username, users[username]["role"], users[username]["password"])
+        return User(
+            worker_username(username),
+            users[username]["role"],
+            users[username]["password"],
+        )
 
     return _get_user
 
 
-MakeTeam = Callable[[User, Team], Team]
+StorageState = Callable[[User], dict[str, Any]]
 
 
-@pytest.fixture(scope="module")
-def make_team() -> Generator[MakeTeam, Any, None]:
-    teams: list[tuple[IncineroarAPI, Team]] = []
+@pytest.fixture(scope="session")
+def storage_state() -> StorageState:
+    # Each user is authenticated at most once per session, the login form
+    # itself is covered by test_login.py
+    states: dict[str, dict[str, Any]] = {}
+
+    def _storage_state(user: User):
+        if user.username not in states:
+            states[user.username] = load_storage_state(user)
+        return states[user.username]
+
+    return _storage_state
+
+
+@pytest.fixture
+def context(context: BrowserContext, request: pytest.FixtureRequest) -> BrowserContext:
+    # pytest-playwright's context, without the assets no assertion checks
+    plugin = request.config.pluginmanager.get_plugin("asset-blocking")
+    plugin.install(context, request.node)
+    return context
 
-    def _make_team(user: User, team: Team):
-        api = create_authenticated_api(user.username, user.password)
-        created_team = api.create_team_from_model(team)
-        teams.append((api, created_team))
-        return created_team
 
-    yield _make_team
+SignIn = Callable[[Page, User], None]
 
-    for api, team in teams:
-        if team.id is not None:
-            api.delete_team(team.id)
 
+@pytest.fixture
+def sign_in(storage_state: StorageState) -> SignIn:
+    def _sign_in(page: Page, user: User):
+        page.context.add_cookies(storage_state(user)["cookies"])
 
-MakeTournament = Callable[[User, Tournament], Tournament]
+    return _sign_in
 
 
 @pytest.fixture(scope="module")
-def make_tournament() -> Generator[MakeTournament, Any, None]:
-    tournaments: list[tuple[IncineroarAPI, Tournament]] = []
+def seeder() -> Generator[Seeder, Any, None]:
+    seeder = Seeder(run_id=RUN_ID)
+    yield seeder
+    seeder.close()
 
-    def _make_tournament(user: User, tournament: Tournament):
-        api = create_authenticated_api(user.username, user.password)
-        created_tournament = api.create_tournament_from_model(tournament)
-        tournaments.append((api, created_tournament))
-        return created_tournament
 
-    yield _make_tournament
+@pytest.fixture(scope="session")
+def mongo_client() -> Generator[Optional[MongoClient], Any, None]:
+    # Direct access to the app's database, for the test data snapshots
+    client = connect(E2E_MONGODB_URI)
+    yield client
+    if client is not None:
+        client.close()
 
-    for api, tournament in tournaments:
-        if tournament.id is not None:
-            api.delete_tournament(tournament.id)
 
+@pytest.fixture(scope="module")
+def snapshots(seeder: Seeder, mongo_client: Optional[MongoClient]) -> Snapshots:
+    return Snapshots(seeder, mongo_client)
 
-MakeTraining = Callable[[User, Training], Training]
+
+@pytest.fixture(scope="session")
+def dataset_registry(
+    mongo_client: Optional[MongoClient],
+) -> Generator[DatasetRegistry, Any, None]:
+    registry = DatasetRegistry(mongo_client, run_id=RUN_ID)
+    yield registry
+    registry.close()
 
 
 @pytest.fixture(scope="module")
-def make_training() -> Generator[MakeTraining, Any, None]:
-    trainings: list[tuple[IncineroarAPI, Training]] = []
+def datasets(dataset_registry: DatasetRegistry, snapshots: Snapshots) -> Datasets:
+    return Datasets(dataset_registry, snapshots)
 
-    def _make_training(user: User, training: Training):
-        api = create_authenticated_api(user.username, user.password)
-        created_training = api.create_training_from_model(training)
-        trainings.append((api, created_training))
-        return created_training
 
-    yield _make_training
+# Cleanup stages, entities are deleted before the ones they depend on
+BATTLES, TRAININGS, TEAMS = 0, 1, 2
+TOURNAMENTS = 0
 
-    for api, training in trainings:
-        if training.id is not None:
-            api.delete_training(training.id)
+MakeTeam = Factory[Team]
 
 
-MakeBattle = Callable[[User, str, Battle], Battle]
+@pytest.fixture(scope="module")
+def make_team(seeder: Seeder) -> MakeTeam:
+    return Factory(
+        seeder,
+        IncineroarAPI.create_team_from_model,
+        lambda api, team, created: api.delete_team(created.id),
+        TEAMS,
+    )
+
+
+MakeTournament = Factory[Tournament]
 
 
 @pytest.fixture(scope="module")
-def make_battle() -> Generator[MakeBattle, Any, None]:
-    battles: list[tuple[IncineroarAPI, str, Battle]] = []
+def make_tournament(seeder: Seeder) -> MakeTournament:
+    return Factory(
+        seeder,
+        IncineroarAPI.create_tournament_from_model,
+        lambda api, tournament, created: api.delete_tournament(created.id),
+        TOURNAMENTS,
+    )
+
 
-    def _make_battle(user: User, training_id: str, battle: Battle):
-        api = create_authenticated_api(user.username, user.password)
-        created_battle = api.create_training_battle_from_model(training_id, battle)
-        battles.append((api, training_id, created_battle))
-        return created_battle
+MakeTraining = Factory[Training]
 
-    yield _make_battle
 
-    for api, training_id, battle in battles:
-        if battle.id is not None:
-            api.delete_battle(training_id, battle.id)
+@pytest.fixture(scope="module")
+def make_training(seeder: Seeder) -> MakeTraining:
+    return Factory(
+        seeder,
+        IncineroarAPI.create_training_from_model,
+        lambda api, training, created: api.delete_training(created.id),
+        TRAININGS,
+    )
+
+
+MakeBattle = Factory[Battle]
+
+
+@pytest.fixture(scope="module")
+def make_battle(seeder: Seeder) -> MakeBattle:
+    return Factory(
+        seeder,
+        IncineroarAPI.create_training_battle_from_model,
+        lambda api, training_id, battle, created: api.delete_battle(
+            training_id, created.id
+        ),
+        BATTLES,
+    )
+
+
+@pytest.fixture(scope="session")
+def pokedata_server() -> Generator[PokedataServer, Any, None]:
+    # The app reaches it for URL imports, and for PokeAPI lookups when started
+    # with POKEAPI_URL=pokedata_server.pokeapi_url
+    try:
+        server = PokedataServer()
+    except OSError:
+        # Another xdist worker, or a standalone server, already serves the
+        # PokeAPI stand-in on the configured port, serve standings on any port
+        server = PokedataServer(port=0)
+    with server:
+        yield server
+
+
+# Live pokedata standings, for deployed apps that cannot reach pokedata_server
+TOURNAMENT_URL = (
+    "https://www.pokedata.ovh/standingsVGC/0000162/masters/0000162_Masters.json"
+)
+
+
+@pytest.fixture(scope="session")
+def tournament_url(request: pytest.FixtureRequest) -> str:
+    """Standings URL the app can import: 8 players of pokedata_server if local."""
+    if APP_IS_LOCAL:
+        return request.getfixturevalue("pokedata_server").standings_url(8)
+    return TOURNAMENT_URL
@@ -0,0 +1,24 @@
+from src.models.team import Team
+from src.models.user import User
+from tests.conftest import MakeTeam
+
+# Seed functions of the datasets shared by the modules (see src/util/datasets.py)
+
+
+def seed_teams(user: User, make_team: MakeTeam) -> list[Team]:
+    pending_teams = [
+        make_team.submit(user, Team("team 1", 2025, "reg f", "regirock")),
+        make_team.submit(user, Team("team 2", 2025, "reg h", "regice")),
+        make_team.submit(
+            user,
+            Team(
+                "team 3",
+                2025,
+                "reg j",
+                "registeel",
+                description="my test description",
+                tags=["tag1", "tag2"],
+            ),
+        ),
+    ]
+    return [pending.result() for pending in pending_teams]
@@ -0,0 +1,135 @@
+import uuid
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from playwright.sync_api import Page, expect
+
+from src.models.team import Team
+from src.models.training import Training
+from src.models.user import User
+from src.pages.login import LoginPage
+from src.util.api import IncineroarAPI, create_authenticated_api
+from src.util.constants import RUN_ID
+from src.util.datagen import DataGenerator
+from src.util.seeding import Factory, Seeder
+from tests.conftest import TRAININGS, GetUser, MakeBattle, MakeTeam
+
+MakeTeamTraining = Factory[Training]
+
+
+@pytest.fixture(scope="module")
+def make_team_training(seeder: Seeder) -> MakeTeamTraining:
+    # Trainings of a team, which create_training_from_model does not link
+    return Factory(
+        seeder,
+        lambda api, training, team: api.create_training(
+            name=training.name,
+            description=training.description,
+            season=training.season,
+            format=training.format,
+            teamId=team.id,
+        ),
+        lambda api, training, team, created: api.delete_training(created.id),
+        TRAININGS,
+    )
+
+
+@pytest.fixture(scope="module")
+def source(
+    get_user: GetUser,
+    make_team: MakeTeam,
+    make_team_training: MakeTeamTraining,
+    make_battle: MakeBattle,
+) -> IncineroarAPI:
+    """Client of an account with teams, trainings of a team, and battles."""
+    user = get_user("mewtwo")
+    api = create_authenticated_api(user.username, user.password)
+    generator = DataGenerator(seed=3)
+
+    teams = [
+        make_team(user, Team(f"export team {i + 1}", 2025, "reg h", "incineroar"))
+        for i in range(2)
+    ]
+    trainings = [
+        make_team_training(
+            user, Training(f"export training {i + 1}", "exported", 2025, "reg h"), team
+        )
+        for i, team in enumerate(teams)
+    ]
+    [default_training] = [
+        training for training in api.get_trainings() if training.is_default
+    ]
+    # One at a time, the import must keep the order of the battles
+    for i, training in enumerate([*trainings, default_training]):
+        for j in range(3):
+            make_battle(user, training.id, generator.battle(i, j))
+    return api
+
+
+@pytest.fixture
+def fresh_user(page: Page) -> Generator[User, Any, None]:
+    user = User(f"export{uuid.uuid4().hex[:10]}", "user", "123456")
+    login_page = LoginPage(page)
+    login_page.navigate()
+    login_page.sign_up_button.click()
+    page.locator("span").first.click()
+    login_page.username_input.fill(user.username)
+    login_page.password_input.fill(user.password)
+    login_page.confirm_password_input.fill(user.password)
+    login_page.sign_up_button.click()
+    expect(login_page.sign_in_button).to_be_visible()
+
+    yield user
+
+    create_authenticated_api(user.username, user.password).delete_current_user()
+
+
+def account(api: IncineroarAPI) -> tuple[list, list]:
+    """Teams and trainings of an account, with their battles, without ids."""
+    teams = sorted(
+        (team.name, team.season, team.format, team.data, team.description, team.tags)
+        for team in api.get_teams()
+    )
+    trainings = []
+    for listed in api.get_trainings():
+        training = api.get_training_by_id(listed.id or "")
+        battles = [
+            (battle.name, battle.notes, battle.result, battle.turns)
+            for battle in training.battles
+        ]
+        trainings.append(
+            (
+                listed.is_default,
+                training.name,
+                training.description,
+                training.season,
+                training.format,
+                training.team.name if training.team else None,
+                battles,
+            )
+        )
+    return teams, sorted(trainings, key=repr)
+
+
+class TestAccountTransfer:
+    def test_export_and_import(
+        self, source: IncineroarAPI, fresh_user: User, tmp_path: Path
+    ):
+        path = tmp_path / "account.ndjson.gz"
+        api = create_authenticated_api(
+            fresh_user.username, fresh_user.password, run_id=RUN_ID
+        )
+
+        exported = source.export_account(path)
+        imported = api.import_account(path, batch_size=4)
+
+        assert (imported.teams, imported.trainings, imported.battles) == (
+            exported.teams,
+            exported.trainings,
+            exported.battles,
+        )
+        assert imported.skipped == exported.tournaments
+        # The exported default training is merged into the new user's one
+        assert len([t for t in api.get_trainings() if t.is_default]) == 1
+        assert account(api) == account(source)
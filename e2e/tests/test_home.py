@@ -5,20 +5,17 @@ from playwright.sync_api import Page, expect
 
 from src.models.user import User
 from src.pages.home import HomePage
-from src.pages.login import LoginPage
-from tests.conftest import GetUser
+from tests.conftest import GetUser, SignIn
 
 
 class TestHome:
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, get_user: GetUser):
+    def setup(self, page: Page, get_user: GetUser, sign_in: SignIn):
         user = get_user("mewtwo")
         self.home_page = HomePage(page)
         self.user = user
 
-        login_page = LoginPage(page)
-        login_page.login(user)
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, user)
 
     def test_side_navigation(self, page: Page, subtests: pytest.Subtests):
         self.home_page.navigate()
@@ -49,14 +46,12 @@ class TestHome:
 
 class TestAdminHome:
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, get_user: GetUser):
+    def setup(self, page: Page, get_user: GetUser, sign_in: SignIn):
         user = get_user("mew")
         self.home_page = HomePage(page)
         self.user = user
 
-        login_page = LoginPage(page)
-        login_page.login(user)
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, user)
 
     def test_side_navigation(self, page: Page, subtests: pytest.Subtests):
         self.home_page.navigate()
@@ -6,9 +6,15 @@ from playwright.sync_api import Page, expect
 
 from src.models.tournament import Tournament
 from src.models.user import User
-from src.pages.login import LoginPage
 from src.pages.metagame import MetagamePage
-from tests.conftest import GetUser, MakeTournament
+from src.util.api import APIError, TournamentImportError, create_authenticated_api
+from src.util.constants import APP_IS_LOCAL, RUN_ID
+from src.util.snapshots import Snapshots
+from tests.conftest import GetUser, MakeTournament, SignIn
+
+# Tournaments are shared by every user, so workers sharing an app run these
+# tests on one worker (pytest -n auto --dist loadgroup)
+pytestmark = pytest.mark.xdist_group("tournaments")
 
 TOURNAMENT_RAW_DATA = """
 [
@@ -181,10 +187,6 @@ TOURNAMENT_RAW_DATA = """
 ]
 """
 
-TOURNAMENT_URL = (
-    "https://www.pokedata.ovh/standingsVGC/0000162/masters/0000162_Masters.json"
-)
-
 
 class TestBaseMetagame:
     username = "mewtwo"
@@ -193,12 +195,9 @@ class TestBaseMetagame:
     tournaments: list[Tournament]
 
 
-@pytest.fixture(autouse=True, scope="module")
-def test_data(get_user: GetUser, make_tournament: MakeTournament):
-    admin_user = get_user("mew")
-    user = get_user(TestBaseMetagame.username)
-    tournaments = [
-        make_tournament(
+def seed_test_data(admin_user: User, make_tournament: MakeTournament):
+    pending_tournaments = [
+        make_tournament.submit(
             admin_user,
             Tournament(
                 "test tournament 1",
@@ -208,7 +207,7 @@ def test_data(get_user: GetUser, make_tournament: MakeTournament):
                 source="pokedata",
             ),
         ),
-        make_tournament(
+        make_tournament.submit(
             admin_user,
             Tournament(
                 "test tournament 2",
@@ -219,22 +218,28 @@ def test_data(get_user: GetUser, make_tournament: MakeTournament):
             ),
         ),
     ]
+    return [pending.result() for pending in pending_tournaments]
+
+
+@pytest.fixture(autouse=True, scope="module")
+def test_data(get_user: GetUser, snapshots: Snapshots, make_tournament: MakeTournament):
+    admin_user = get_user("mew")
+    user = get_user(TestBaseMetagame.username)
+    # Restored from the snapshot of an earlier run when possible
+    tournaments = snapshots(seed_test_data, admin_user, make_tournament)
 
     yield admin_user, user, tournaments
 
 
 class TestMetagame(TestBaseMetagame):
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, test_data):
+    def setup(self, page: Page, test_data, sign_in: SignIn):
         admin_user, user, tournaments = test_data
         self.admin_user = admin_user
         self.user = user
         self.tournaments = tournaments
         self.metagame_page = MetagamePage(page)
-        login_page = LoginPage(page)
-        login_page.login(self.user)
-
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, self.user)
 
         self.metagame_page.navigate()
 
@@ -263,16 +268,13 @@ class TestMetagame(TestBaseMetagame):
 
 class TestAdminMetagame(TestBaseMetagame):
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, test_data):
+    def setup(self, page: Page, test_data, sign_in: SignIn):
         admin_user, user, tournaments = test_data
         self.admin_user = admin_user
         self.user = user
         self.tournaments = tournaments
         self.metagame_page = MetagamePage(page)
-        login_page = LoginPage(page)
-        login_page.login(self.admin_user)
-
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, self.admin_user)
 
         self.metagame_page.navigate_admin()
 
@@ -298,13 +300,13 @@ class TestAdminMetagame(TestBaseMetagame):
 
         expect(page.locator("tbody")).not_to_contain_text("test add raw")
 
-    def test_add_tournament_link(self, page: Page):
+    def test_add_tournament_link(self, page: Page, tournament_url: str):
         self.metagame_page.add_tournament_button.click()
         self.metagame_page.add_tournament_modal["name"].fill("test add url")
         self.metagame_page.add_tournament_modal["format"].fill("reg h")
         self.metagame_page.add_tournament_modal["source"].click()
         self.metagame_page.modal_source_option("Pokedata URL").click()
-        self.metagame_page.add_tournament_modal["data"].fill(TOURNAMENT_URL)
+        self.metagame_page.add_tournament_modal["data"].fill(tournament_url)
         self.metagame_page.add_tournament_modal["submit_button"].click()
 
         expect(page.locator("tbody")).to_contain_text("test add url", timeout=15000)
@@ -327,3 +329,51 @@ class TestAdminMetagame(TestBaseMetagame):
         self.metagame_page.delete_button(self.tournaments[1].name).click()
 
         expect(page.locator("tbody")).not_to_contain_text(self.tournaments[1].name)
+
+
+class TestTournamentImport(TestBaseMetagame):
+    @pytest.fixture(autouse=True)
+    def setup(self, test_data):
+        admin_user, user, tournaments = test_data
+        self.admin_user = admin_user
+        self.user = user
+        self.tournaments = tournaments
+        # Imports are tagged with the test run, so that the sweep of stale runs
+        # deletes what a failed test left behind
+        self.api = create_authenticated_api(
+            admin_user.username, admin_user.password, run_id=RUN_ID
+        )
+
+    def test_import_tournament_url(self, tournament_url: str):
+        job = self.api.submit_tournament_import(
+            "test import url", datetime.now().year, "reg h", tournament_url
+        )
+        assert job.status in ("queued", "running", "succeeded")
+
+        tournament = self.api.wait_for_tournament(job.id, timeout=30)
+        assert tournament.id is not None
+        assert tournament.name == "test import url"
+        if APP_IS_LOCAL:
+            assert len(tournament.teams) == 8
+        else:
+            assert len(tournament.teams) > 0
+
+        self.api.delete_tournament(tournament.id)
+
+    def test_import_unreachable_url(self):
+        job = self.api.submit_tournament_import(
+            "test import failure", datetime.now().year, "reg h", "http://127.0.0.1:9/"
+        )
+
+        with pytest.raises(TournamentImportError):
+            self.api.wait_for_tournament(job.id, timeout=30)
+        assert self.api.get_tournament_import(job.id).status == "failed"
+
+    def test_import_requires_admin(self, tournament_url: str):
+        api = create_authenticated_api(self.user.username, self.user.password)
+
+        with pytest.raises(APIError) as error:
+            api.submit_tournament_import(
+                "test import user", datetime.now().year, "reg h", tournament_url
+            )
+        assert error.value.status_code == 403
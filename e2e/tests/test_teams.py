@@ -5,9 +5,10 @@ from playwright.sync_api import Page, Request, expect
 
 from src.models.team import Team
 from src.models.user import User
-from src.pages.login import LoginPage
 from src.pages.teams import TeamsPage
-from tests.conftest import GetUser, MakeTeam
+from src.util.datasets import Datasets
+from tests.conftest import GetUser, MakeTeam, SignIn
+from tests.datasets import seed_teams
 
 
 class TestTeams:
@@ -16,31 +17,17 @@ class TestTeams:
     user: User
 
     @pytest.fixture(autouse=True, scope="class")
-    def setup_data(self, get_user: GetUser, make_team: MakeTeam):
+    def setup_data(self, get_user: GetUser, datasets: Datasets, make_team: MakeTeam):
         self.__class__.user = get_user(self.username)
-        self.__class__.teams = [
-            make_team(self.user, Team("team 1", 2025, "reg f", "regirock")),
-            make_team(self.user, Team("team 2", 2025, "reg h", "regice")),
-            make_team(
-                self.user,
-                Team(
-                    "team 3",
-                    2025,
-                    "reg j",
-                    "registeel",
-                    description="my test description",
-                    tags=["tag1", "tag2"],
-                ),
-            ),
-        ]
+        # The tests edit and delete teams, so they get a copy of their own
+        self.__class__.teams = datasets.clone(
+            "mewtwo-teams", seed_teams, self.user, make_team
+        )
 
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, get_user: GetUser):
+    def setup(self, page: Page, get_user: GetUser, sign_in: SignIn):
         self.teams_page = TeamsPage(page)
-        login_page = LoginPage(page)
-        login_page.login(self.user)
-
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, self.user)
 
         self.teams_page.navigate()
 
@@ -1,5 +1,8 @@
+import json
+import random
 import re
 from datetime import datetime
+from typing import Any
 
 import pytest
 from playwright.sync_api import Page, expect
@@ -7,14 +10,17 @@ from playwright.sync_api import Page, expect
 from src.models.team import Team
 from src.models.training import Action, Battle, Training, Turn
 from src.models.user import User
-from src.pages.login import LoginPage
 from src.pages.training import (
     AnalyzeTrainingPage,
     BattlePage,
     DetailedTrainingPage,
     TrainingsPage,
 )
-from tests.conftest import MakeBattle, MakeTeam, MakeTraining
+from src.util.api import create_authenticated_api
+from src.util.datasets import Datasets
+from src.util.snapshots import Snapshots
+from tests.conftest import MakeBattle, MakeTeam, MakeTraining, SignIn
+from tests.datasets import seed_teams
 
 BASE_TURNS = [
     Turn(
@@ -85,20 +91,15 @@ class TestBaseTraining:
     teams: list[Team]
 
 
-@pytest.fixture(autouse=True, scope="module")
-def test_data(
-    get_user,
+def seed_test_data(
+    user: User,
     make_training: MakeTraining,
     make_battle: MakeBattle,
-    make_team: MakeTeam,
 ):
-    user = get_user(TestBaseTraining.username)
     trainings = []
 
-    teams = [
-        make_team(user, Team("team 1", 2025, "reg h", "rayquaza")),
-    ]
-
+    # Queued, then created concurrently when the first training is needed
+    pending_trainings = []
     for i in range(6):
         training = Training(
             name=f"Test training {i + 1}",
@@ -112,7 +113,11 @@ def test_data(
             training.season = None
             training.format = None
 
-        created_training = make_training(user, training)
+        pending_trainings.append(make_training.submit(user, training))
+
+    pending_battles = []
+    for i, pending_training in enumerate(pending_trainings):
+        created_training = pending_training.result()
 
         if created_training.id is None:
             continue
@@ -156,26 +161,47 @@ def test_data(
             if i == 4:
                 battle = Battle("empty battle", "")
 
-            created_battle = make_battle(user, created_training.id, battle)
-            created_training.battles.append(created_battle)
+            pending_battles.append(
+                (
+                    created_training,
+                    make_battle.submit(user, created_training.id, battle),
+                )
+            )
 
         trainings.append(created_training)
 
-    yield user, trainings, teams
+    for created_training, pending_battle in pending_battles:
+        created_training.battles.append(pending_battle.result())
+
+    return trainings
+
+
+@pytest.fixture(autouse=True, scope="module")
+def test_data(
+    get_user,
+    datasets: Datasets,
+    snapshots: Snapshots,
+    make_training: MakeTraining,
+    make_battle: MakeBattle,
+    make_team: MakeTeam,
+):
+    user = get_user(TestBaseTraining.username)
+    # Only read here, so shared with the other modules
+    teams = datasets.shared("mewtwo-teams", seed_teams, user, make_team)
+    # Restored from the snapshot of an earlier run when possible
+    trainings = snapshots(seed_test_data, user, make_training, make_battle)
+    return user, trainings, teams
 
 
 class TestTrainings(TestBaseTraining):
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, test_data):
+    def setup(self, page: Page, test_data, sign_in: SignIn):
         user, trainings, teams = test_data
         self.user = user
         self.trainings = trainings
         self.teams = teams
         self.training_page = TrainingsPage(page)
-        login_page = LoginPage(page)
-        login_page.login(self.user)
-
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, self.user)
 
         self.training_page.navigate()
 
@@ -305,16 +331,13 @@ class TestTrainings(TestBaseTraining):
 
 class TestDetailedTraining(TestBaseTraining):
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, test_data):
+    def setup(self, page: Page, test_data, sign_in: SignIn):
         user, trainings, teams = test_data
         self.user = user
         self.trainings = trainings
         self.teams = teams
         self.detailed_training_page = DetailedTrainingPage(page)
-        login_page = LoginPage(page)
-        login_page.login(self.user)
-
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, self.user)
 
         self.detailed_training_page.navigate(self.trainings[2].id or "")
 
@@ -501,16 +524,13 @@ class TestDetailedTraining(TestBaseTraining):
 
 class TestAnalyzeTraining(TestBaseTraining):
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, test_data):
+    def setup(self, page: Page, test_data, sign_in: SignIn):
         user, trainings, teams = test_data
         self.user = user
         self.trainings = trainings
         self.teams = teams
         self.analyze_training_page = AnalyzeTrainingPage(page)
-        login_page = LoginPage(page)
-        login_page.login(self.user)
-
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, self.user)
 
         self.analyze_training_page.navigate(self.trainings[3].id or "")
 
@@ -793,16 +813,13 @@ class TestAnalyzeTraining(TestBaseTraining):
 
 class TestBattle(TestBaseTraining):
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, test_data):
+    def setup(self, page: Page, test_data, sign_in: SignIn):
         user, trainings, teams = test_data
         self.user = user
         self.trainings = trainings
         self.teams = teams
         self.battle_page = BattlePage(page)
-        login_page = LoginPage(page)
-        login_page.login(self.user)
-
-        expect(page).to_have_url(re.compile("/home"))
+        sign_in(page, self.user)
 
         self.battle_page.navigate(
             self.trainings[4].id or "", self.trainings[4].battles[0].id or ""
@@ -872,3 +889,94 @@ class TestBattle(TestBaseTraining):
         expect(page.get_by_role("main")).to_contain_text("flash-canon")
         expect(page.get_by_role("main")).to_contain_text("Switch")
         expect(page.get_by_role("main")).to_contain_text("Turn 2")
+
+
+def _random_battle(rng: random.Random, index: int) -> Battle:
+    mine = rng.sample(["solgaleo", "miraidon", "rillaboom", "incineroar"], 2)
+    rivals = rng.sample(["lunala", "koraidon", "tornadus", "amoonguss"], 2)
+    turns = [
+        Turn(
+            0,
+            [Action(i, "", "switch", "", [f"p1:{p}"], "p1") for i, p in enumerate(mine)]
+            + [
+                Action(i + 2, "", "switch", "", [f"p2:{p}"], "p2")
+                for i, p in enumerate(rivals)
+            ],
+        )
+    ]
+    for turn_index in range(1, rng.randint(2, 5)):
+        actions: list[Action] = []
+        for action_index in range(4):
+            player, opponent = rng.choice([("p1", "p2"), ("p2", "p1")])
+            user = f"{player}:{rng.choice(mine if player == 'p1' else rivals)}"
+            target = f"{opponent}:{rng.choice(rivals if player == 'p1' else mine)}"
+            kind = rng.random()
+            if kind < 0.5:
+                name = rng.choice(["tailwind", "icy-wind", "protect", "flash canon"])
+                action = Action(action_index, name, "move", user, [target], player)
+            elif kind < 0.7:
+                action = Action(
+                    action_index, "fainted", "effect", target, [user], opponent
+                )
+            elif kind < 0.85:
+                action = Action(
+                    action_index, "weather rain", "effect", user, [], player
+                )
+            else:
+                action = Action(
+                    action_index, "terastallize to water", "effect", user, [], player
+                )
+            actions.append(action)
+        turns.append(Turn(turn_index, actions))
+    return Battle(
+        name=f"Random battle {index}",
+        notes="",
+        turns=turns,
+        result=rng.choice(["win", "loose", "tie", None]),
+    )
+
+
+def _canonical(value: Any) -> Any:
+    # Incremental updates keep the values of the analysis but not its ordering
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return sorted(
+            (_canonical(item) for item in value),
+            key=lambda item: json.dumps(item, sort_keys=True),
+        )
+    return value
+
+
+class TestIncrementalAnalytics(TestBaseTraining):
+    def test_incremental_matches_full_analysis(
+        self, get_user, make_training: MakeTraining
+    ):
+        """
+        1. create a training
+        2. add and delete random battles in a random order
+        3. after every change, verify the incrementally updated analysis is
+           the same as the analysis rebuilt from every battle
+        """
+        rng = random.Random(35)
+        user = get_user(self.username)
+        training = make_training(user, Training(name="Incremental analytics"))
+        assert training.id is not None
+        api = create_authenticated_api(user.username, user.password)
+
+        battles: list[Battle] = []
+        for step in range(30):
+            if battles and rng.random() < 0.4:
+                battle = battles.pop(rng.randrange(len(battles)))
+                assert battle.id is not None
+                api.delete_battle(training.id, battle.id)
+            else:
+                battles.append(
+                    api.create_training_battle_from_model(
+                        training.id, _random_battle(rng, step)
+                    )
+                )
+
+            incremental = api.get_training_analysis(training.id)
+            full = api.get_training_analysis(training.id, full=True)
+            assert _canonical(incremental) == _canonical(full), f"step {step}"
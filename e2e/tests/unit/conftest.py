@@ -0,0 +1,16 @@
+from typing import Any, Generator
+
+import pytest
+
+# Unit tests of the e2e utilities, run without an app:
+#   uv run pytest tests/unit
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_server() -> Generator[None, Any, None]:
+    yield None
+
+
+@pytest.fixture(scope="session", autouse=True)
+def sweep_stale_runs():
+    pass
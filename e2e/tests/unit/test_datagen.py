@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.util.datagen import (
+    DataGenerator,
+    DatasetConfig,
+    synthetic_standings,
+    write_account_export,
+)
+
+
+def battle_digest(hash_seed: str) -> str:
+    """A generated battle, from a new interpreter with the given hash seed."""
+    code = (
+        "from src.util.datagen import DataGenerator\n"
+        "print(DataGenerator(7).battle(1, 2))"
+    )
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[2],
+        env={**os.environ, "PYTHONHASHSEED": hash_seed},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+class TestDataGenerator:
+    def test_same_seed_same_data(self):
+        first, second = DataGenerator(7), DataGenerator(7)
+
+        assert list(first.trainings(3, 5)) == list(second.trainings(3, 5))
+        assert list(first.tournaments(2)) == list(second.tournaments(2))
+
+    def test_different_seeds_differ(self):
+        first, second = DataGenerator(7), DataGenerator(8)
+
+        assert first.training(0, 5).battles != second.training(0, 5).battles
+        assert first.standings(0, 16) != second.standings(0, 16)
+
+    def test_entities_do_not_depend_on_generation_order(self):
+        generator = DataGenerator(7)
+
+        battle = generator.battle(2, 3)
+        training = generator.training(2, 5)
+
+        assert training.battles[3] == battle
+        assert list(generator.trainings(3, 5))[2] == training
+
+    def test_config_changes_the_data(self):
+        default = DataGenerator(7)
+        uniform = DataGenerator(7, DatasetConfig(species_skew=0))
+
+        assert default.standings(0, 16) != uniform.standings(0, 16)
+
+    def test_does_not_depend_on_the_hash_seed(self):
+        assert battle_digest("1") == battle_digest("2")
+
+    def test_synthetic_standings(self):
+        standings = synthetic_standings(16, seed=3)
+
+        assert standings == synthetic_standings(16, seed=3)
+        assert [player["placing"] for player in standings] == list(range(1, 17))
+        assert all(len(player["decklist"]) == 6 for player in standings)
+
+
+class TestWriteAccountExport:
+    def test_writes_every_record(self, tmp_path: Path):
+        trainings = list(DataGenerator(7).trainings(2, 3))
+
+        stats = write_account_export(tmp_path / "export.ndjson.gz", iter(trainings))
+
+        with gzip.open(tmp_path / "export.ndjson.gz", "rt") as file:
+            types = [json.loads(line)["type"] for line in file]
+        assert types == ["header"] + ["training", "battle", "battle", "battle"] * 2
+        assert (stats.trainings, stats.battles) == (2, 6)
+        assert stats.actions == sum(
+            len(turn.actions)
+            for training in trainings
+            for battle in training.battles
+            for turn in battle.turns
+        )
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from src.models.tournament import Tournament, TournamentTeam
+from src.util.metagame import MetagameTrends
+
+
+def make_tournament(id: str, season: int, teams: list[list[str]]) -> Tournament:
+    return Tournament(
+        name=f"Tournament {id}",
+        season=season,
+        format="Regulation G",
+        data="",
+        id=id,
+        teams=[
+            TournamentTeam(f"Player {index}", "\n\n".join(species))
+            for index, species in enumerate(teams)
+        ],
+    )
+
+
+FIRST = make_tournament(
+    "first",
+    2025,
+    [["Incineroar", "Flutter Mane"], ["Incineroar", "Amoonguss"]],
+)
+SECOND = make_tournament(
+    "second",
+    2025,
+    [["Incineroar", "Rillaboom"], ["Flutter Mane", "Urshifu"], ["Amoonguss"]],
+)
+NEXT_SEASON = make_tournament("next-season", 2026, [["Rillaboom", "Urshifu"]])
+
+
+def state(trends: MetagameTrends) -> dict:
+    return {
+        key: (trends.team_count(*key), trends.top(*key, n=100)) for key in trends.keys()
+    }
+
+
+@pytest.fixture
+def trends() -> MetagameTrends:
+    trends = MetagameTrends()
+    trends.add_tournament(FIRST)
+    trends.add_tournament(NEXT_SEASON)
+    return trends
+
+
+class TestMetagameTrends:
+    def test_remove_undoes_add(self, trends: MetagameTrends):
+        before = state(trends)
+
+        trends.add_tournament(SECOND)
+        trends.remove_tournament(SECOND.id or "")
+
+        assert state(trends) == before
+        assert SECOND.id not in trends
+
+    def test_removing_every_tournament_leaves_nothing(self, trends: MetagameTrends):
+        trends.remove_tournament(FIRST.id or "")
+        trends.remove_tournament(NEXT_SEASON.id or "")
+
+        assert trends.keys() == []
+        assert trends.top(2025, "Regulation G") == []
+        assert trends.share(2025, "Regulation G", "Incineroar") == 0.0
+
+    def test_adding_twice_counts_once(self, trends: MetagameTrends):
+        before = state(trends)
+
+        trends.add_tournament(FIRST)
+
+        assert state(trends) == before
+        assert trends.team_count(2025, "regulation g") == 2
+        assert trends.share(2025, "Regulation G", "incineroar") == 1.0
+
+    def test_removing_untracked_tournament(self, trends: MetagameTrends):
+        before = state(trends)
+
+        assert not trends.remove_tournament("unknown")
+        assert state(trends) == before
+
+    def test_save_and_load(self, trends: MetagameTrends, tmp_path: Path):
+        trends.add_tournament(SECOND)
+
+        trends.save(tmp_path / "metagame.json")
+        loaded = MetagameTrends.load(tmp_path / "metagame.json")
+
+        assert state(loaded) == state(trends)
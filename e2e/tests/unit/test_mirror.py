@@ -0,0 +1,95 @@
+from typing import Optional
+
+import pytest
+
+from src.models.sync import TeamChanges, TrainingChanges
+from src.models.training import Action, Battle, Training, Turn
+from src.util.api import IncineroarAPI
+from src.util.mirror import LocalMirror
+
+SYNCED_AT = "2026-01-01T00:00:00.000Z"
+
+
+class ChangesAPI:
+    """Serves fixed trainings to the syncs of a mirror."""
+
+    def __init__(self, trainings: list[Training]):
+        self.trainings = trainings
+
+    def get_team_changes(self, since: Optional[str] = None) -> TeamChanges:
+        return TeamChanges([], SYNCED_AT, [])
+
+    def get_training_changes(self, since: Optional[str] = None) -> TrainingChanges:
+        ids = [training.id or "" for training in self.trainings]
+        return TrainingChanges(self.trainings, SYNCED_AT, ids)
+
+
+def make_battle(id: str, turn_indexes: list[int]) -> Battle:
+    return Battle(
+        name=f"Battle {id}",
+        notes="",
+        id=id,
+        result="win",
+        turns=[
+            Turn(
+                index=index,
+                actions=[
+                    Action(
+                        index=0,
+                        name="Fake Out",
+                        type="move",
+                        user="p1a: Incineroar",
+                        targets=["p2a: Flutter-Mane"],
+                        player="p1",
+                    )
+                ],
+            )
+            for index in turn_indexes
+        ],
+    )
+
+
+@pytest.fixture
+def battle() -> Battle:
+    # Turn indexes as sent by the app: not from 0 and not in order
+    return make_battle("b1", [3, 1, 2])
+
+
+@pytest.fixture
+def mirror(battle: Battle):
+    training = Training(name="Training", id="t1", battles=[battle])
+    with LocalMirror(ChangesAPI([training])) as mirror:  # type: ignore[arg-type]
+        mirror.sync()
+        yield mirror
+
+
+class TestLocalMirror:
+    def test_round_trips_turns(self, mirror: LocalMirror, battle: Battle):
+        [restored] = mirror.battles(training_id="t1")
+
+        assert [turn.index for turn in restored.turns] == [1, 2, 3]
+        assert restored.turns == sorted(battle.turns, key=lambda turn: turn.index)
+
+    @pytest.mark.parametrize("name", ["Flutter-Mane", "flutter mane", "FLUTTER-MANE"])
+    def test_matches_pokemon_names_like_stored(self, mirror: LocalMirror, name: str):
+        battles = mirror.battles(pokemon=name, player="p2", with_turns=False)
+
+        assert [battle.id for battle in battles] == ["b1"]
+
+    def test_syncs_default_training(self):
+        # As sent by the app
+        trainings = [
+            IncineroarAPI()._dict_to_training(
+                {"id": id, "name": id, "description": "", "isDefault": is_default}
+            )
+            for id, is_default in [("t1", True), ("t2", False)]
+        ]
+
+        with LocalMirror(ChangesAPI(trainings)) as mirror:  # type: ignore[arg-type]
+            mirror.sync()
+            rows = mirror.execute("SELECT id FROM trainings WHERE is_default = 1")
+
+            assert [row["id"] for row in rows] == ["t1"]
+            assert [
+                (training.id, training.is_default) for training in mirror.trainings()
+            ] == [("t1", True), ("t2", False)]
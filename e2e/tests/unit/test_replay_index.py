@@ -0,0 +1,85 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.util.replay_index import (
+    ReplayIndex,
+    ReplayLogNotFoundError,
+    scan_replay,
+)
+
+REPLAY_FILE = Path(__file__).resolve().parents[2] / "data" / "test_battle_file.html"
+
+
+@pytest.fixture
+def replay(tmp_path: Path) -> Path:
+    return Path(shutil.copy(REPLAY_FILE, tmp_path / "replay.html"))
+
+
+class TestScanReplay:
+    def test_offsets_delimit_the_battle_log(self):
+        data = REPLAY_FILE.read_bytes()
+
+        entry = scan_replay(REPLAY_FILE)
+
+        log = data[entry.log_start : entry.log_end]
+        assert data[: entry.log_start].endswith(b'class="battle-log-data">')
+        assert data[entry.log_end :].startswith(b"</script>")
+        assert log.startswith(b"|j|")
+        assert b"</script>" not in log
+
+    def test_extracts_metadata(self):
+        entry = scan_replay(REPLAY_FILE)
+
+        assert entry.format == "[Gen 9] Random Battle"
+        assert entry.players == ["danimontes", "rival"]
+        assert entry.size == REPLAY_FILE.stat().st_size
+
+    def test_file_without_battle_log(self, tmp_path: Path):
+        path = tmp_path / "page.html"
+        path.write_text("<html></html>")
+
+        with pytest.raises(ReplayLogNotFoundError):
+            scan_replay(path)
+
+
+class TestReplayIndex:
+    def test_reads_unescaped_log(self, replay: Path):
+        index = ReplayIndex()
+        index.update([replay])
+
+        log = index.read_log(replay)
+
+        assert log.startswith("|j|")
+        assert "<\\/" not in log
+        assert "<strong>1075</strong>" in log
+
+    def test_rescans_modified_files(self, replay: Path):
+        index = ReplayIndex()
+        index.update([replay])
+        log = index.read_log(replay)
+        before = index.get(replay)
+
+        replay.write_bytes(b"<!-- moved -->\n" + replay.read_bytes())
+
+        assert index.read_log(replay) == log
+        after = index.get(replay)
+        assert before is not None and after is not None
+        assert after.log_start == before.log_start + len(b"<!-- moved -->\n")
+
+    def test_skips_unchanged_files(self, replay: Path):
+        index = ReplayIndex()
+        index.update([replay])
+
+        assert index.update([replay]) == (0, 1)
+
+    def test_save_and_load(self, replay: Path, tmp_path: Path):
+        index = ReplayIndex()
+        index.update([replay])
+
+        index.save(tmp_path / "replays.idx")
+        loaded = ReplayIndex.load(tmp_path / "replays.idx")
+
+        assert list(loaded) == list(index)
+        assert loaded.read_log(replay) == index.read_log(replay)
@@ -0,0 +1,100 @@
+import os
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from src.models.training import Action, Battle, Training, Turn
+from src.util.result_cache import STALE_NAMESPACE_SECONDS, ResultCache, training_key
+
+TURN = Turn(index=1, actions=[Action(0, "Fake Out", "move", "p1a: Incineroar")])
+TRAINING = Training(
+    name="Training",
+    id="t1",
+    version=3,
+    battles=[Battle("Battle 1", "", id="b1", turns=[TURN], result="win")],
+)
+
+
+def age(cache: ResultCache, seconds: float):
+    """Makes the last use of a cache namespace older."""
+    used_at = time.time() - seconds
+    os.utime(cache.root / "VERSIONS", (used_at, used_at))
+
+
+class TestResultCacheNamespaces:
+    def test_versions_get_their_own_namespace(self, tmp_path: Path):
+        first = ResultCache(tmp_path, versions={"replay_parser": 1})
+        second = ResultCache(tmp_path, versions={"replay_parser": 2})
+
+        first.put("key", {"version": 1})
+        second.put("key", {"version": 2})
+
+        assert first.namespace != second.namespace
+        assert first.get("key") == {"version": 1}
+        assert second.get("key") == {"version": 2}
+
+    def test_keeps_namespaces_in_use_when_opened(self, tmp_path: Path):
+        other = ResultCache(tmp_path, versions={"replay_parser": 1})
+        other.put("key", {"value": 1})
+
+        ResultCache(tmp_path, versions={"replay_parser": 2})
+
+        assert other.get("key") == {"value": 1}
+
+    def test_drops_stale_namespaces_when_opened(self, tmp_path: Path):
+        stale = ResultCache(tmp_path, versions={"replay_parser": 1})
+        stale.put("key", {"value": 1})
+        age(stale, STALE_NAMESPACE_SECONDS + 60)
+
+        ResultCache(tmp_path, versions={"replay_parser": 2})
+
+        assert not stale.root.exists()
+
+    def test_prune_drops_every_other_namespace(self, tmp_path: Path):
+        other = ResultCache(tmp_path, versions={"replay_parser": 1})
+        cache = ResultCache(tmp_path, versions={"replay_parser": 2})
+        cache.put("key", {"value": 2})
+
+        assert cache.prune() == 1
+        assert not other.root.exists()
+        assert cache.get("key") == {"value": 2}
+
+    def test_put_after_namespace_was_pruned(self, tmp_path: Path):
+        pruned = ResultCache(tmp_path, versions={"replay_parser": 1})
+        ResultCache(tmp_path, versions={"replay_parser": 2}).prune()
+
+        pruned.put("key", {"value": 1})
+
+        assert pruned.get("key") == {"value": 1}
+
+    def test_analyses_are_keyed_by_analytics_version(self, tmp_path: Path):
+        cache = ResultCache(tmp_path)
+
+        cache.put_analysis(TRAINING, "2", {"version": 2})
+
+        assert cache.get_analysis(TRAINING, "2") == {"version": 2}
+        assert cache.get_analysis(TRAINING, "3") is None
+
+
+class TestTrainingKey:
+    def test_ignores_identity_and_display_fields(self):
+        copy = replace(
+            TRAINING,
+            name="Renamed",
+            description="Copy",
+            id="t2",
+            version=4,
+            battles=[replace(TRAINING.battles[0], name="Renamed", id="b2")],
+        )
+
+        assert training_key(copy) == training_key(TRAINING)
+
+    def test_depends_on_battle_results_and_turns(self):
+        battle = TRAINING.battles[0]
+        lost = replace(TRAINING, battles=[replace(battle, result="loss")])
+        longer = replace(TRAINING, battles=[replace(battle, turns=[TURN, TURN])])
+        more = replace(TRAINING, battles=[battle, battle])
+
+        keys = {training_key(t) for t in [TRAINING, lost, longer, more]}
+
+        assert len(keys) == 4
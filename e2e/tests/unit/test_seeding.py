@@ -0,0 +1,34 @@
+import pytest
+
+from src.util.seeding import CleanupError, Seeder
+
+
+def fail(message: str):
+    raise ValueError(message)
+
+
+class TestSeederClose:
+    def test_runs_stages_in_order(self):
+        seeder = Seeder()
+        closed = []
+        seeder.on_close(1, lambda: closed.append("trainings"))
+        seeder.on_close(0, lambda: closed.append("battles"))
+        seeder.on_close(2, lambda: closed.append("teams"))
+
+        seeder.close()
+
+        assert closed == ["battles", "trainings", "teams"]
+
+    def test_runs_every_stage_despite_errors(self):
+        seeder = Seeder()
+        closed = []
+        seeder.on_close(0, lambda: fail("battle"))
+        seeder.on_close(0, lambda: closed.append("battles"))
+        seeder.on_close(1, lambda: fail("training"))
+        seeder.on_close(2, lambda: closed.append("teams"))
+
+        with pytest.raises(CleanupError) as error:
+            seeder.close()
+
+        assert closed == ["battles", "teams"]
+        assert sorted(str(e) for e in error.value.errors) == ["battle", "training"]
@@ -0,0 +1,59 @@
+import random
+
+from src.util.datagen import ITEMS, POKEMON
+from src.util.similarity import TeamSimilarityIndex, jaccard, team_features
+
+
+def make_team(rng: random.Random) -> list[tuple[str, str, list[str]]]:
+    return [
+        (name.title(), rng.choice(ITEMS), moves)
+        for _, name, _, moves in rng.sample(POKEMON, 6)
+    ]
+
+
+def paste(team: list[tuple[str, str, list[str]]]) -> str:
+    return "\n\n".join(
+        "\n".join([f"{species} @ {item}", *(f"- {move}" for move in moves)])
+        for species, item, moves in team
+    )
+
+
+def near_duplicate(
+    team: list[tuple[str, str, list[str]]], rng: random.Random
+) -> list[tuple[str, str, list[str]]]:
+    """Same team with the items of two pokemon changed."""
+    copy = list(team)
+    for index in rng.sample(range(len(copy)), 2):
+        species, item, moves = copy[index]
+        copy[index] = (species, rng.choice([i for i in ITEMS if i != item]), moves)
+    return copy
+
+
+class TestTeamSimilarityIndex:
+    def test_finds_near_duplicates(self):
+        rng = random.Random(0)
+        teams = [make_team(rng) for _ in range(50)]
+        index = TeamSimilarityIndex()
+        for key, team in enumerate(teams):
+            index.add(str(key), paste(team))
+
+        found = 0
+        for key, team in enumerate(teams):
+            duplicate = paste(near_duplicate(team, rng))
+            assert jaccard(team_features(duplicate), team_features(paste(team))) > 0.8
+            results = index.query(duplicate, k=1)
+            found += bool(results) and results[0][0] == str(key)
+
+        assert found / len(teams) >= 0.95
+
+    def test_removed_teams_are_not_found(self):
+        rng = random.Random(1)
+        team = paste(make_team(rng))
+        index = TeamSimilarityIndex()
+        index.add("team", team)
+
+        index.remove("team")
+
+        assert index.query(team) == []
+        assert len(index) == 0
+        assert not any(index._buckets)
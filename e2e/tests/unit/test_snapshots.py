@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from src.models.team import Team
+from src.models.training import Action, Battle, Training, Turn
+from src.util.snapshots import _from_json, _to_json
+
+
+def round_trip(value):
+    return _from_json(json.loads(json.dumps(_to_json(value))))
+
+
+class TestSnapshotResults:
+    def test_round_trips_models(self):
+        battle = Battle(
+            name="Battle",
+            notes="",
+            id="b1",
+            turns=[Turn(1, [Action(0, "Fake Out", "move", "p1a: Incineroar")])],
+        )
+        team = Team(name="Team", season=2025, format="reg h", data="", id="t1")
+        result = (
+            [Training(name="Training", id="t2", team=team, battles=[battle])],
+            {"team": team, "count": 1},
+        )
+
+        assert round_trip(result) == result
+
+    def test_refuses_other_types(self):
+        class Payload:
+            pass
+
+        with pytest.raises(TypeError):
+            _to_json([Payload()])
+
+    def test_only_rebuilds_snapshot_models(self):
+        stored = {"__model__": "Popen", "fields": {"args": ["true"]}}
+
+        with pytest.raises(KeyError):
+            _from_json(stored)
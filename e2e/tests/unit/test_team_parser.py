@@ -0,0 +1,48 @@
+from src.util.team_parser import TeamParseCache, default_cache, parse_team
+
+TEAM = """Incineroar @ Safety Goggles
+Ability: Intimidate
+- Fake Out
+- Knock Off
+
+Rillaboom @ Assault Vest
+Ability: Grassy Surge
+- Grassy Glide
+"""
+
+
+class TestParseTeam:
+    def test_uses_given_empty_cache(self):
+        cache = TeamParseCache()
+        default_size = len(default_cache)
+
+        parse_team(TEAM, cache)
+        parse_team(TEAM, cache)
+
+        assert len(cache) == 1
+        assert (cache.misses, cache.hits) == (1, 1)
+        assert len(default_cache) == default_size
+
+    def test_cached_result_matches_uncached(self):
+        cache = TeamParseCache()
+
+        first = parse_team(TEAM, cache)
+        second = parse_team(TEAM, cache)
+
+        assert [pokemon.species for pokemon in first] == ["Incineroar", "Rillaboom"]
+        assert second == first
+        assert second is not first
+
+    def test_evicts_least_recently_used(self):
+        cache = TeamParseCache(maxsize=2)
+        teams = [
+            TEAM.replace("Incineroar", name) for name in ("Amoonguss", "Kingambit")
+        ]
+
+        parse_team(teams[0], cache)
+        parse_team(teams[1], cache)
+        parse_team(teams[0], cache)
+        parse_team(TEAM, cache)
+
+        assert TeamParseCache.key(teams[0]) in cache._entries
+        assert TeamParseCache.key(teams[1]) not in cache._entries
@@ -15,12 +15,23 @@ const BaseUsers: (SignUpData & { role: User['role'] })[] = data.users.map(
   }),
 );
 
+// Copies of the base users for parallel e2e workers sharing this database,
+// e.g. mewtwo-gw0 to mewtwo-gw3 with E2E_WORKERS=4
+const e2eWorkers = Number(process.env.E2E_WORKERS) || 0;
+const Users = BaseUsers.flatMap((user) => [
+  user,
+  ...Array.from({ length: e2eWorkers }, (_, worker) => ({
+    ...user,
+    username: `${user.username}-gw${worker}`,
+  })),
+]);
+
 const main = async () => {
   await DBConnection.connect();
   const userRepo = new UserRepository();
 
   console.log('Creating users...');
-  for (const { username, password, role } of BaseUsers) {
+  for (const { username, password, role } of Users) {
     try {
       if (password === '') {
         console.warn(`Skipping user ${username} due to empty password`);
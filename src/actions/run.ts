@@ -0,0 +1,49 @@
+import { NextRequest } from 'next/server';
+
+import DBConnection from '@/src/db/DBConnection';
+import TournamentRepository, {
+  TournamentImportJobRepository,
+} from '@/src/db/models/tournament';
+import UserRepository from '@/src/db/models/user';
+import { RunFilter } from '@/src/db/repository';
+
+// The e2e harness tags the entities it creates with the id of its test run,
+// sent in the X-Run-Id header, and deletes whole runs at once. Both are only
+// enabled on servers started with ENABLE_TEST_ROUTES=true
+export const RUN_ID_HEADER = 'x-run-id';
+const RUN_ID_PATTERN = /^[\w-]{1,64}$/;
+
+export const areTestRoutesEnabled = () =>
+  process.env.ENABLE_TEST_ROUTES === 'true';
+
+export const isValidRunId = (runId: string) => RUN_ID_PATTERN.test(runId);
+
+export const getRunId = (req: NextRequest) => {
+  const runId = req.headers.get(RUN_ID_HEADER);
+  if (!areTestRoutesEnabled() || !runId || !isValidRunId(runId)) {
+    return undefined;
+  }
+  return runId;
+};
+
+export const deleteTestRuns = async (filter: RunFilter) => {
+  await DBConnection.connect();
+
+  const userRepo = new UserRepository();
+  const tournamentRepo = new TournamentRepository();
+  const jobRepo = new TournamentImportJobRepository();
+  const [{ teams, trainings, battles }, tournaments, tournamentImports] =
+    await Promise.all([
+      userRepo.deleteByRun(filter),
+      tournamentRepo.deleteByRun(filter),
+      jobRepo.deleteByRun(filter),
+    ]);
+
+  return {
+    teams: teams.length,
+    trainings: trainings.length,
+    battles: battles.length,
+    tournaments: tournaments.length,
+    tournamentImports,
+  };
+};
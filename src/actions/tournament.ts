@@ -1,8 +1,11 @@
 import axios from 'axios';
+import { after } from 'next/server';
 import z, { ZodType } from 'zod';
 
 import DBConnection from '@/src/db/DBConnection';
-import TournamentRepository from '@/src/db/models/tournament';
+import TournamentRepository, {
+  TournamentImportJobRepository,
+} from '@/src/db/models/tournament';
 import TournamentParserFactory, {
   PokedataRawData,
 } from '@/src/services/pokemon/tournament';
@@ -41,6 +44,7 @@ export const validateCreateTournamentData = (data: unknown) => {
 
 export const createTournamentWithAuth = async (
   tournamentData: AddTournamentFormData,
+  runId?: string,
 ) => {
   await DBConnection.connect();
 
@@ -65,6 +69,80 @@ export const createTournamentWithAuth = async (
     JSON.parse(processedData.data) as PokedataRawData[],
   );
 
-  const tournament = await tournamentRepo.create(createData);
+  const tournament = await tournamentRepo.create({ ...createData, runId });
   return tournament;
 };
+
+// Imports running at once in this server process, the other jobs wait queued
+const MAX_CONCURRENT_IMPORTS = 4;
+let runningImports = 0;
+const queuedImports: (() => void)[] = [];
+
+const runWithImportSlot = async (run: () => Promise<void>) => {
+  if (runningImports < MAX_CONCURRENT_IMPORTS) {
+    runningImports += 1;
+  } else {
+    await new Promise<void>((resolve) => queuedImports.push(resolve));
+  }
+  try {
+    await run();
+  } finally {
+    // The slot is handed over to the next queued import, if any
+    const next = queuedImports.shift();
+    if (next) {
+      next();
+    } else {
+      runningImports -= 1;
+    }
+  }
+};
+
+const runTournamentImportJob = (jobId: string) =>
+  runWithImportSlot(async () => {
+    const jobRepo = new TournamentImportJobRepository();
+    try {
+      const job = await jobRepo.start(jobId);
+      if (!job) return;
+      const tournament = await createTournamentWithAuth(
+        {
+          name: job.name,
+          season: job.season,
+          format: job.format,
+          source: 'pokedata_url',
+          data: job.url,
+        },
+        job.runId,
+      );
+      await jobRepo.updateById(jobId, {
+        status: 'succeeded',
+        tournament: tournament.id,
+      });
+    } catch (error) {
+      console.error(`Tournament import job ${jobId} failed`, error);
+      await jobRepo.updateById(jobId, {
+        status: 'failed',
+        error: error instanceof Error ? error.message : String(error),
+      });
+    }
+  });
+
+// Queues the import of a pokedata_url tournament, which runs after the
+// response is sent. Its progress is read from the returned job, which is
+// tagged with the test run `runId` like the tournament it creates.
+export const submitTournamentImport = async (
+  tournamentData: AddTournamentFormData,
+  runId?: string,
+) => {
+  await DBConnection.connect();
+
+  const jobRepo = new TournamentImportJobRepository();
+  const job = await jobRepo.create({
+    name: tournamentData.name,
+    season: tournamentData.season,
+    format: tournamentData.format,
+    url: tournamentData.data,
+    runId,
+  });
+  after(() => runTournamentImportJob(job.id));
+  return job;
+};
@@ -35,6 +35,7 @@ export const validateCreateTrainingData = (data: unknown) => {
 export const createTrainingForUser = async (
   userId: string,
   trainingData: AddTrainingFormData,
+  runId?: string,
 ) => {
   await DBConnection.connect();
 
@@ -49,6 +50,7 @@ export const createTrainingForUser = async (
     ...trainingData,
     team,
     description: trainingData.description ?? '',
+    runId,
   };
 
   const training = await userRepo.addNewTraining(userId, createData);
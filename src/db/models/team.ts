@@ -4,7 +4,7 @@ import TeamService from '@/src/services/pokemon/team';
 import { CreateTeamData, Team } from '@/src/types/api';
 
 import DBConnection from '../DBConnection';
-import { CRUDRepository } from '../repository';
+import { CRUDRepository, RunFilter, RunIdField, runQuery } from '../repository';
 
 export const TeamModelName = 'Team';
 
@@ -16,6 +16,7 @@ export const TeamSchema = new Schema<Team>(
     tags: [{ type: String, required: true }],
     name: { type: String, required: true },
     description: { type: String },
+    runId: RunIdField,
   },
   {
     id: true,
@@ -71,6 +72,22 @@ export default class TeamRepository implements CRUDRepository<Team> {
   async deleteById(id: string) {
     await this.model.findByIdAndDelete(id);
   }
+
+  // Of the given teams, the ids of those changed since a date
+  async getIdsUpdatedSince(ids: string[], since: Date): Promise<string[]> {
+    const teams = await this.model
+      .find({ _id: { $in: ids }, updatedAt: { $gt: since } })
+      .select('_id');
+    return teams.map((team) => team.id as string);
+  }
+
+  // Returns the ids of the deleted teams
+  async deleteByRun(filter: RunFilter): Promise<string[]> {
+    const teams = await this.model.find(runQuery(filter)).select('_id');
+    const ids = teams.map((team) => team.id as string);
+    await this.model.deleteMany({ _id: { $in: ids } });
+    return ids;
+  }
 }
 
 export class TeamNotFoundError extends Error {
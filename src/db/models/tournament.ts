@@ -1,16 +1,20 @@
 import { Model, models, Schema } from 'mongoose';
 
 import TeamService from '@/src/services/pokemon/team';
+import { TupleUnion } from '@/src/types';
 import {
   CreateTournamentData,
+  CreateTournamentImportJobData,
   Tournament,
+  TournamentImportJob,
   TournamentTeam,
 } from '@/src/types/api';
 
 import DBConnection from '../DBConnection';
-import { BaseRepository } from '../repository';
+import { BaseRepository, RunFilter, RunIdField, runQuery } from '../repository';
 
 export const TournamentModelName = 'Tournament';
+export const TournamentImportJobModelName = 'TournamentImportJob';
 const teamsService = new TeamService();
 
 const TournamentTeamSchema = new Schema<TournamentTeam>(
@@ -36,6 +40,7 @@ export const TournamentSchema = new Schema<Tournament>(
     season: { type: Number, required: true },
     format: { type: String, required: true },
     teams: [{ type: TournamentTeamSchema, required: true }],
+    runId: RunIdField,
   },
   {
     id: true,
@@ -46,6 +51,41 @@ export const TournamentSchema = new Schema<Tournament>(
 TournamentSchema.path('createdAt').get((val?: Date) => val?.toISOString?.());
 TournamentSchema.path('updatedAt').get((val?: Date) => val?.toISOString?.());
 
+const ImportJobStatusEnumList: TupleUnion<TournamentImportJob['status']> = [
+  'queued',
+  'running',
+  'succeeded',
+  'failed',
+];
+
+export const TournamentImportJobSchema = new Schema<TournamentImportJob>(
+  {
+    status: {
+      type: String,
+      required: true,
+      enum: ImportJobStatusEnumList,
+    },
+    name: { type: String, required: true },
+    season: { type: Number, required: true },
+    format: { type: String, required: true },
+    url: { type: String, required: true },
+    tournament: { ref: TournamentModelName, type: Schema.Types.ObjectId },
+    error: { type: String },
+    runId: RunIdField,
+  },
+  {
+    id: true,
+    timestamps: true,
+  },
+);
+
+TournamentImportJobSchema.path('createdAt').get((val?: Date) =>
+  val?.toISOString?.(),
+);
+TournamentImportJobSchema.path('updatedAt').get((val?: Date) =>
+  val?.toISOString?.(),
+);
+
 export default class TournamentRepository
   implements BaseRepository<Tournament, CreateTournamentData>
 {
@@ -73,10 +113,23 @@ export default class TournamentRepository
     await this.model.findByIdAndDelete(id);
   }
 
+  // Returns the ids of the deleted tournaments
+  async deleteByRun(filter: RunFilter): Promise<string[]> {
+    const tournaments = await this.model.find(runQuery(filter)).select('_id');
+    const ids = tournaments.map((tournament) => tournament.id as string);
+    await this.model.deleteMany({ _id: { $in: ids } });
+    return ids;
+  }
+
   async getAll(): Promise<Tournament[]> {
     const tournaments = await this.model.find();
     return tournaments.map((t) => t.toObject());
   }
+
+  async getIds(): Promise<string[]> {
+    const tournaments = await this.model.find().select('_id');
+    return tournaments.map((tournament) => tournament.id as string);
+  }
 }
 
 export class TournamentNotFoundError extends Error {
@@ -87,3 +140,83 @@ export class TournamentNotFoundError extends Error {
     this.id = id;
   }
 }
+
+export class TournamentImportJobRepository {
+  protected model: Model<TournamentImportJob>;
+  // Imports run in the memory of a server process and are lost when it
+  // stops, so jobs unfinished for longer are failed when read
+  static TIMEOUT_MS =
+    Number(process.env.TOURNAMENT_IMPORT_TIMEOUT_MS) || 10 * 60 * 1000;
+
+  constructor() {
+    this.model =
+      (models[TournamentImportJobModelName] as Model<TournamentImportJob>) ||
+      DBConnection.getConnection().model(
+        TournamentImportJobModelName,
+        TournamentImportJobSchema,
+      );
+  }
+
+  async getById(id: string): Promise<TournamentImportJob> {
+    await this.model.updateOne(
+      {
+        _id: id,
+        status: { $in: ['queued', 'running'] },
+        updatedAt: {
+          $lt: new Date(Date.now() - TournamentImportJobRepository.TIMEOUT_MS),
+        },
+      },
+      { status: 'failed', error: 'Import timed out' },
+    );
+    const job = await this.model.findById(id);
+    if (!job) {
+      throw new TournamentImportJobNotFoundError(id);
+    }
+    return job.toObject();
+  }
+
+  // Marks a queued job as running, null if it is no longer queued, e.g.
+  // failed by the timeout
+  async start(id: string): Promise<TournamentImportJob | null> {
+    const job = await this.model.findOneAndUpdate(
+      { _id: id, status: 'queued' },
+      { status: 'running' },
+      { new: true },
+    );
+    return job ? job.toObject() : null;
+  }
+
+  async create(
+    job: CreateTournamentImportJobData,
+  ): Promise<TournamentImportJob> {
+    return (await this.model.create({ ...job, status: 'queued' })).toObject();
+  }
+
+  async updateById(
+    id: string,
+    updateData: Partial<TournamentImportJob>,
+  ): Promise<TournamentImportJob> {
+    const job = await this.model.findByIdAndUpdate(id, updateData, {
+      new: true,
+    });
+    if (!job) {
+      throw new TournamentImportJobNotFoundError(id);
+    }
+    return job.toObject();
+  }
+
+  // Returns the number of deleted jobs
+  async deleteByRun(filter: RunFilter): Promise<number> {
+    const { deletedCount } = await this.model.deleteMany(runQuery(filter));
+    return deletedCount;
+  }
+}
+
+export class TournamentImportJobNotFoundError extends Error {
+  id: string;
+
+  constructor(id: string) {
+    super(`Could not find tournament import job with id ${id}`);
+    this.id = id;
+  }
+}
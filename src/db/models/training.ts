@@ -1,5 +1,9 @@
 import { Model, models, Schema } from 'mongoose';
 
+import {
+  TrainingAnalyticsService,
+  TrainingAnalyticsState,
+} from '@/src/services/pokemon/analytics';
 import { TupleUnion } from '@/src/types';
 import {
   Action,
@@ -7,15 +11,17 @@ import {
   CreateBattleData,
   CreateTrainingData,
   Training,
+  TrainingAnalytics,
   Turn,
 } from '@/src/types/api';
 
 import DBConnection from '../DBConnection';
-import { CRUDRepository } from '../repository';
+import { CRUDRepository, RunFilter, RunIdField, runQuery } from '../repository';
 import { TeamModelName } from './team';
 
 export const TrainingModelName = 'Training';
 export const BattleModelName = 'Battle';
+export const TrainingAnalyticsModelName = 'TrainingAnalytics';
 
 const ActionTypeEnumList: TupleUnion<Action['type']> = [
   'move',
@@ -71,6 +77,7 @@ export const BattleSchema = new Schema<Battle>(
       requried: true,
       enum: BattleResultEnumList,
     },
+    runId: RunIdField,
     ...BaseBattleFields,
   },
   {
@@ -88,6 +95,9 @@ export const TrainingSchema = new Schema<Training>(
     description: { type: String },
     isDefault: { type: Boolean, required: true },
     battles: [{ type: Schema.Types.ObjectId, ref: BattleModelName }],
+    // Incremented on every change of the training or its battles
+    version: { type: Number, default: 0 },
+    runId: RunIdField,
     ...BaseBattleFields,
   },
   {
@@ -99,6 +109,27 @@ export const TrainingSchema = new Schema<Training>(
 TrainingSchema.path('createdAt').get((val?: Date) => val?.toISOString?.());
 TrainingSchema.path('updatedAt').get((val?: Date) => val?.toISOString?.());
 
+interface StoredTrainingAnalytics {
+  training: string;
+  // TrainingAnalyticsService.VERSION the state was built with
+  analyticsVersion: number;
+  // Version of the training whose battles the state aggregates
+  trainingVersion: number;
+  state: TrainingAnalyticsState;
+}
+
+const TrainingAnalyticsSchema = new Schema<StoredTrainingAnalytics>({
+  training: {
+    ref: TrainingModelName,
+    type: Schema.Types.ObjectId,
+    required: true,
+    unique: true,
+  },
+  analyticsVersion: { type: Number, required: true },
+  trainingVersion: { type: Number, required: true },
+  state: { type: Schema.Types.Mixed, required: true },
+});
+
 export class BattleRepository implements CRUDRepository<Battle> {
   protected model: Model<Battle>;
 
@@ -138,6 +169,34 @@ export class BattleRepository implements CRUDRepository<Battle> {
     await createdBattle.populate('team');
     return createdBattle.toObject();
   }
+
+  async deleteByIds(ids: string[]): Promise<void> {
+    await this.model.deleteMany({ _id: { $in: ids } });
+  }
+
+  // Of the given battles, the ids of those changed since a date or playing
+  // one of the given teams
+  async getIdsUpdatedSince(
+    ids: string[],
+    since: Date,
+    updatedTeams: string[],
+  ): Promise<string[]> {
+    const battles = await this.model
+      .find({
+        _id: { $in: ids },
+        $or: [{ updatedAt: { $gt: since } }, { team: { $in: updatedTeams } }],
+      })
+      .select('_id');
+    return battles.map((battle) => battle.id as string);
+  }
+
+  // Returns the ids of the deleted battles
+  async deleteByRun(filter: RunFilter): Promise<string[]> {
+    const battles = await this.model.find(runQuery(filter)).select('_id');
+    const ids = battles.map((battle) => battle.id as string);
+    await this.deleteByIds(ids);
+    return ids;
+  }
 }
 
 export class BattleNotFoundError extends Error {
@@ -150,26 +209,41 @@ export class BattleNotFoundError extends Error {
 
 export default class TrainingRepository implements CRUDRepository<Training> {
   protected model: Model<Training>;
+  protected analyticsModel: Model<StoredTrainingAnalytics>;
   protected battleRepository: BattleRepository;
-  static BATTLES_PER_TRAININGS_LIMIT = 1000;
+  protected analyticsService: TrainingAnalyticsService;
+  // Raised on local servers seeded by the scaling benchmarks
+  static BATTLES_PER_TRAININGS_LIMIT =
+    Number(process.env.BATTLES_PER_TRAINING_LIMIT) || 1000;
 
   constructor() {
     this.model =
       (models[TrainingModelName] as Model<Training>) ||
       DBConnection.getConnection().model(TrainingModelName, TrainingSchema);
+    this.analyticsModel =
+      (models[TrainingAnalyticsModelName] as Model<StoredTrainingAnalytics>) ||
+      DBConnection.getConnection().model(
+        TrainingAnalyticsModelName,
+        TrainingAnalyticsSchema,
+      );
     this.battleRepository = new BattleRepository();
+    this.analyticsService = new TrainingAnalyticsService();
   }
 
   async updateById(
     id: string,
     updateData: Partial<Training>,
   ): Promise<Training> {
-    const training = await this.model.findByIdAndUpdate(id, updateData, {
-      new: true,
-    });
+    const training = await this.model.findByIdAndUpdate(
+      id,
+      { ...updateData, $inc: { version: 1 } },
+      { new: true },
+    );
     if (!training) {
       throw new TrainingNotFoundError(id);
     }
+    // The analytics only depend on the battles
+    await this.updateAnalytics(id, training.version ?? 0, [], []);
     return training.toObject();
   }
 
@@ -183,9 +257,168 @@ export default class TrainingRepository implements CRUDRepository<Training> {
     );
     await Promise.all(promises);
 
+    await this.analyticsModel.deleteOne({ training: id });
     await this.model.findByIdAndDelete(id);
   }
 
+  // Deletes the battles and trainings of test runs, with every battle of the
+  // deleted trainings. Trainings losing battles get a new version, so their
+  // analytics aggregate is rebuilt
+  async deleteByRun(
+    filter: RunFilter,
+  ): Promise<{ trainings: string[]; battles: string[] }> {
+    const battles = await this.battleRepository.deleteByRun(filter);
+    if (battles.length) {
+      await this.model.updateMany(
+        { battles: { $in: battles } },
+        { $pull: { battles: { $in: battles } }, $inc: { version: 1 } },
+      );
+    }
+
+    const trainings = await this.model.find(runQuery(filter)).select('battles');
+    const ids = trainings.map((training) => training.id as string);
+    const trainingBattles = trainings.flatMap((training) =>
+      training.battles.map((battleId) => battleId.toString()),
+    );
+    await this.battleRepository.deleteByIds(trainingBattles);
+    await this.analyticsModel.deleteMany({ training: { $in: ids } });
+    await this.model.deleteMany({ _id: { $in: ids } });
+    return { trainings: ids, battles: [...battles, ...trainingBattles] };
+  }
+
+  // Of the given trainings, the ids of those changed since a date, with their
+  // team or one of their battles or its team. Only ids are read
+  async getIdsUpdatedSince(
+    ids: string[],
+    since: Date,
+    updatedTeams: string[],
+  ): Promise<string[]> {
+    const trainings = await this.model
+      .find({ _id: { $in: ids } })
+      .select('battles');
+    const battles = await this.battleRepository.getIdsUpdatedSince(
+      trainings.flatMap((training) =>
+        training.battles.map((battleId) => battleId.toString()),
+      ),
+      since,
+      updatedTeams,
+    );
+    const updated = await this.model
+      .find({
+        _id: { $in: ids },
+        $or: [
+          { updatedAt: { $gt: since } },
+          { team: { $in: updatedTeams } },
+          { battles: { $in: battles } },
+        ],
+      })
+      .select('_id');
+    return updated.map((training) => training.id as string);
+  }
+
+  // Of the given trainings, the id of the default one
+  async getDefaultId(ids: string[]): Promise<string | null> {
+    const training = await this.model
+      .findOne({ _id: { $in: ids }, isDefault: true })
+      .select('_id');
+    return training ? (training.id as string) : null;
+  }
+
+  async getVersion(id: string): Promise<number> {
+    const training = await this.model.findById(id).select('version');
+    if (!training) {
+      throw new TrainingNotFoundError(id);
+    }
+    return training.version ?? 0;
+  }
+
+  // Renders the persisted analytics aggregate when it is up to date with the
+  // training, otherwise rebuilds it from every battle and persists it. With
+  // full, it is always rebuilt and the persisted aggregate is left untouched,
+  // to check it against a full computation
+  async getAnalytics(
+    id: string,
+    full = false,
+  ): Promise<{ analysis: TrainingAnalytics; version: number }> {
+    const training = await this.model.findById(id);
+    if (!training) {
+      throw new TrainingNotFoundError(id);
+    }
+    const version = training.version ?? 0;
+
+    const stored = full
+      ? null
+      : await this.analyticsModel.findOne({ training: id });
+    if (
+      stored &&
+      stored.analyticsVersion === TrainingAnalyticsService.VERSION &&
+      stored.trainingVersion === version
+    ) {
+      const context = this.analyticsService.createContext(stored.state);
+      return {
+        analysis: this.analyticsService.getAnalysisResult(context),
+        version,
+      };
+    }
+
+    await training.populate('battles');
+    const { battles } = training.toObject();
+    const context = this.analyticsService.createContext();
+    battles.forEach((battle) =>
+      this.analyticsService.addBattle(context, battle),
+    );
+
+    // Battles changed while they were read could be missing from the state,
+    // so it is only persisted if the training is still at the same version
+    if (!full && (await this.getVersion(id)) === version) {
+      await this.analyticsModel.findOneAndUpdate(
+        { training: id },
+        {
+          analyticsVersion: TrainingAnalyticsService.VERSION,
+          trainingVersion: version,
+          state: this.analyticsService.getState(context),
+        },
+        { upsert: true },
+      );
+    }
+    return {
+      analysis: this.analyticsService.getAnalysisResult(context),
+      version,
+    };
+  }
+
+  // Applies the battles added and removed by the mutation that moved the
+  // training to version to the persisted aggregate. If the aggregate is not
+  // at the previous version (e.g. after concurrent mutations) it is left as
+  // is and rebuilt by the next getAnalytics
+  protected async updateAnalytics(
+    trainingId: string,
+    version: number,
+    added: Battle[],
+    removed: Battle[],
+  ) {
+    const stored = await this.analyticsModel.findOne({ training: trainingId });
+    if (
+      !stored ||
+      stored.analyticsVersion !== TrainingAnalyticsService.VERSION ||
+      stored.trainingVersion !== version - 1
+    ) {
+      return;
+    }
+    const context = this.analyticsService.createContext(stored.state);
+    removed.forEach((battle) =>
+      this.analyticsService.removeBattle(context, battle),
+    );
+    added.forEach((battle) => this.analyticsService.addBattle(context, battle));
+    await this.analyticsModel.updateOne(
+      { training: trainingId, trainingVersion: version - 1 },
+      {
+        trainingVersion: version,
+        state: this.analyticsService.getState(context),
+      },
+    );
+  }
+
   async getById(id: string): Promise<Training> {
     const training = await this.model.findById(id);
     if (!training) {
@@ -212,7 +445,6 @@ export default class TrainingRepository implements CRUDRepository<Training> {
   ): Promise<Battle> {
     const training = await this.model.findById(trainingId);
     if (!training) throw new TrainingNotFoundError(trainingId);
-    await training.populate('battles');
     if (
       training.battles.length >= TrainingRepository.BATTLES_PER_TRAININGS_LIMIT
     ) {
@@ -227,9 +459,20 @@ export default class TrainingRepository implements CRUDRepository<Training> {
       ...battle,
     };
     const createdBattle = await this.battleRepository.create(battleData);
-    await this.model.findByIdAndUpdate(trainingId, {
-      $push: { battles: createdBattle.id },
-    });
+    const updatedTraining = await this.model.findByIdAndUpdate(
+      trainingId,
+      {
+        $push: { battles: createdBattle.id },
+        $inc: { version: 1 },
+      },
+      { new: true },
+    );
+    await this.updateAnalytics(
+      trainingId,
+      updatedTraining?.version ?? 0,
+      [createdBattle],
+      [],
+    );
     return createdBattle;
   }
 
@@ -237,10 +480,23 @@ export default class TrainingRepository implements CRUDRepository<Training> {
     const training = await this.model.findById(trainingId);
     if (!training) return;
     await training.populate('battles');
-    if (!training.battles.some((b) => b.id === battleId)) return;
-    await this.model.findByIdAndUpdate(trainingId, {
-      $pull: { battles: battleId },
-    });
+    const { battles } = training.toObject();
+    const battle = battles.find((b) => b.id === battleId);
+    if (!battle) return;
+    const updatedTraining = await this.model.findByIdAndUpdate(
+      trainingId,
+      {
+        $pull: { battles: battleId },
+        $inc: { version: 1 },
+      },
+      { new: true },
+    );
+    await this.updateAnalytics(
+      trainingId,
+      updatedTraining?.version ?? 0,
+      [],
+      [battle],
+    );
     return await this.battleRepository.deleteById(battleId);
   }
 
@@ -252,10 +508,26 @@ export default class TrainingRepository implements CRUDRepository<Training> {
     const training = await this.model.findById(trainingId);
     if (!training) throw new TrainingNotFoundError(trainingId);
     await training.populate('battles');
-    if (!training.battles.some((b) => b.id === battleId)) {
+    const { battles } = training.toObject();
+    const previousBattle = battles.find((b) => b.id === battleId);
+    if (!previousBattle) {
       throw new BattleNotFoundError(battleId);
     }
-    return await this.battleRepository.updateById(battleId, data);
+    // The version is bumped before the battle changes, so an analytics
+    // rebuild reading the new battle never persists it for the old version
+    const updatedTraining = await this.model.findByIdAndUpdate(
+      trainingId,
+      { $inc: { version: 1 } },
+      { new: true },
+    );
+    const battle = await this.battleRepository.updateById(battleId, data);
+    await this.updateAnalytics(
+      trainingId,
+      updatedTraining?.version ?? 0,
+      [battle],
+      [previousBattle],
+    );
+    return battle;
   }
 }
 
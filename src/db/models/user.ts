@@ -14,9 +14,10 @@ import {
   UnsensitiveUserData,
   User,
 } from '@/src/types/api';
+import { escapeRegExp } from '@/src/utils/string';
 
 import DBConnection from '../DBConnection';
-import { BaseRepository } from '../repository';
+import { BaseRepository, RunFilter } from '../repository';
 import TeamRepository, { TeamModelName, TeamNotFoundError } from './team';
 import TrainingRepository, {
   BattleNotFoundError,
@@ -61,6 +62,12 @@ export default class UserRepository implements BaseRepository<User> {
     this.trainingRepository = new TrainingRepository();
   }
 
+  // Case insensitive, but whole usernames only, so that "mew" does not match
+  // "mewtwo" or the "mew-gw1" e2e user "mew-gw10"
+  protected static usernamePattern(username: string) {
+    return new RegExp(`^${escapeRegExp(username)}$`, 'i');
+  }
+
   async getById(id: string) {
     const user = await this.model.findById(id);
     if (!user) {
@@ -76,7 +83,7 @@ export default class UserRepository implements BaseRepository<User> {
 
   async create(user: SignUpData, role?: User['role']) {
     const sameUsernameCount = await this.model.countDocuments({
-      username: new RegExp(user.username, 'i'),
+      username: UserRepository.usernamePattern(user.username),
     });
     if (sameUsernameCount) {
       throw new UserAlreadyExistsError(user);
@@ -108,7 +115,7 @@ export default class UserRepository implements BaseRepository<User> {
     password,
   }: SignInData): Promise<UnsensitiveUserData | undefined> {
     const user = await this.model.findOne({
-      username: new RegExp(username, 'i'),
+      username: UserRepository.usernamePattern(username),
     });
     if (!user) {
       return undefined;
@@ -191,11 +198,42 @@ export default class UserRepository implements BaseRepository<User> {
     return await this.trainingRepository.deleteById(trainingId);
   }
 
-  async getTrainings(userId: string): Promise<Training[]> {
+  // Deletes the battles, trainings and teams of test runs, in that order, and
+  // removes them from their users
+  async deleteByRun(filter: RunFilter) {
+    const { trainings, battles } =
+      await this.trainingRepository.deleteByRun(filter);
+    const teams = await this.teamRepository.deleteByRun(filter);
+    await this.model.updateMany(
+      { $or: [{ teams: { $in: teams } }, { trainings: { $in: trainings } }] },
+      { $pull: { teams: { $in: teams }, trainings: { $in: trainings } } },
+    );
+    return { teams, trainings, battles };
+  }
+
+  async getTrainings(
+    userId: string,
+    updatedSince?: Date,
+  ): Promise<Training[]> {
     const user = await this.model.findById(userId);
     if (!user) throw new UserNotFoundError(userId);
+    // Only the changed trainings are populated
+    let match = {};
+    if (updatedSince) {
+      const teams = await this.teamRepository.getIdsUpdatedSince(
+        user.teams.map((teamId) => teamId.toString()),
+        updatedSince,
+      );
+      const trainings = await this.trainingRepository.getIdsUpdatedSince(
+        user.trainings.map((trainingId) => trainingId.toString()),
+        updatedSince,
+        teams,
+      );
+      match = { _id: { $in: trainings } };
+    }
     await user.populate({
       path: 'trainings',
+      match,
       populate: [
         {
           path: 'battles',
@@ -207,6 +245,33 @@ export default class UserRepository implements BaseRepository<User> {
     return user.toObject().trainings;
   }
 
+  async getTeams(userId: string, updatedSince?: Date): Promise<Team[]> {
+    const user = await this.model.findById(userId);
+    if (!user) throw new UserNotFoundError(userId);
+    await user.populate({
+      path: 'teams',
+      match: updatedSince ? { updatedAt: { $gt: updatedSince } } : {},
+    });
+    return user.toObject().teams;
+  }
+
+  async getTrainingIds(userId: string): Promise<string[]> {
+    const user = await this.model.findById(userId);
+    if (!user) throw new UserNotFoundError(userId);
+    return user.trainings.map((trainingId) => trainingId.toString());
+  }
+
+  async getDefaultTrainingId(userId: string): Promise<string | null> {
+    const trainingIds = await this.getTrainingIds(userId);
+    return await this.trainingRepository.getDefaultId(trainingIds);
+  }
+
+  async getTeamIds(userId: string): Promise<string[]> {
+    const user = await this.model.findById(userId);
+    if (!user) throw new UserNotFoundError(userId);
+    return user.teams.map((teamId) => teamId.toString());
+  }
+
   async updateTraining(
     userId: string,
     trainingId: string,
@@ -276,6 +341,22 @@ export default class UserRepository implements BaseRepository<User> {
     return training;
   }
 
+  async getTrainingVersion(userId: string, trainingId: string) {
+    const trainingIds = await this.getTrainingIds(userId);
+    if (!trainingIds.includes(trainingId)) {
+      throw new TrainingNotFoundError(trainingId);
+    }
+    return await this.trainingRepository.getVersion(trainingId);
+  }
+
+  async getTrainingAnalytics(userId: string, trainingId: string, full = false) {
+    const trainingIds = await this.getTrainingIds(userId);
+    if (!trainingIds.includes(trainingId)) {
+      throw new TrainingNotFoundError(trainingId);
+    }
+    return await this.trainingRepository.getAnalytics(trainingId, full);
+  }
+
   async getBattleById(userId: string, trainingId: string, battleId: string) {
     const training = await this.getTrainingById(userId, trainingId);
     const battle = training.battles.find(({ id }) => id === battleId);
@@ -7,3 +7,14 @@ export interface CRUDRepository<T> extends BaseRepository<T> {
   updateById(id: string, model: Partial<T>): Promise<T>;
   deleteById(id: string): Promise<void>;
 }
+
+// Entities created by an e2e test run, or by any test run before a date
+export type RunFilter = { runId: string } | { before: Date };
+
+// Schema field of the test run that created an entity, absent otherwise
+export const RunIdField = { type: String, index: true, sparse: true };
+
+export const runQuery = (filter: RunFilter) =>
+  'runId' in filter
+    ? { runId: filter.runId }
+    : { runId: { $exists: true }, createdAt: { $lt: filter.before } };
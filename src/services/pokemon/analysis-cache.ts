@@ -0,0 +1,59 @@
+import { createHash } from 'crypto';
+
+import { TrainingAnalytics } from '@/src/types/api';
+
+import { TrainingAnalyticsService } from './analytics';
+
+/**
+ * In-memory LRU of training analyses keyed by the training version, so the
+ * analysis is only rendered again after the training or its battles change.
+ */
+export default class TrainingAnalysisCache {
+  protected entries = new Map<string, TrainingAnalytics>();
+  protected maxEntries: number;
+
+  constructor(maxEntries = 200) {
+    this.maxEntries = maxEntries;
+  }
+
+  /**
+   * Strong ETag of the analysis of a training. It changes with the analytics
+   * version and the training version, which is bumped on every training and
+   * battle mutation.
+   */
+  static getETag(trainingId: string, version: number) {
+    const hash = createHash('sha256');
+    hash.update(
+      [TrainingAnalyticsService.VERSION, trainingId, version].join('|'),
+    );
+    return `"${hash.digest('base64url')}"`;
+  }
+
+  static matchesETag(ifNoneMatch: string | null, etag: string) {
+    if (!ifNoneMatch) return false;
+    return ifNoneMatch
+      .split(',')
+      .map((tag) => tag.trim().replace(/^W\//, ''))
+      .some((tag) => tag === etag || tag === '*');
+  }
+
+  get(etag: string) {
+    const analysis = this.entries.get(etag);
+    if (analysis) {
+      this.entries.delete(etag);
+      this.entries.set(etag, analysis);
+    }
+    return analysis;
+  }
+
+  set(etag: string, analysis: TrainingAnalytics) {
+    this.entries.delete(etag);
+    this.entries.set(etag, analysis);
+    if (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value;
+      if (oldest !== undefined) this.entries.delete(oldest);
+    }
+  }
+}
+
+export const trainingAnalysisCache = new TrainingAnalysisCache();
@@ -6,6 +6,7 @@ import AnalyticsService, {
   CoreAnalysis,
   PokemonAnalysis,
   TrainingAnalyticsService,
+  TrainingAnalyticsState,
   UsageAnalysis,
 } from './analytics';
 import TeamService from './team';
@@ -43,6 +44,19 @@ describe('Analytics', () => {
         expect.arrayContaining(['value_0', 'value_1', 'value_2']),
       );
     });
+
+    it('should remove tracked values', () => {
+      const removedUsage = new UsageAnalysis<string>();
+      removedUsage.addUsage('value_0');
+      removedUsage.addUsage('value_0');
+      removedUsage.addUsage('value_1');
+      removedUsage.removeUsage('value_0');
+      removedUsage.removeUsage('value_1');
+      expect(removedUsage.getAnalysisResult()).toEqual([
+        { value: 'value_0', percentage: 1 },
+      ]);
+      expect(removedUsage.getValues()).toEqual(['value_0']);
+    });
   });
 
   describe('PokemonAnalysis', () => {
@@ -194,6 +208,21 @@ describe('Analytics', () => {
   describe('TrainingAnalyticsService', () => {
     const trainingAnalyticsService = new TrainingAnalyticsService();
 
+    // Incremental updates keep the same values but not the same ordering
+    const sortDeep = (value: unknown): unknown => {
+      if (Array.isArray(value)) {
+        return value
+          .map(sortDeep)
+          .sort((a, b) => JSON.stringify(a).localeCompare(JSON.stringify(b)));
+      }
+      if (value && typeof value === 'object') {
+        return Object.fromEntries(
+          Object.entries(value).map(([key, item]) => [key, sortDeep(item)]),
+        );
+      }
+      return value;
+    };
+
     it('should analyze openings', () => {
       const training = createSampleTraining();
       const analytics = trainingAnalyticsService.getAnalytics(training);
@@ -407,6 +436,44 @@ describe('Analytics', () => {
       );
     });
 
+    it('should add and remove battles incrementally', () => {
+      const training = createSampleTraining();
+      const [removed, ...kept] = training.battles;
+      const context = trainingAnalyticsService.createContext();
+      training.battles.forEach((battle) =>
+        trainingAnalyticsService.addBattle(context, battle),
+      );
+      trainingAnalyticsService.removeBattle(context, removed);
+
+      // the state survives a round trip through JSON, as when persisted
+      const restored = trainingAnalyticsService.createContext(
+        JSON.parse(
+          JSON.stringify(trainingAnalyticsService.getState(context)),
+        ) as TrainingAnalyticsState,
+      );
+      expect(
+        sortDeep(trainingAnalyticsService.getAnalysisResult(restored)),
+      ).toEqual(
+        sortDeep(
+          trainingAnalyticsService.getAnalytics({ ...training, battles: kept }),
+        ),
+      );
+
+      trainingAnalyticsService.addBattle(restored, removed);
+      expect(
+        sortDeep(trainingAnalyticsService.getAnalysisResult(restored)),
+      ).toEqual(sortDeep(trainingAnalyticsService.getAnalytics(training)));
+
+      training.battles.forEach((battle) =>
+        trainingAnalyticsService.removeBattle(restored, battle),
+      );
+      expect(trainingAnalyticsService.getState(restored)).toEqual(
+        trainingAnalyticsService.getState(
+          trainingAnalyticsService.createContext(),
+        ),
+      );
+    });
+
     it('should analyze key actions', () => {
       const training = createSampleTraining();
       const { keyActions } = trainingAnalyticsService.getAnalytics(training);
@@ -30,6 +30,17 @@ import { ActionKeyWords } from './battle';
 type StringSetProperty = 'ability' | 'item' | 'moves' | 'teraType';
 type Stat = keyof PokemonSet['evs'];
 
+// Adds delta to the count of key. Keys are removed once their count is back
+// to zero, so removing a value leaves the same state as never adding it
+const addCount = <K>(counts: Map<K, number>, key: K, delta: number) => {
+  const count = (counts.get(key) ?? 0) + delta;
+  if (count === 0) {
+    counts.delete(key);
+  } else {
+    counts.set(key, count);
+  }
+};
+
 export class UsageAnalysis<T> {
   protected valuesCount: Map<T, number>;
   protected totalCount: number;
@@ -41,11 +52,13 @@ export class UsageAnalysis<T> {
 
   addUsage(value: T) {
     this.totalCount += 1;
-    if (!this.valuesCount.has(value)) {
-      this.valuesCount.set(value, 0);
-    }
-    const currCount = this.valuesCount.get(value)!;
-    this.valuesCount.set(value, currCount + 1);
+    addCount(this.valuesCount, value, 1);
+  }
+
+  removeUsage(value: T) {
+    if (!this.valuesCount.has(value)) return;
+    this.totalCount -= 1;
+    addCount(this.valuesCount, value, -1);
   }
 
   getAnalysisResult(overrideTotalCount?: number): Usage<T>[] {
@@ -294,6 +307,13 @@ export default class AnalyticsService {
 
 type BattleResult = Exclude<Battle['result'], undefined> | 'unknown';
 
+interface MatchupTrackerState {
+  pokemon: string[];
+  results: [BattleResult, number][];
+  count: number;
+  pairings: MatchupTrackerState[];
+}
+
 class MatchupTracker {
   pokemon: string[];
   results: Map<BattleResult, number>;
@@ -313,13 +333,22 @@ class MatchupTracker {
     return hash.digest('hex');
   }
 
-  track(result: BattleResult, pairing?: string[]) {
-    this.count += 1;
-    if (!this.results.has(result)) {
-      this.results.set(result, 0);
-    }
-    const currCount = this.results.get(result)!;
-    this.results.set(result, currCount + 1);
+  static fromState(state: MatchupTrackerState) {
+    const tracker = new MatchupTracker(state.pokemon);
+    tracker.results = new Map(state.results);
+    tracker.count = state.count;
+    state.pairings.forEach((pairing) => {
+      tracker.pairingsTracker.set(
+        MatchupTracker.getHash(pairing.pokemon),
+        MatchupTracker.fromState(pairing),
+      );
+    });
+    return tracker;
+  }
+
+  track(result: BattleResult, pairing?: string[], delta = 1) {
+    this.count += delta;
+    addCount(this.results, result, delta);
 
     if (!pairing || pairing.length === 0) return;
 
@@ -327,7 +356,22 @@ class MatchupTracker {
     if (!this.pairingsTracker.has(pairingHash)) {
       this.pairingsTracker.set(pairingHash, new MatchupTracker(pairing));
     }
-    this.pairingsTracker.get(pairingHash)!.track(result);
+    const pairingTracker = this.pairingsTracker.get(pairingHash)!;
+    pairingTracker.track(result, undefined, delta);
+    if (pairingTracker.count === 0) {
+      this.pairingsTracker.delete(pairingHash);
+    }
+  }
+
+  getState(): MatchupTrackerState {
+    return {
+      pokemon: this.pokemon,
+      results: Array.from(this.results.entries()),
+      count: this.count,
+      pairings: Array.from(this.pairingsTracker.values()).map((tracker) =>
+        tracker.getState(),
+      ),
+    };
   }
 
   getAnalysisResult(): MatchupAnalytics {
@@ -354,6 +398,17 @@ class MatchupTracker {
   }
 }
 
+interface PokemonTrackerState {
+  pokemon: string;
+  koCount: number;
+  kos: [string, number][];
+  faintCount: number;
+  faints: [string, number][];
+  usageCount: number;
+  moves: [string, number][];
+  movesUsage: [string, number][];
+}
+
 class PokemonTracker {
   pokemon: string;
   koCount: number;
@@ -361,8 +416,10 @@ class PokemonTracker {
   faintCount: number;
   faints: Map<string, number>;
   usageCount: number;
+  // Number of battles in which each move was used
   moves: Map<string, number>;
-  movesBattleAverage: Map<string, Map<number, number>>;
+  // Number of times each move was used, across all battles
+  movesUsage: Map<string, number>;
 
   constructor(pokemon: string) {
     this.pokemon = pokemon;
@@ -372,45 +429,55 @@ class PokemonTracker {
     this.faints = new Map();
     this.usageCount = 0;
     this.moves = new Map();
-    this.movesBattleAverage = new Map();
+    this.movesUsage = new Map();
   }
 
-  track() {
-    this.usageCount += 1;
+  static fromState(state: PokemonTrackerState) {
+    const tracker = new PokemonTracker(state.pokemon);
+    tracker.koCount = state.koCount;
+    tracker.kos = new Map(state.kos);
+    tracker.faintCount = state.faintCount;
+    tracker.faints = new Map(state.faints);
+    tracker.usageCount = state.usageCount;
+    tracker.moves = new Map(state.moves);
+    tracker.movesUsage = new Map(state.movesUsage);
+    return tracker;
   }
 
-  trackKo(koedPokemon: string) {
-    this.koCount += 1;
-    if (!this.kos.has(koedPokemon)) {
-      this.kos.set(koedPokemon, 0);
-    }
-    const currCount = this.kos.get(koedPokemon)!;
-    this.kos.set(koedPokemon, currCount + 1);
+  track(delta = 1) {
+    this.usageCount += delta;
   }
 
-  trackFaint(faintedByPokemon: string) {
-    this.faintCount += 1;
-    if (!this.faints.has(faintedByPokemon)) {
-      this.faints.set(faintedByPokemon, 0);
-    }
-    const currCount = this.faints.get(faintedByPokemon)!;
-    this.faints.set(faintedByPokemon, currCount + 1);
+  trackKo(koedPokemon: string, delta = 1) {
+    this.koCount += delta;
+    addCount(this.kos, koedPokemon, delta);
   }
 
-  trackMoveUsage(move: string, battleId: number) {
-    if (!this.moves.has(move)) {
-      this.moves.set(move, 0);
-      this.movesBattleAverage.set(move, new Map());
-    }
+  trackFaint(faintedByPokemon: string, delta = 1) {
+    this.faintCount += delta;
+    addCount(this.faints, faintedByPokemon, delta);
+  }
 
-    const battleMap = this.movesBattleAverage.get(move)!;
-    if (!battleMap.has(battleId)) {
-      battleMap.set(battleId, 0);
-      const currCount = this.moves.get(move)!;
-      this.moves.set(move, currCount + 1);
-    }
-    const currBattleCount = battleMap.get(battleId)!;
-    battleMap.set(battleId, currBattleCount + 1);
+  // battleMoves has the number of times each move was used in a battle, delta
+  // is 1 when adding the battle and -1 when removing it
+  trackBattleMoves(battleMoves: Map<string, number>, delta = 1) {
+    battleMoves.forEach((usage, move) => {
+      addCount(this.moves, move, delta);
+      addCount(this.movesUsage, move, usage * delta);
+    });
+  }
+
+  getState(): PokemonTrackerState {
+    return {
+      pokemon: this.pokemon,
+      koCount: this.koCount,
+      kos: Array.from(this.kos.entries()),
+      faintCount: this.faintCount,
+      faints: Array.from(this.faints.entries()),
+      usageCount: this.usageCount,
+      moves: Array.from(this.moves.entries()),
+      movesUsage: Array.from(this.movesUsage.entries()),
+    };
   }
 
   getAnalysisResult(): BattlePokemonAnalytics {
@@ -426,14 +493,7 @@ class PokemonTracker {
 
     const moves: BattleMovesAnalytics[] = [];
     this.moves.forEach((count, move) => {
-      const battleMap = this.movesBattleAverage.get(move)!;
-      let totalBattles = 0;
-      let totalUsage = 0;
-      battleMap.forEach((usage) => {
-        totalBattles += 1;
-        totalUsage += usage;
-      });
-      const averageUsageByMatch = totalUsage / totalBattles;
+      const averageUsageByMatch = this.movesUsage.get(move)! / count;
       moves.push({
         move,
         averageUsage: count / this.usageCount,
@@ -460,6 +520,12 @@ class PokemonTracker {
   }
 }
 
+interface PokemonKeyActionsTrackerState {
+  actionName: string;
+  pokemonUsage: [string, number][];
+  actionUsage: [string, number][];
+}
+
 class PokemonKeyActionsTracker {
   actionName: string;
   pokemonUsage: Map<string, number>;
@@ -471,18 +537,28 @@ class PokemonKeyActionsTracker {
     this.actionUsage = new Map();
   }
 
-  track(pokemon: string, action: string) {
-    if (!this.pokemonUsage.has(pokemon)) {
-      this.pokemonUsage.set(pokemon, 0);
-    }
-    const currCount = this.pokemonUsage.get(pokemon)!;
-    this.pokemonUsage.set(pokemon, currCount + 1);
+  static fromState(state: PokemonKeyActionsTrackerState) {
+    const tracker = new PokemonKeyActionsTracker(state.actionName);
+    tracker.pokemonUsage = new Map(state.pokemonUsage);
+    tracker.actionUsage = new Map(state.actionUsage);
+    return tracker;
+  }
 
-    if (!this.actionUsage.has(action)) {
-      this.actionUsage.set(action, 0);
-    }
-    const currActionCount = this.actionUsage.get(action)!;
-    this.actionUsage.set(action, currActionCount + 1);
+  track(pokemon: string, action: string, delta = 1) {
+    addCount(this.pokemonUsage, pokemon, delta);
+    addCount(this.actionUsage, action, delta);
+  }
+
+  isEmpty() {
+    return this.pokemonUsage.size === 0 && this.actionUsage.size === 0;
+  }
+
+  getState(): PokemonKeyActionsTrackerState {
+    return {
+      actionName: this.actionName,
+      pokemonUsage: Array.from(this.pokemonUsage.entries()),
+      actionUsage: Array.from(this.actionUsage.entries()),
+    };
   }
 
   getAnalysisResult(): PokemonKeyActionAnalytics {
@@ -506,6 +582,14 @@ class PokemonKeyActionsTracker {
 
 type KeyAction = 'speed control' | 'weather control' | 'field control' | 'tera';
 
+interface KeyActionsTrackerState {
+  kos: [number, number][];
+  faints: [number, number][];
+  switches: [number, number][];
+  myActions: PokemonKeyActionsTrackerState[];
+  rivalActions: PokemonKeyActionsTrackerState[];
+}
+
 class KeyActionsTracker {
   kos: Map<number, number>;
   faints: Map<number, number>;
@@ -521,28 +605,36 @@ class KeyActionsTracker {
     this.rivalActions = new Map();
   }
 
-  trackKo(turn: number) {
-    if (!this.kos.has(turn)) {
-      this.kos.set(turn, 0);
-    }
-    const currCount = this.kos.get(turn)!;
-    this.kos.set(turn, currCount + 1);
+  static fromState(state: KeyActionsTrackerState) {
+    const tracker = new KeyActionsTracker();
+    tracker.kos = new Map(state.kos);
+    tracker.faints = new Map(state.faints);
+    tracker.switches = new Map(state.switches);
+    state.myActions.forEach((action) => {
+      tracker.myActions.set(
+        action.actionName as KeyAction,
+        PokemonKeyActionsTracker.fromState(action),
+      );
+    });
+    state.rivalActions.forEach((action) => {
+      tracker.rivalActions.set(
+        action.actionName as KeyAction,
+        PokemonKeyActionsTracker.fromState(action),
+      );
+    });
+    return tracker;
   }
 
-  trackFaint(turn: number) {
-    if (!this.faints.has(turn)) {
-      this.faints.set(turn, 0);
-    }
-    const currCount = this.faints.get(turn)!;
-    this.faints.set(turn, currCount + 1);
+  trackKo(turn: number, delta = 1) {
+    addCount(this.kos, turn, delta);
   }
 
-  trackSwitch(turn: number) {
-    if (!this.switches.has(turn)) {
-      this.switches.set(turn, 0);
-    }
-    const currCount = this.switches.get(turn)!;
-    this.switches.set(turn, currCount + 1);
+  trackFaint(turn: number, delta = 1) {
+    addCount(this.faints, turn, delta);
+  }
+
+  trackSwitch(turn: number, delta = 1) {
+    addCount(this.switches, turn, delta);
   }
 
   trackPokemonAction(
@@ -550,12 +642,31 @@ class KeyActionsTracker {
     pokemon: string,
     move: string,
     isRival?: boolean,
+    delta = 1,
   ) {
     const actionsMap = isRival ? this.rivalActions : this.myActions;
     if (!actionsMap.has(actionName)) {
       actionsMap.set(actionName, new PokemonKeyActionsTracker(actionName));
     }
-    actionsMap.get(actionName)!.track(pokemon, move);
+    const tracker = actionsMap.get(actionName)!;
+    tracker.track(pokemon, move, delta);
+    if (tracker.isEmpty()) {
+      actionsMap.delete(actionName);
+    }
+  }
+
+  getState(): KeyActionsTrackerState {
+    return {
+      kos: Array.from(this.kos.entries()),
+      faints: Array.from(this.faints.entries()),
+      switches: Array.from(this.switches.entries()),
+      myActions: Array.from(this.myActions.values()).map((tracker) =>
+        tracker.getState(),
+      ),
+      rivalActions: Array.from(this.rivalActions.values()).map((tracker) =>
+        tracker.getState(),
+      ),
+    };
   }
 
   getAnalysisResult(): KeyActionsAnalytics {
@@ -590,24 +701,45 @@ class KeyActionsTracker {
   }
 }
 
-interface TrainingAnalyticsContext {
+export interface TrainingAnalyticsContext {
   matchups: Map<string, MatchupTracker>;
   openings: Map<string, MatchupTracker>;
   pokemon: Map<string, PokemonTracker>;
   keyActions: KeyActionsTracker;
 }
 
+// Serializable aggregate of the analytics of a set of battles, battles can be
+// added to or removed from it without going through the other battles
+export interface TrainingAnalyticsState {
+  matchups: MatchupTrackerState[];
+  openings: MatchupTrackerState[];
+  pokemon: PokemonTrackerState[];
+  keyActions: KeyActionsTrackerState;
+}
+
+// Battle being added to (delta 1) or removed from (delta -1) the context
+interface BattleTrackingContext {
+  delta: number;
+  core: Set<string>;
+  // Number of times each of my pokemon used each move in the battle
+  moves: Map<string, Map<string, number>>;
+}
+
 type EventTracker = (
-  battle: number,
   turn: number,
   action: Action,
   ctx: TrainingAnalyticsContext,
+  battle: BattleTrackingContext,
 ) => void;
 
 export class TrainingAnalyticsService {
+  // Bump when the analytics output or the aggregate state changes, to
+  // invalidate cached analyses and persisted states
+  static VERSION = 2;
+
   private eventTrackers: EventTracker[] = [
     // track faints
-    (_battle, turn, action, ctx) => {
+    (turn, action, ctx, battle) => {
       if (action.name.includes(ActionKeyWords.FAINTED)) {
         const { pokemon, player } = this.parsePokemon(
           action.user,
@@ -620,56 +752,58 @@ export class TrainingAnalyticsService {
         }
         let tracker: PokemonTracker | undefined;
         if (player === 'p1') {
-          ctx.keyActions.trackFaint(turn);
-          tracker = ctx.pokemon.get(pokemon);
+          ctx.keyActions.trackFaint(turn, battle.delta);
+          tracker = this.getPokemonTracker(ctx, battle, pokemon);
           if (!tracker) {
             console.warn(
               `No tracker found for pokemon ${pokemon} when tracking faint.`,
             );
             return;
           }
-          tracker.trackFaint(faintedByPokemon);
+          tracker.trackFaint(faintedByPokemon, battle.delta);
         } else {
-          ctx.keyActions.trackKo(turn);
-          tracker = ctx.pokemon.get(faintedByPokemon);
+          ctx.keyActions.trackKo(turn, battle.delta);
+          tracker = this.getPokemonTracker(ctx, battle, faintedByPokemon);
           if (!tracker) {
             console.warn(
               `No tracker found for pokemon ${faintedByPokemon} when tracking ko.`,
             );
             return;
           }
-          tracker.trackKo(pokemon);
+          tracker.trackKo(pokemon, battle.delta);
         }
       }
     },
     // track move usage
-    (battle, _turn, action, ctx) => {
+    (_turn, action, ctx, battle) => {
       if (action.type === 'move') {
         const { pokemon, player } = this.parsePokemon(
           action.user,
           action.player,
         );
         if (player !== 'p1') return;
-        const tracker = ctx.pokemon.get(pokemon);
-        if (!tracker) {
+        if (!this.getPokemonTracker(ctx, battle, pokemon)) {
           console.warn(
             `No tracker found for pokemon ${pokemon} when tracking move usage.`,
           );
           return;
         }
         const move = action.name.replaceAll('-', ' ');
-        tracker.trackMoveUsage(move, battle);
+        if (!battle.moves.has(pokemon)) {
+          battle.moves.set(pokemon, new Map());
+        }
+        addCount(battle.moves.get(pokemon)!, move, 1);
       }
     },
     // track switches
-    (_battle, turn, action, ctx) => {
+    (turn, action, ctx, battle) => {
       if (action.type === 'switch') {
         if (action.player !== 'p1') return;
-        ctx.keyActions.trackSwitch(turn);
+        ctx.keyActions.trackSwitch(turn, battle.delta);
       }
     },
     // track speed control actions
-    (_battle, _turn, { type, user, player: actionPlayer, name }, ctx) => {
+    (_turn, { type, user, player: actionPlayer, name }, ctx, battle) => {
       name = name.replaceAll('-', ' ');
       for (const speedControlAction of TrainingAnalyticsConfig.speedControlMoves) {
         if (
@@ -683,12 +817,13 @@ export class TrainingAnalyticsService {
             pokemon,
             name,
             isRival,
+            battle.delta,
           );
         }
       }
     },
     // track weather changes
-    (_battle, _turn, action, ctx) => {
+    (_turn, action, ctx, battle) => {
       if (
         action.name.includes(ActionKeyWords.WEATHER) &&
         !action.name.includes(ActionKeyWords.ENDED) &&
@@ -709,11 +844,12 @@ export class TrainingAnalyticsService {
           pokemon,
           name ?? ActionKeyWords.UNKNOWN,
           isRival,
+          battle.delta,
         );
       }
     },
     // track fields and volatile effects
-    (_battle, _turn, action, ctx) => {
+    (_turn, action, ctx, battle) => {
       if (
         action.type === 'effect' &&
         action.name.includes(ActionKeyWords.STARTED) &&
@@ -736,11 +872,12 @@ export class TrainingAnalyticsService {
           pokemon,
           name ?? ActionKeyWords.UNKNOWN,
           isRival,
+          battle.delta,
         );
       }
     },
     // track tera type changes
-    (_battle, _turn, action, ctx) => {
+    (_turn, action, ctx, battle) => {
       if (
         action.type === 'effect' &&
         action.name.includes(ActionKeyWords.TERA) &&
@@ -759,74 +896,157 @@ export class TrainingAnalyticsService {
           pokemon,
           name ?? ActionKeyWords.UNKNOWN,
           isRival,
+          battle.delta,
         );
       }
     },
   ];
 
   getAnalytics(training: Training): TrainingAnalytics {
-    const matchups = new Map<string, MatchupTracker>();
-    const openings = new Map<string, MatchupTracker>();
-    const pokemon = new Map<string, PokemonTracker>();
-    const keyActions = new KeyActionsTracker();
+    const context = this.createContext();
+    training.battles.forEach((battle) => this.addBattle(context, battle));
+    return this.getAnalysisResult(context);
+  }
+
+  // Creates an empty context, or restores one from its state
+  createContext(state?: TrainingAnalyticsState): TrainingAnalyticsContext {
     const context: TrainingAnalyticsContext = {
-      matchups,
-      openings,
-      pokemon,
-      keyActions,
+      matchups: new Map(),
+      openings: new Map(),
+      pokemon: new Map(),
+      keyActions: state
+        ? KeyActionsTracker.fromState(state.keyActions)
+        : new KeyActionsTracker(),
     };
-
-    training.battles.forEach((battle, battleIndex) => {
-      const result = battle.result ?? 'unknown';
-      const { core, rivalCore } = this.getCores(battle);
-      const { core: openingCore, rivalCore: openingRivalCore } = this.getCores(
-        battle,
-        true,
+    state?.matchups.forEach((matchup) => {
+      context.matchups.set(
+        MatchupTracker.getHash(matchup.pokemon),
+        MatchupTracker.fromState(matchup),
       );
+    });
+    state?.openings.forEach((opening) => {
+      context.openings.set(
+        MatchupTracker.getHash(opening.pokemon),
+        MatchupTracker.fromState(opening),
+      );
+    });
+    state?.pokemon.forEach((pokemon) => {
+      context.pokemon.set(pokemon.pokemon, PokemonTracker.fromState(pokemon));
+    });
+    return context;
+  }
 
-      const coreHash = MatchupTracker.getHash(core);
-      if (!matchups.has(coreHash)) {
-        matchups.set(coreHash, new MatchupTracker(core));
-      }
-      matchups.get(coreHash)!.track(result, rivalCore);
-
-      const openingCoreHash = MatchupTracker.getHash(openingCore);
-      if (!openings.has(openingCoreHash)) {
-        openings.set(openingCoreHash, new MatchupTracker(openingCore));
-      }
-      openings.get(openingCoreHash)!.track(result, openingRivalCore);
+  getState(context: TrainingAnalyticsContext): TrainingAnalyticsState {
+    return {
+      matchups: Array.from(context.matchups.values()).map((tracker) =>
+        tracker.getState(),
+      ),
+      openings: Array.from(context.openings.values()).map((tracker) =>
+        tracker.getState(),
+      ),
+      pokemon: Array.from(context.pokemon.values()).map((tracker) =>
+        tracker.getState(),
+      ),
+      keyActions: context.keyActions.getState(),
+    };
+  }
 
-      core.forEach((species) => {
-        if (!pokemon.has(species)) {
-          pokemon.set(species, new PokemonTracker(species));
-        }
-        const tracker = pokemon.get(species)!;
-        tracker.track();
-      });
+  addBattle(context: TrainingAnalyticsContext, battle: Battle) {
+    this.trackBattle(context, battle, 1);
+  }
 
-      battle.turns.forEach((turn, index) => {
-        turn.actions.forEach((action) => {
-          this.eventTrackers.forEach((tracker) => {
-            tracker(battleIndex, index + 1, action, context);
-          });
-        });
-      });
-    });
+  // Removes a battle previously added, leaving the context as if the battle
+  // had never been added
+  removeBattle(context: TrainingAnalyticsContext, battle: Battle) {
+    this.trackBattle(context, battle, -1);
+  }
 
+  getAnalysisResult(context: TrainingAnalyticsContext): TrainingAnalytics {
     return {
       matchups: {
-        all: Array.from(matchups.values()).map((tracker) =>
+        all: Array.from(context.matchups.values()).map((tracker) =>
           tracker.getAnalysisResult(),
         ),
-        openings: Array.from(openings.values()).map((tracker) =>
+        openings: Array.from(context.openings.values()).map((tracker) =>
           tracker.getAnalysisResult(),
         ),
       },
-      pokemon: Array.from(pokemon.values()).map((tracker) =>
+      pokemon: Array.from(context.pokemon.values()).map((tracker) =>
         tracker.getAnalysisResult(),
       ),
-      keyActions: keyActions.getAnalysisResult(),
+      keyActions: context.keyActions.getAnalysisResult(),
+    };
+  }
+
+  private trackBattle(
+    context: TrainingAnalyticsContext,
+    battle: Battle,
+    delta: number,
+  ) {
+    const { matchups, openings, pokemon } = context;
+    const result = battle.result ?? 'unknown';
+    const { core, rivalCore } = this.getCores(battle);
+    const { core: openingCore, rivalCore: openingRivalCore } = this.getCores(
+      battle,
+      true,
+    );
+
+    const trackMatchup = (
+      trackers: Map<string, MatchupTracker>,
+      myCore: string[],
+      theirCore: string[],
+    ) => {
+      const coreHash = MatchupTracker.getHash(myCore);
+      if (!trackers.has(coreHash)) {
+        trackers.set(coreHash, new MatchupTracker(myCore));
+      }
+      const tracker = trackers.get(coreHash)!;
+      tracker.track(result, theirCore, delta);
+      if (tracker.count === 0) {
+        trackers.delete(coreHash);
+      }
     };
+    trackMatchup(matchups, core, rivalCore);
+    trackMatchup(openings, openingCore, openingRivalCore);
+
+    core.forEach((species) => {
+      if (!pokemon.has(species)) {
+        pokemon.set(species, new PokemonTracker(species));
+      }
+      pokemon.get(species)!.track(delta);
+    });
+
+    const battleContext: BattleTrackingContext = {
+      delta,
+      core: new Set(core),
+      moves: new Map(),
+    };
+    battle.turns.forEach((turn, index) => {
+      turn.actions.forEach((action) => {
+        this.eventTrackers.forEach((tracker) => {
+          tracker(index + 1, action, context, battleContext);
+        });
+      });
+    });
+    battleContext.moves.forEach((moves, species) => {
+      pokemon.get(species)!.trackBattleMoves(moves, delta);
+    });
+
+    core.forEach((species) => {
+      if (pokemon.get(species)?.usageCount === 0) {
+        pokemon.delete(species);
+      }
+    });
+  }
+
+  // Only the pokemon of the battle itself are looked up, so what a battle
+  // contributes does not depend on the other battles of the training
+  private getPokemonTracker(
+    ctx: TrainingAnalyticsContext,
+    battle: BattleTrackingContext,
+    pokemon: string,
+  ) {
+    return battle.core.has(pokemon) ? ctx.pokemon.get(pokemon) : undefined;
   }
 
   private parsePokemon(rawPokemon: string, actionPlayer?: string) {
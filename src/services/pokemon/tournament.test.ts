@@ -1,3 +1,4 @@
+import axios from 'axios';
 import { Pokemon, PokemonClient } from 'pokenode-ts';
 
 import { pokedataSampleTournament } from '@/src/utils/test-utils';
@@ -63,5 +64,25 @@ describe('TournamentParser', () => {
         expect(team.player).not.toBeFalsy();
       });
     });
+
+    it('should get species from the POKEAPI_URL mirror', async () => {
+      const getSpy = jest
+        .spyOn(axios, 'get')
+        .mockResolvedValue({ data: { name: 'mirrored name' } });
+      process.env.POKEAPI_URL = 'http://localhost:3999/api/v2/';
+      try {
+        const parser = TournamentParserFactory.getParser('pokedata');
+        const result = await parser.parse(
+          { name: 'test', season: 2025, format: 'reg h' },
+          [{ name: 'player', decklist: [{ id: '727' }] }],
+        );
+        expect(getSpy).toHaveBeenCalledWith(
+          'http://localhost:3999/api/v2/pokemon/727',
+        );
+        expect(result.teams[0].team[0].species).toEqual('mirrored name');
+      } finally {
+        delete process.env.POKEAPI_URL;
+      }
+    });
   });
 });
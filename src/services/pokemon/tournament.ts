@@ -1,4 +1,5 @@
-import { PokemonClient } from 'pokenode-ts';
+import axios from 'axios';
+import { Pokemon, PokemonClient } from 'pokenode-ts';
 
 import { type PokemonSet } from '@/src/services/pokemon';
 import { CreateTournamentData, TournamentTeam } from '@/src/types/api';
@@ -91,15 +92,28 @@ export class PokedataTournamentParser
     if (!id) {
       throw new ParsePokemonError(this.parserType, 'missing pokemon id', data);
     }
-    const pokemon = await this.pokemonClient.getPokemonById(Number(id));
+    const species = await this.getSpecies(Number(id));
     return {
-      species: pokemon.name,
+      species,
       ability,
       item,
       moves,
       teraType,
     };
   }
+
+  // POKEAPI_URL points to a PokeAPI mirror (e.g. the e2e pokedata server)
+  // instead of the public API
+  protected async getSpecies(id: number) {
+    const pokeApiUrl = process.env.POKEAPI_URL;
+    if (!pokeApiUrl) {
+      return (await this.pokemonClient.getPokemonById(id)).name;
+    }
+    const { data } = await axios.get<Pick<Pokemon, 'name'>>(
+      `${pokeApiUrl.replace(/\/$/, '')}/pokemon/${id}`,
+    );
+    return data.name;
+  }
 }
 
 export default class TournamentParserFactory {
@@ -9,11 +9,20 @@ export interface Team {
   name: string;
   description: string;
   parsedTeam: Partial<PokemonSet>[];
+  // e2e test run that created it, see src/actions/run.ts
+  runId?: string;
   createdAt: string;
+  updatedAt?: string;
 }
 
-export type CreateTeamData = Omit<Team, 'id' | 'parsedTeam' | 'createdAt'>;
-export type UpdateTeamData = Omit<Team, 'parsedTeam' | 'createdAt'>;
+export type CreateTeamData = Omit<
+  Team,
+  'id' | 'parsedTeam' | 'createdAt' | 'updatedAt'
+>;
+export type UpdateTeamData = Omit<
+  Team,
+  'parsedTeam' | 'createdAt' | 'updatedAt'
+>;
 
 type Role = 'user' | 'admin';
 
@@ -51,6 +60,7 @@ export interface Tournament {
   season: number;
   format: string;
   teams: TournamentTeam[];
+  runId?: string;
   createdAt: string;
 }
 
@@ -61,6 +71,26 @@ export type CreateTournamentData = Omit<
   teams: Omit<TournamentTeam, 'team'>[];
 };
 
+export interface TournamentImportJob {
+  id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  name: string;
+  season: number;
+  format: string;
+  url: string;
+  // Id of the created tournament, once the import succeeded
+  tournament?: string;
+  error?: string;
+  runId?: string;
+  createdAt: string;
+  updatedAt?: string;
+}
+
+export type CreateTournamentImportJobData = Pick<
+  TournamentImportJob,
+  'name' | 'season' | 'format' | 'url' | 'runId'
+>;
+
 export interface Usage<T = string> {
   value: T;
   percentage: number;
@@ -122,7 +152,9 @@ export interface Battle {
   format?: string;
   notes: string;
   turns: Turn[];
+  runId?: string;
   createdAt: string;
+  updatedAt?: string;
 }
 
 export type CreateActionData = Omit<Action, 'id'>;
@@ -131,7 +163,10 @@ export type CreateTurnData = Omit<Turn, 'id' | 'actions'> & {
   actions: CreateActionData[];
 };
 
-export type CreateBattleData = Omit<Battle, 'id' | 'createdAt' | 'turns'> & {
+export type CreateBattleData = Omit<
+  Battle,
+  'id' | 'createdAt' | 'updatedAt' | 'turns'
+> & {
   turns: CreateTurnData[];
 };
 
@@ -141,12 +176,15 @@ export interface Training extends Pick<Battle, 'team' | 'season' | 'format'> {
   name: string;
   description: string;
   battles: Battle[];
+  version?: number;
+  runId?: string;
   createdAt: string;
+  updatedAt?: string;
 }
 
 export type CreateTrainingData = Omit<
   Training,
-  'id' | 'isDefault' | 'battles' | 'createdAt'
+  'id' | 'isDefault' | 'battles' | 'version' | 'createdAt' | 'updatedAt'
 >;
 
 export interface BattleResultAnalytics {
@@ -4,12 +4,14 @@ import {
   ExposedUser,
   Team,
   Tournament,
+  TournamentImportJob,
   Training,
   TrainingAnalytics,
 } from './api';
 
 export interface GET_TOURNAMENT {
   tournament: Tournament;
+  // Not sent with `analysis=false`
   analysis?: AnalyticsResponse;
 }
 
@@ -18,17 +20,36 @@ export interface DELETE_TOURNAMENT {
 }
 
 export interface GET_TOURNAMENTS {
+  // Empty with `idsOnly`
   tournaments: Tournament[];
+  // ids of every tournament, only sent with `idsOnly`
+  tournamentIds?: string[];
 }
 
 export interface POST_TOURNAMENT {
   tournament: Tournament;
 }
 
+export interface POST_TOURNAMENT_IMPORT {
+  job: TournamentImportJob;
+}
+
+export interface GET_TOURNAMENT_IMPORT {
+  job: TournamentImportJob;
+}
+
 export interface GET_ME {
   user: ExposedUser;
 }
 
+export interface GET_TEAMS {
+  // Empty with `idsOnly`
+  teams: Team[];
+  // ids of every team of the user, only sent with `updatedSince` or `idsOnly`
+  teamIds?: string[];
+  syncedAt: string;
+}
+
 export interface GET_TEAM {
   team: Team;
 }
@@ -42,7 +63,14 @@ export interface DELETE_TEAM {
 }
 
 export interface GET_TRAININGS {
+  // Empty with `idsOnly`
   trainings: Training[];
+  // ids of every training of the user, only sent with `updatedSince` or
+  // `idsOnly`
+  trainingIds?: string[];
+  // Only sent with `idsOnly`, null if the user has no default training
+  defaultTrainingId?: string | null;
+  syncedAt: string;
 }
 
 export interface POST_TRAINING {
@@ -81,3 +109,11 @@ export interface REQ_POST_AUTH {
   username?: string;
   password?: string;
 }
+
+export interface DELETE_TEST_RUNS {
+  // Number of deleted entities of each kind
+  deleted: Record<
+    'teams' | 'trainings' | 'battles' | 'tournaments' | 'tournamentImports',
+    number
+  >;
+}
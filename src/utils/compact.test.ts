@@ -0,0 +1,26 @@
+/**
+ * @jest-environment node
+ */
+import { encodeCompact } from './compact';
+
+describe('encodeCompact', () => {
+  it('should intern keys and string values in the string table', () => {
+    expect([...encodeCompact({ a: 1, b: ['a', null] })]).toEqual([
+      0x49, 0x43, 1, 2, 1, 97, 1, 98, 7, 2, 0, 3, 2, 1, 6, 2, 5, 0, 0,
+    ]);
+  });
+
+  it('should encode negative integers, floats and booleans', () => {
+    expect([...encodeCompact({ n: -3, f: 0.5, t: true })]).toEqual([
+      0x49, 0x43, 1, 3, 1, 110, 1, 102, 1, 116, 7, 3, 0, 3, 5, 1, 4, 0, 0, 0,
+      0, 0, 0, 224, 63, 2, 2,
+    ]);
+  });
+
+  it('should convert values like JSON.stringify', () => {
+    const value = { date: new Date(0), skipped: undefined, nan: NaN };
+    expect(encodeCompact(value)).toEqual(
+      encodeCompact(JSON.parse(JSON.stringify(value)) as unknown),
+    );
+  });
+});
@@ -0,0 +1,144 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+/**
+ * Compact binary encoding of JSON responses, decoded by the e2e client in
+ * `e2e/src/util/compact.py`. Every string, object keys included, is written
+ * once in a string table and referenced by index afterwards.
+ */
+export const COMPACT_CONTENT_TYPE = 'application/vnd.incineroar.compact';
+
+const MAGIC = [0x49, 0x43];
+const VERSION = 1;
+
+const Tag = {
+  null: 0,
+  false: 1,
+  true: 2,
+  int: 3,
+  float: 4,
+  string: 5,
+  array: 6,
+  object: 7,
+} as const;
+
+const MAX_ZIGZAG_INT = Math.floor(Number.MAX_SAFE_INTEGER / 2);
+
+class CompactWriter {
+  protected strings = new Map<string, number>();
+  protected body: number[] = [];
+  protected float = new DataView(new ArrayBuffer(8));
+  protected textEncoder = new TextEncoder();
+
+  protected static writeVarint(out: number[], value: number) {
+    while (value > 0x7f) {
+      out.push((value % 0x80) | 0x80);
+      value = Math.floor(value / 0x80);
+    }
+    out.push(value);
+  }
+
+  protected writeString(value: string) {
+    let index = this.strings.get(value);
+    if (index === undefined) {
+      index = this.strings.size;
+      this.strings.set(value, index);
+    }
+    CompactWriter.writeVarint(this.body, index);
+  }
+
+  protected writeNumber(value: number) {
+    if (!Number.isFinite(value)) {
+      this.body.push(Tag.null);
+    } else if (Number.isInteger(value) && Math.abs(value) <= MAX_ZIGZAG_INT) {
+      this.body.push(Tag.int);
+      const zigzag = value >= 0 ? value * 2 : -value * 2 - 1;
+      CompactWriter.writeVarint(this.body, zigzag);
+    } else {
+      this.body.push(Tag.float);
+      this.float.setFloat64(0, value, true);
+      for (let i = 0; i < 8; i++) this.body.push(this.float.getUint8(i));
+    }
+  }
+
+  write(value: unknown) {
+    // Same conversions as JSON.stringify (dates, ObjectIds...)
+    if (
+      value !== null &&
+      typeof value === 'object' &&
+      typeof (value as { toJSON?: unknown }).toJSON === 'function'
+    ) {
+      value = (value as { toJSON: () => unknown }).toJSON();
+    }
+
+    if (value === null || value === undefined) {
+      this.body.push(Tag.null);
+    } else if (typeof value === 'boolean') {
+      this.body.push(value ? Tag.true : Tag.false);
+    } else if (typeof value === 'number') {
+      this.writeNumber(value);
+    } else if (typeof value === 'string') {
+      this.body.push(Tag.string);
+      this.writeString(value);
+    } else if (Array.isArray(value)) {
+      this.body.push(Tag.array);
+      CompactWriter.writeVarint(this.body, value.length);
+      value.forEach((item) => this.write(item));
+    } else if (typeof value === 'object') {
+      const entries = Object.entries(value).filter(
+        ([, item]) => item !== undefined && typeof item !== 'function',
+      );
+      this.body.push(Tag.object);
+      CompactWriter.writeVarint(this.body, entries.length);
+      entries.forEach(([key, item]) => {
+        this.writeString(key);
+        this.write(item);
+      });
+    } else {
+      this.body.push(Tag.null);
+    }
+  }
+
+  toBytes() {
+    const header: number[] = [...MAGIC, VERSION];
+    CompactWriter.writeVarint(header, this.strings.size);
+    this.strings.forEach((_, value) => {
+      const encoded = this.textEncoder.encode(value);
+      CompactWriter.writeVarint(header, encoded.length);
+      encoded.forEach((byte) => header.push(byte));
+    });
+    const bytes = new Uint8Array(header.length + this.body.length);
+    bytes.set(header);
+    bytes.set(this.body, header.length);
+    return bytes;
+  }
+}
+
+export const encodeCompact = (value: unknown) => {
+  const writer = new CompactWriter();
+  writer.write(value);
+  return writer.toBytes();
+};
+
+export const acceptsCompact = (req: NextRequest) =>
+  req.headers.get('accept')?.includes(COMPACT_CONTENT_TYPE) ?? false;
+
+/**
+ * Respond with the compact encoding when the request accepts it, JSON
+ * otherwise.
+ */
+export const negotiatedResponse = <T>(
+  req: NextRequest,
+  body: T,
+  init?: ResponseInit,
+): NextResponse<T> => {
+  const headers = new Headers(init?.headers);
+  headers.set('Vary', 'Accept');
+  if (!acceptsCompact(req)) {
+    return NextResponse.json(body, { ...init, headers });
+  }
+  headers.set('Content-Type', COMPACT_CONTENT_TYPE);
+  return new NextResponse(encodeCompact(body), {
+    ...init,
+    headers,
+  }) as NextResponse<T>;
+};
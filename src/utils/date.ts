@@ -0,0 +1,10 @@
+import { InvalidDateError } from './errors';
+
+export const parseOptionalDate = (value: string | null | undefined) => {
+  if (!value) return undefined;
+  const date = new Date(value);
+  if (Number.isNaN(date.getTime())) {
+    throw new InvalidDateError(value);
+  }
+  return date;
+};
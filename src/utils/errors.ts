@@ -14,3 +14,12 @@ export class MissingDBConnectionError extends Error {
     super('Not connected to DB, did you call DBConnection.connect()?');
   }
 }
+
+export class InvalidDateError extends Error {
+  value: string;
+
+  constructor(value: string) {
+    super(`Invalid date ${value}`);
+    this.value = value;
+  }
+}
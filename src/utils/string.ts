@@ -1,2 +1,5 @@
 export const capitalize = (path: string) =>
   `${path.charAt(0).toUpperCase()}${path.slice(1).toLowerCase()}`;
+
+export const escapeRegExp = (value: string) =>
+  value.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');